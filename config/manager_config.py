@@ -2,3 +2,84 @@ MANAGER_CONFIG = {
     "version_url": "https://raw.githubusercontent.com/mashakulina/AdGuard_Manager/main/version.txt",
     "current_version": "1.0"  # Текущая версия менеджера
 }
+
+# Настройки опроса статуса подключения (в секундах)
+STATUS_POLL_CONFIG = {
+    "base_interval": 3,          # Обычный интервал после изменения состояния
+    "fast_interval": 0.5,        # Интервал во время подключения/отключения
+    "max_interval": 30,          # Потолок интервала при стабильном состоянии
+    "backoff_factor": 1.5,       # Во сколько раз растет интервал без изменений
+    "transition_timeout": 30,    # Сколько длится быстрый опрос после действия пользователя
+    "watched_max_interval": 120, # Потолок интервала, когда за состоянием следит TunWatcher
+    "license_interval": 30       # Как часто обновлять информацию о лицензии
+}
+
+# Наблюдение за tun-интерфейсом AdGuard VPN
+TUN_WATCH_CONFIG = {
+    # Точные имена интерфейсов AdGuard VPN в режиме TUN ("running on ..." в adguardvpn-cli status);
+    # tun-интерфейсы других VPN не считаются подключением
+    "interface_names": ["tun0"],
+    "sysfs_interval": 1             # Период проверки /sys/class/net, если netlink недоступен
+}
+
+# Ожидание результата подключения (в секундах)
+CONNECT_CONFIG = {
+    "mode": "pty",           # "pty" - внутри менеджера, "terminal" - в konsole
+    "pty_read_size": 4096,   # Размер блока чтения вывода CLI из псевдотерминала
+    "deadline": 60,          # Жесткий предел ожидания (включая ввод пароля sudo в терминале)
+    "check_interval": 0.2,   # Как часто проверять код возврата CLI
+    "success_pause": 1,      # Сколько терминал показывает сообщение об успехе (режим terminal)
+    "failure_pause": 3,      # Сколько терминал показывает ошибку перед закрытием (режим terminal)
+    "exit_wait": 30          # Сколько ждать выхода CLI после успешного подключения, прежде чем завершить его
+}
+
+# Автовыбор самой быстрой локации для кнопки "Подключиться"
+LOCATION_RANK_CONFIG = {
+    "auto_select": True,              # Подключаться к лучшей локации вместо локации по умолчанию CLI
+    "refresh_interval": 600,          # Как часто обновлять пинги из list-locations (сек)
+    "network_check_interval": 30,     # Как часто проверять смену сети (маршрут по умолчанию)
+    "min_success_rate": 0.05          # Нижняя граница доли успехов в формуле оценки
+}
+
+# Настройки менеджера, которые пользователь меняет в окне настроек
+MANAGER_SETTINGS_PATH = "~/.config/adguardvpn-manager/settings.json"
+
+# Автоматическое переподключение после обрыва (включается в настройках)
+WATCHDOG_CONFIG = {
+    "base_delay": 2,              # Задержка перед первой попыткой (сек)
+    "backoff_factor": 2,          # Во сколько раз растет задержка после неудачи
+    "max_delay": 60,              # Потолок задержки между попытками
+    "jitter": 0.3,                # Случайное отклонение задержки (доля)
+    "attempts_per_location": 3,   # Попыток на локацию перед переходом к следующей
+    "fallback_locations": 2,      # Сколько следующих по рейтингу локаций пробовать
+    "max_duration": 900,          # Общий предел переподключения (сек)
+    "suppress_timeout": 120       # Сколько ждать ожидаемого отключения, прежде чем снова следить за обрывами
+}
+
+# История подключений к локациям (время до подключения, успехи и ошибки)
+CONNECT_HISTORY_CONFIG = {
+    "path": "~/.local/share/adguardvpn-manager/connect_history.sqlite3",
+    "median_window": 50           # По скольким последним успешным подключениям считать медиану
+}
+
+# Окно выбора локации
+LOCATION_PICKER_CONFIG = {
+    "batch_size": 25,           # Сколько изменений строк применять к таблице за один проход цикла Tk
+    "poll_interval_ms": 30      # Как часто забирать списки, полученные фоновой загрузкой
+}
+
+# Кэш списка локаций (list-locations): окно выбора показывает его сразу и обновляет в фоне
+LOCATIONS_CACHE_CONFIG = {
+    "path": "~/.cache/adguardvpn-manager/locations.json",
+    "fresh_for": 60               # Сколько секунд кэш не обновляется при повторном открытии окна
+}
+
+# Измерение задержки до локаций в окне выбора ("Измерить пинг")
+LATENCY_PROBE_CONFIG = {
+    "endpoints_path": "~/.config/adguardvpn-manager/probe_endpoints.json",  # Адреса серверов по городам
+    "port": 443,                  # Порт, если в файле адресов указан только хост
+    "tls": True,                  # Измерять TCP соединение вместе с TLS рукопожатием
+    "workers": 8,                 # Сколько локаций измеряется одновременно
+    "samples": 5,                 # Замеров на локацию
+    "timeout": 2                  # Таймаут одного замера (сек)
+}
@@ -7,6 +7,8 @@ import os
 import time
 import webbrowser
 import sys
+from core.cli import run_cli, cli_command, track_cli_call
+from core.locations_cache import locations_cache
 from ui.components.button_styler import create_hover_button, apply_hover_effect
 
 class SudoAuthWindow:
@@ -338,35 +340,39 @@ class AuthWindow:
         try:
             self.status_var.set("Получение ссылки для авторизации...")
 
-            process = subprocess.Popen(
-                ['adguardvpn-cli', 'login'],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
+            # Время вызова считаем до получения ссылки: дальше login ждет браузер
+            with track_cli_call(('login',)) as call:
+                process = subprocess.Popen(
+                    cli_command('login'),
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True
+                )
 
-            time.sleep(2)
+                time.sleep(2)
 
-            auth_url = None
-            output_text = ""
+                auth_url = None
+                output_text = ""
 
-            while True:
-                line = process.stdout.readline()
-                if not line and process.poll() is not None:
-                    break
-                if line:
-                    output_text += line
-                    url_match = re.search(r'https://[^\s]+', line)
+                while True:
+                    line = process.stdout.readline()
+                    if not line and process.poll() is not None:
+                        break
+                    if line:
+                        output_text += line
+                        url_match = re.search(r'https://[^\s]+', line)
+                        if url_match:
+                            auth_url = url_match.group(0)
+                            break
+
+                if not auth_url:
+                    error_output = process.stderr.read()
+                    url_match = re.search(r'https://[^\s]+', error_output)
                     if url_match:
                         auth_url = url_match.group(0)
-                        break
 
-            if not auth_url:
-                error_output = process.stderr.read()
-                url_match = re.search(r'https://[^\s]+', error_output)
-                if url_match:
-                    auth_url = url_match.group(0)
+                call['exit_code'] = process.poll()
 
             if auth_url:
                 self.auth_url = auth_url
@@ -413,12 +419,8 @@ class AuthWindow:
     def _perform_auth_check(self):
         """Выполняет проверку статуса авторизации"""
         try:
-            result = subprocess.run(
-                ['adguardvpn-cli', 'list-locations'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            result = run_cli('list-locations')
+            locations_cache.store_result(result)
 
             if result.returncode == 0:
                 self.auth_success = True
@@ -729,35 +731,39 @@ class ManagerAuthWindow:
         try:
             self.status_var.set("Получение ссылки для авторизации...")
 
-            process = subprocess.Popen(
-                ['adguardvpn-cli', 'login'],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
+            # Время вызова считаем до получения ссылки: дальше login ждет браузер
+            with track_cli_call(('login',)) as call:
+                process = subprocess.Popen(
+                    cli_command('login'),
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True
+                )
 
-            time.sleep(2)
+                time.sleep(2)
 
-            auth_url = None
-            output_text = ""
+                auth_url = None
+                output_text = ""
 
-            while True:
-                line = process.stdout.readline()
-                if not line and process.poll() is not None:
-                    break
-                if line:
-                    output_text += line
-                    url_match = re.search(r'https://[^\s]+', line)
+                while True:
+                    line = process.stdout.readline()
+                    if not line and process.poll() is not None:
+                        break
+                    if line:
+                        output_text += line
+                        url_match = re.search(r'https://[^\s]+', line)
+                        if url_match:
+                            auth_url = url_match.group(0)
+                            break
+
+                if not auth_url:
+                    error_output = process.stderr.read()
+                    url_match = re.search(r'https://[^\s]+', error_output)
                     if url_match:
                         auth_url = url_match.group(0)
-                        break
 
-            if not auth_url:
-                error_output = process.stderr.read()
-                url_match = re.search(r'https://[^\s]+', error_output)
-                if url_match:
-                    auth_url = url_match.group(0)
+                call['exit_code'] = process.poll()
 
             if auth_url:
                 self.auth_url = auth_url
@@ -806,12 +812,8 @@ class ManagerAuthWindow:
     def _perform_auth_check(self):
         """Выполняет проверку статуса авторизации"""
         try:
-            result = subprocess.run(
-                ['adguardvpn-cli', 'list-locations'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            result = run_cli('list-locations')
+            locations_cache.store_result(result)
 
             if result.returncode == 0:
                 self.auth_success = True
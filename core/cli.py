@@ -0,0 +1,210 @@
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from core.cli_stats import cli_stats
+
+# Переменная окружения, которой можно подменить CLI (например, на tools/fake_adguardvpn_cli.py)
+CLI_BINARY_ENV = "ADGUARDVPN_CLI"
+CLI_BINARY = os.environ.get(CLI_BINARY_ENV) or "adguardvpn-cli"
+# Куда установщик кладет ссылку на CLI
+INSTALLED_CLI_PATH = "/usr/local/bin/adguardvpn-cli"
+
+# Таймауты по умолчанию для каждой подкоманды (в секундах)
+DEFAULT_TIMEOUT = 10
+SUBCOMMAND_TIMEOUTS = {
+    'status': 5,
+    'license': 5,
+    'list-locations': 10,
+    'config': 5,
+    '-v': 5,
+    'check-update': 15,
+    'disconnect': 10,
+    'logout': 10,
+}
+
+# Подкоманды, которые только читают состояние. Одновременные вызовы
+# с одинаковыми аргументами разделяют один процесс и его результат
+READ_ONLY_COMMANDS = {
+    ('status',),
+    ('status', '--verbose'),
+    ('license',),
+    ('list-locations',),
+    ('config', 'show'),
+    ('config', 'get-mode'),
+    ('config', 'get-socks-port'),
+    ('config', 'get-dns'),
+    ('config', 'get-tun-routing-mode'),
+    ('check-update',),
+    ('-v',),
+}
+
+# Сколько процессов adguardvpn-cli может работать одновременно
+MAX_CONCURRENT_PROCESSES = 3
+
+
+def cli_command(*args):
+    """Формирует командную строку для вызова adguardvpn-cli"""
+    return [CLI_BINARY] + list(args)
+
+
+def is_cli_installed():
+    """Проверяет, установлен ли adguardvpn-cli (или доступна ли его подмена)"""
+    if os.environ.get(CLI_BINARY_ENV):
+        return shutil.which(CLI_BINARY) is not None
+    return os.path.exists(INSTALLED_CLI_PATH)
+
+
+def stats_key(args):
+    """Имя подкоманды для статистики: 'status --verbose', 'config set-dns', 'connect -l'"""
+    if not args:
+        return '(none)'
+    if len(args) > 1 and (args[0] == 'config' or args[1].startswith('-')):
+        return f"{args[0]} {args[1]}"
+    return args[0]
+
+
+def _find_caller():
+    """Возвращает 'модуль.функция' первых вызывающих вне этого модуля"""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code.co_filename == __file__:
+        frame = frame.f_back
+
+    callers = []
+    while frame is not None and len(callers) < 2:
+        module = os.path.splitext(os.path.basename(frame.f_code.co_filename))[0]
+        callers.append(f"{module}.{frame.f_code.co_name}")
+        frame = frame.f_back
+    return " < ".join(callers)
+
+
+@contextmanager
+def track_cli_call(args):
+    """Учитывает в статистике вызов CLI, запущенный в обход исполнителя (Popen).
+
+    Внутри блока можно сохранить код возврата: call['exit_code'] = process.returncode
+    """
+    call = {'exit_code': None}
+    caller = _find_caller()
+    start = time.monotonic()
+    try:
+        yield call
+    except subprocess.TimeoutExpired:
+        cli_stats.record(stats_key(args), caller, time.monotonic() - start, timed_out=True)
+        raise
+    except Exception as e:
+        cli_stats.record(stats_key(args), caller, time.monotonic() - start, error=str(e))
+        raise
+    else:
+        cli_stats.record(stats_key(args), caller, time.monotonic() - start,
+                         exit_code=call['exit_code'])
+
+
+def get_timeout(args):
+    """Возвращает таймаут для подкоманды"""
+    if not args:
+        return DEFAULT_TIMEOUT
+    return SUBCOMMAND_TIMEOUTS.get(args[0], DEFAULT_TIMEOUT)
+
+
+class _Flight:
+    """Один выполняющийся процесс, результат которого ждут несколько вызывающих"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.parsed = {}
+        self.parse_lock = threading.Lock()
+
+    def get_parsed(self, parse):
+        """Разбирает вывод один раз для каждого парсера"""
+        with self.parse_lock:
+            if parse not in self.parsed:
+                self.parsed[parse] = parse(self.result)
+            return self.parsed[parse]
+
+
+class CLIExecutor:
+    """Единая точка запуска adguardvpn-cli.
+
+    Одинаковые read-only запросы, пришедшие одновременно, обслуживаются
+    одним процессом, а общее число процессов ограничено семафором.
+    """
+
+    def __init__(self, max_concurrent=MAX_CONCURRENT_PROCESSES):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+
+    def run(self, args, timeout=None, parse=None):
+        """Выполняет команду и возвращает CompletedProcess (или результат parse).
+
+        Исключения subprocess (TimeoutExpired, FileNotFoundError и т.д.)
+        пробрасываются всем ожидающим вызывающим.
+        """
+        args = tuple(args)
+        if timeout is None:
+            timeout = get_timeout(args)
+        caller = _find_caller()
+
+        if args not in READ_ONLY_COMMANDS:
+            result = self._spawn(args, timeout, caller)
+            return parse(result) if parse else result
+
+        with self._lock:
+            flight = self._in_flight.get(args)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._in_flight[args] = flight
+
+        if leader:
+            try:
+                flight.result = self._spawn(args, timeout, caller)
+            except Exception as e:
+                flight.error = e
+            finally:
+                with self._lock:
+                    self._in_flight.pop(args, None)
+                flight.done.set()
+        else:
+            cli_stats.record_shared(stats_key(args))
+            flight.done.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.get_parsed(parse) if parse else flight.result
+
+    def _spawn(self, args, timeout, caller):
+        """Запускает процесс с учетом ограничения на число одновременных процессов"""
+        with self._slots:
+            start = time.monotonic()
+            try:
+                result = subprocess.run(
+                    cli_command(*args),
+                    capture_output=True,
+                    text=True,
+                    timeout=timeout
+                )
+            except subprocess.TimeoutExpired:
+                cli_stats.record(stats_key(args), caller, time.monotonic() - start, timed_out=True)
+                raise
+            except Exception as e:
+                cli_stats.record(stats_key(args), caller, time.monotonic() - start, error=str(e))
+                raise
+
+            cli_stats.record(stats_key(args), caller, time.monotonic() - start,
+                             exit_code=result.returncode)
+            return result
+
+
+_executor = CLIExecutor()
+
+
+def run_cli(*args, timeout=None, parse=None):
+    """Выполняет adguardvpn-cli через общий исполнитель"""
+    return _executor.run(args, timeout=timeout, parse=parse)
@@ -0,0 +1,128 @@
+import json
+import threading
+import time
+from collections import deque
+
+# Границы корзин гистограммы длительности вызова (в секундах)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, float('inf'))
+# Сколько последних вызовов хранить для просмотра
+RECENT_CALLS_LIMIT = 200
+
+
+class _CommandStats:
+    """Счетчики одной подкоманды"""
+
+    def __init__(self):
+        self.spawned = 0
+        self.shared = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.failed = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.histogram = [0] * len(LATENCY_BUCKETS)
+
+    def add(self, duration):
+        self.spawned += 1
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if duration <= bound:
+                self.histogram[index] += 1
+                break
+
+    def percentile(self, fraction):
+        """Оценка перцентиля по гистограмме (верхняя граница корзины)"""
+        if not self.spawned:
+            return 0.0
+        target = fraction * self.spawned
+        seen = 0
+        for index, count in enumerate(self.histogram):
+            seen += count
+            if seen >= target:
+                bound = LATENCY_BUCKETS[index]
+                return self.max_time if bound == float('inf') else min(bound, self.max_time)
+        return self.max_time
+
+    def to_dict(self):
+        return {
+            'spawned': self.spawned,
+            'shared': self.shared,
+            'timeouts': self.timeouts,
+            'errors': self.errors,
+            'failed': self.failed,
+            'avg_time': self.total_time / self.spawned if self.spawned else 0.0,
+            'p50_time': self.percentile(0.5),
+            'p95_time': self.percentile(0.95),
+            'max_time': self.max_time,
+            'histogram': dict(zip([str(bound) for bound in LATENCY_BUCKETS], self.histogram))
+        }
+
+
+class CLIStats:
+    """Учет всех вызовов adguardvpn-cli: счетчики, гистограммы и последние вызовы"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Сбрасывает накопленную статистику"""
+        with self._lock:
+            self.started_at = time.time()
+            self._commands = {}
+            self.recent = deque(maxlen=RECENT_CALLS_LIMIT)
+
+    def _command(self, subcommand):
+        stats = self._commands.get(subcommand)
+        if stats is None:
+            stats = self._commands[subcommand] = _CommandStats()
+        return stats
+
+    def record(self, subcommand, caller, duration, exit_code=None, timed_out=False, error=None):
+        """Записывает вызов, который запустил процесс"""
+        with self._lock:
+            stats = self._command(subcommand)
+            stats.add(duration)
+            if timed_out:
+                stats.timeouts += 1
+            elif error is not None:
+                stats.errors += 1
+            elif exit_code not in (0, None):
+                # None - процесс еще работает (login ждет браузер)
+                stats.failed += 1
+            self.recent.append({
+                'time': time.time(),
+                'subcommand': subcommand,
+                'caller': caller,
+                'duration': duration,
+                'exit_code': exit_code,
+                'timed_out': timed_out,
+                'error': error
+            })
+
+    def record_shared(self, subcommand):
+        """Записывает запрос, который получил результат уже запущенного процесса"""
+        with self._lock:
+            self._command(subcommand).shared += 1
+
+    def snapshot(self):
+        """Возвращает статистику в виде словаря (для панели отладки и JSON)"""
+        with self._lock:
+            commands = {name: stats.to_dict() for name, stats in self._commands.items()}
+            return {
+                'started_at': self.started_at,
+                'uptime': time.time() - self.started_at,
+                'total_spawned': sum(c['spawned'] for c in commands.values()),
+                'total_shared': sum(c['shared'] for c in commands.values()),
+                'commands': commands,
+                'recent': list(self.recent)
+            }
+
+    def dump_json(self, path):
+        """Сохраняет статистику в JSON файл"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+
+
+cli_stats = CLIStats()
@@ -0,0 +1,151 @@
+import bisect
+import os
+import sqlite3
+import threading
+from collections import deque
+from typing import NamedTuple
+from config.manager_config import CONNECT_HISTORY_CONFIG
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    location TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL NOT NULL,
+    connect_time REAL,
+    outcome TEXT NOT NULL,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS attempts_location ON attempts (location, outcome, id);
+CREATE TABLE IF NOT EXISTS location_stats (
+    location TEXT PRIMARY KEY,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    successes INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# Исходы попытки; отмененные попытки хранятся, но не влияют на долю успехов
+OUTCOME_CONNECTED = "connected"
+OUTCOME_FAILED = "failed"
+OUTCOME_DEADLINE = "deadline"
+OUTCOME_CANCELLED = "cancelled"
+
+
+class LocationStats(NamedTuple):
+    """Сводка по локации для окна выбора"""
+    attempts: int
+    successes: int
+    median_time: float = None
+
+    @property
+    def success_rate(self):
+        return self.successes / self.attempts if self.attempts else None
+
+
+class RunningMedian:
+    """Медиана последних window значений без пересортировки при каждом добавлении"""
+
+    def __init__(self, window):
+        self._recent = deque(maxlen=window)
+        self._sorted = []
+
+    def add(self, value):
+        if len(self._recent) == self._recent.maxlen:
+            oldest = self._recent[0]
+            del self._sorted[bisect.bisect_left(self._sorted, oldest)]
+        self._recent.append(value)
+        bisect.insort(self._sorted, value)
+
+    @property
+    def value(self):
+        count = len(self._sorted)
+        if not count:
+            return None
+        middle = count // 2
+        if count % 2:
+            return self._sorted[middle]
+        return (self._sorted[middle - 1] + self._sorted[middle]) / 2
+
+
+class ConnectHistory:
+    """История попыток подключения в SQLite.
+
+    Каждая попытка - строка в attempts; счетчики по локациям обновляются
+    в той же транзакции, а медиана времени подключения ведется в памяти.
+    Поэтому stats() не перечитывает историю целиком.
+    """
+
+    def __init__(self, path=CONNECT_HISTORY_CONFIG["path"], config=CONNECT_HISTORY_CONFIG):
+        self.path = os.path.expanduser(path)
+        self.median_window = config["median_window"]
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._medians = {}
+        self._db = None
+        try:
+            self._open()
+        except (OSError, sqlite3.Error) as e:
+            print(f"История подключений недоступна: {e}")
+            self._db = None
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+
+        for location, attempts, successes in self._db.execute(
+                "SELECT location, attempts, successes FROM location_stats"):
+            self._counts[location] = (attempts, successes)
+            median = self._medians[location] = RunningMedian(self.median_window)
+            # Последние успешные подключения по индексу (location, outcome, id)
+            rows = self._db.execute(
+                "SELECT connect_time FROM attempts WHERE location = ? AND outcome = ? "
+                "ORDER BY id DESC LIMIT ?", (location, OUTCOME_CONNECTED, self.median_window))
+            for (connect_time,) in reversed(rows.fetchall()):
+                median.add(connect_time)
+
+    def record(self, location, started_at, finished_at, outcome, message=""):
+        """Записывает попытку подключения (времена - time.time())"""
+        key = (location or "").lower()
+        connected = outcome == OUTCOME_CONNECTED
+        connect_time = finished_at - started_at if connected else None
+
+        with self._lock:
+            if key and outcome != OUTCOME_CANCELLED:
+                attempts, successes = self._counts.get(key, (0, 0))
+                self._counts[key] = (attempts + 1, successes + (1 if connected else 0))
+                if connected:
+                    self._medians.setdefault(key, RunningMedian(self.median_window)).add(connect_time)
+
+            if self._db is None:
+                return
+            try:
+                with self._db:
+                    self._db.execute(
+                        "INSERT INTO attempts (location, started_at, finished_at, connect_time, outcome, message) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (key, started_at, finished_at, connect_time, outcome, message or None))
+                    if key and outcome != OUTCOME_CANCELLED:
+                        self._db.execute(
+                            "INSERT INTO location_stats (location, attempts, successes) VALUES (?, 1, ?) "
+                            "ON CONFLICT(location) DO UPDATE SET attempts = attempts + 1, "
+                            "successes = successes + excluded.successes",
+                            (key, 1 if connected else 0))
+            except sqlite3.Error as e:
+                print(f"Не удалось сохранить попытку подключения: {e}")
+
+    def stats(self, location):
+        """Сводка по локации или None, если к ней еще не подключались"""
+        key = (location or "").lower()
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                return None
+            median = self._medians.get(key)
+            return LocationStats(counts[0], counts[1], median.value if median else None)
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
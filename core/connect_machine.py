@@ -0,0 +1,147 @@
+import threading
+import time
+from typing import NamedTuple
+
+# Этапы подключения, отключения и смены локации
+IDLE = "idle"
+LAUNCHING = "launching"
+AUTHENTICATING = "authenticating"
+ESTABLISHING = "establishing"
+VERIFYING = "verifying"
+DISCONNECTING = "disconnecting"
+CONNECTED = "connected"
+FAILED = "failed"
+
+# Названия этапов для лога
+PHASE_NAMES = {
+    IDLE: "ожидание",
+    LAUNCHING: "запуск",
+    AUTHENTICATING: "пароль",
+    ESTABLISHING: "соединение",
+    VERIFYING: "проверка",
+    DISCONNECTING: "отключение",
+    CONNECTED: "подключено",
+    FAILED: "ошибка",
+}
+
+ACTION_NAMES = {
+    'connect': "Подключение",
+    'switch': "Смена локации",
+    'disconnect': "Отключение",
+}
+
+# Этапы, после которых действие завершено
+FINAL_PHASES = {IDLE, CONNECTED, FAILED}
+
+# Допустимые переходы; из завершенного состояния действие начинается через begin()
+TRANSITIONS = {
+    LAUNCHING: {AUTHENTICATING, ESTABLISHING, VERIFYING, DISCONNECTING, CONNECTED, FAILED},
+    AUTHENTICATING: {ESTABLISHING, VERIFYING, CONNECTED, FAILED},
+    ESTABLISHING: {AUTHENTICATING, VERIFYING, CONNECTED, FAILED},
+    VERIFYING: {ESTABLISHING, CONNECTED, FAILED},
+    DISCONNECTING: {AUTHENTICATING, ESTABLISHING, IDLE, FAILED},
+}
+
+
+class ConnectEvent(NamedTuple):
+    """Переход на новый этап действия (connect, disconnect, switch)"""
+    action: str
+    phase: str
+    previous: str
+    location: str = ""
+    message: str = ""
+    timestamp: float = 0.0
+    # Секунды с начала действия
+    elapsed: float = 0.0
+    # Длительность каждого этапа ((этап, секунды), ...) - только в завершающем событии
+    durations: tuple = ()
+
+
+class ConnectStateMachine:
+    """Явные этапы подключения с событиями для подписчиков.
+
+    Подписчики (окно, лог, будущий трей) вызываются в потоке, который
+    сменил этап - обычно в рабочем потоке, поэтому интерфейс
+    обновляется через root.after. Длительность этапов накапливается
+    для настройки таймаутов.
+    """
+
+    def __init__(self):
+        self.phase = IDLE
+        self.action = None
+        self.location = ""
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._started_at = None
+        self._phase_started_at = None
+        self._durations = []
+        self._totals = {}
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def begin(self, action, location=""):
+        """Начинает действие (этап launching)"""
+        with self._lock:
+            previous = self.phase
+            now = time.monotonic()
+            self.action = action
+            self.location = location or ""
+            self._started_at = self._phase_started_at = now
+            self._durations = []
+            self.phase = LAUNCHING
+            event = self._event(LAUNCHING, previous, "", now)
+        self._notify(event)
+
+    def advance(self, phase, message="", location=None):
+        """Переходит на этап phase; недопустимый переход игнорируется (возвращает False)"""
+        with self._lock:
+            if phase == self.phase or phase not in TRANSITIONS.get(self.phase, ()):
+                return False
+            previous = self.phase
+            now = time.monotonic()
+            self._close_phase(previous, now)
+            if location:
+                self.location = location
+            self.phase = phase
+            event = self._event(phase, previous, message, now)
+        self._notify(event)
+        return True
+
+    def phase_stats(self):
+        """Длительность этапов по всем действиям: {этап: {'count', 'avg', 'max'}}"""
+        with self._lock:
+            return {
+                phase: {'count': count, 'avg': total / count, 'max': longest}
+                for phase, (count, total, longest) in self._totals.items()
+            }
+
+    def _close_phase(self, phase, now):
+        duration = now - self._phase_started_at
+        self._durations.append((phase, duration))
+        count, total, longest = self._totals.get(phase, (0, 0.0, 0.0))
+        self._totals[phase] = (count + 1, total + duration, max(longest, duration))
+        self._phase_started_at = now
+
+    def _event(self, phase, previous, message, now):
+        return ConnectEvent(
+            action=self.action,
+            phase=phase,
+            previous=previous,
+            location=self.location,
+            message=message,
+            timestamp=time.time(),
+            elapsed=now - self._started_at,
+            durations=tuple(self._durations) if phase in FINAL_PHASES else ()
+        )
+
+    def _notify(self, event):
+        for callback in list(self._subscribers):
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Ошибка подписчика этапов подключения: {e}")
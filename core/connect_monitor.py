@@ -0,0 +1,183 @@
+import os
+import shlex
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from typing import NamedTuple
+from config.manager_config import CONNECT_CONFIG
+from core.cli import cli_command
+from core.connect_machine import ESTABLISHING, VERIFYING
+from core.operations import kill_process_group
+from core.parsers import clean_ansi_codes
+from core.status_poller import fetch_status_info
+
+
+class ConnectOutcome(NamedTuple):
+    """Результат ожидания подключения"""
+    connected: bool
+    location: str = ""
+    # Какой сигнал дал ответ: 'exit' - код возврата CLI, 'status' - опрос статуса,
+    # 'deadline' - истек общий предел ожидания, 'cancelled' - отменено пользователем
+    reason: str = ""
+    message: str = ""
+
+
+class TerminalConnect:
+    """adguardvpn-cli connect, запущенный в konsole.
+
+    Вывод команды дублируется во временный файл, а код возврата
+    записывается в отдельный файл, как только CLI завершится.
+    """
+
+    def __init__(self, location=None, on_phase=None, config=CONNECT_CONFIG):
+        self.args = ('connect', '-l', location) if location else ('connect',)
+        # Пароль вводится в терминале - менеджер видит только этап establishing
+        self.on_phase = on_phase
+        self.success_pause = config["success_pause"]
+        self.failure_pause = config["failure_pause"]
+        self.directory = tempfile.mkdtemp(prefix="adguardvpn-connect-")
+        self.output_path = os.path.join(self.directory, "output")
+        self.exit_code_path = os.path.join(self.directory, "exit_code")
+        self.process = None
+        # Терминал не умеет прерывать подключение по запросу менеджера
+        self.cancelled = False
+
+    def shell_script(self):
+        """Скрипт для bash -c внутри терминала"""
+        command = ' '.join(shlex.quote(part) for part in cli_command(*self.args))
+        output = shlex.quote(self.output_path)
+        exit_code = shlex.quote(self.exit_code_path)
+        # Код пишется через временный файл и mv, чтобы не прочитать его наполовину
+        return (
+            f"(echo y; echo y; echo y) | {command} 2>&1 | tee {output}; "
+            f"code=${{PIPESTATUS[1]}}; echo $code > {exit_code}.tmp && mv {exit_code}.tmp {exit_code}; "
+            f"if [ $code -eq 0 ]; then "
+            f"echo Успешно подключено, терминал автоматически закроется!; sleep {self.success_pause}; "
+            f"else echo Ошибка подключения; sleep {self.failure_pause}; fi"
+        )
+
+    def start(self):
+        """Открывает терминал с командой подключения"""
+        self.process = subprocess.Popen(['konsole', '-e', 'bash', '-c', self.shell_script()],
+                                        start_new_session=True)
+        if self.on_phase:
+            self.on_phase(ESTABLISHING)
+
+    def terminate(self):
+        """Закрывает терминал вместе с запущенным в нем CLI"""
+        kill_process_group(self.process)
+
+    @property
+    def exit_code(self):
+        """Код возврата CLI или None, если команда еще работает"""
+        try:
+            with open(self.exit_code_path) as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def output(self):
+        """Вывод CLI (без ANSI кодов), накопленный на данный момент"""
+        try:
+            with open(self.output_path, errors='replace') as f:
+                return clean_ansi_codes(f.read())
+        except OSError:
+            return ""
+
+    def wait_exit(self, timeout):
+        """Ждет, пока терминал закроется сам; False - не закрылся за timeout"""
+        try:
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return False
+        return True
+
+    def cleanup(self):
+        """Удаляет временные файлы"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class ConnectMonitor:
+    """Ждет результата подключения по первому надежному сигналу.
+
+    Сигналы: код возврата запущенного connect, изменение состояния
+    в ConnectionStateStore (фоновый опрос в режиме перехода и события
+    tun-интерфейса) и проверочный запрос status после выхода CLI.
+    """
+
+    def __init__(self, poller, store, config=CONNECT_CONFIG):
+        self.poller = poller
+        self.store = store
+        self.deadline = config["deadline"]
+        self.check_interval = config["check_interval"]
+        self._wake = threading.Event()
+        self._initial_state = None
+        self._connected_state = None
+
+    def _on_state(self, state):
+        # Подписчик вызывается сразу с текущим состоянием: его пропускаем,
+        # успехом считаем только новое состояние "подключено"
+        if state.connected and state != self._initial_state:
+            self._connected_state = state
+            self._wake.set()
+
+    def wait(self, run, operation=None, on_phase=None):
+        """Блокирует поток до результата run (TerminalConnect/PtyConnect), не для потока Tk.
+
+        Если передана operation, ожидание прерывается ее отменой и
+        ограничено ее пределом времени. on_phase(этап) сообщает о проверке статуса.
+        """
+        timeout = self.deadline if operation is None else min(self.deadline, operation.remaining())
+        deadline = time.monotonic() + timeout
+        exit_handled = False
+        self._initial_state = self.store.state
+        self._connected_state = None
+        self._wake.clear()
+        self.store.subscribe(self._on_state)
+        if operation is not None:
+            operation.on_cancel(self._wake.set)
+
+        try:
+            while True:
+                if operation is not None and operation.cancelled:
+                    return ConnectOutcome(False, reason='cancelled')
+
+                if self._connected_state is not None:
+                    return ConnectOutcome(True, self._connected_state.location, 'status')
+
+                code = run.exit_code
+                if code is not None and not exit_handled:
+                    exit_handled = True
+                    if code != 0:
+                        return ConnectOutcome(False, reason='exit', message=self._last_line(run))
+
+                    # CLI сообщил об успехе - подтверждаем одним запросом статуса
+                    if on_phase is not None:
+                        on_phase(VERIFYING)
+                    try:
+                        info = fetch_status_info()
+                    except Exception:
+                        info = None
+                    if info is not None and info.connected:
+                        return ConnectOutcome(True, info.location, 'exit')
+                    self.poller.begin_transition()
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return ConnectOutcome(False, reason='deadline', message=self._last_line(run))
+
+                # Быстрый опрос в фоне длится transition_timeout - продлеваем до предела
+                if not self.poller.scheduler.in_transition():
+                    self.poller.begin_transition()
+
+                self._wake.wait(min(self.check_interval, remaining))
+                self._wake.clear()
+        finally:
+            self.store.unsubscribe(self._on_state)
+
+    def _last_line(self, run):
+        """Последняя непустая строка вывода CLI (обычно текст ошибки)"""
+        lines = [line.strip() for line in run.output().splitlines() if line.strip()]
+        return lines[-1] if lines else ""
@@ -0,0 +1,49 @@
+import time
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class ConnectionState:
+    """Состояние подключения VPN, вычисленное фоновым опросом.
+
+    source и timestamp не участвуют в сравнении: два состояния равны,
+    если для пользователя ничего не изменилось.
+    """
+    connected: bool = False
+    location: str = ""
+    error: str = None
+    source: str = field(default="status", compare=False)
+    timestamp: float = field(default_factory=time.time, compare=False)
+
+
+class ConnectionStateStore:
+    """Единый источник состояния подключения для окна, лога, меню и т.д.
+
+    Подписчики вызываются только при реальном изменении состояния
+    и в том потоке, который вызвал set() (в менеджере - поток Tk).
+    """
+
+    def __init__(self):
+        self.state = None
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        """Добавляет подписчика; если состояние уже известно, сразу вызывает его"""
+        self._subscribers.append(callback)
+        if self.state is not None:
+            callback(self.state)
+
+    def unsubscribe(self, callback):
+        """Удаляет подписчика"""
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def set(self, state):
+        """Сохраняет новое состояние и оповещает подписчиков, если оно изменилось"""
+        previous = self.state
+        self.state = state
+        if previous is not None and previous == state:
+            return False
+        for callback in list(self._subscribers):
+            callback(state)
+        return True
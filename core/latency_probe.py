@@ -0,0 +1,127 @@
+import json
+import os
+import socket
+import ssl
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+from config.manager_config import LATENCY_PROBE_CONFIG
+
+# Переменная окружения, которой можно подменить файл адресов (например, на адреса
+# локального стенда из tools/fake_probe_listener.py)
+PROBE_ENDPOINTS_ENV = "ADGUARDVPN_PROBE_ENDPOINTS"
+
+
+class ProbeEndpoint(NamedTuple):
+    """Адрес, по которому измеряется задержка до локации"""
+    host: str
+    port: int
+    tls: bool
+
+
+class ProbeResult(NamedTuple):
+    """Результат измерения: медиана и разброс (мс) по успешным замерам"""
+    key: str
+    median: float = None
+    jitter: float = None
+    samples: int = 0
+    error: str = ""
+
+
+def load_endpoints(config=LATENCY_PROBE_CONFIG):
+    """Адреса локаций из JSON файла: {"город": "хост:порт" или {"host", "port", "tls"}}.
+
+    CLI не сообщает адреса серверов, поэтому они задаются пользователем.
+    Ключи - названия городов в нижнем регистре.
+    """
+    path = os.environ.get(PROBE_ENDPOINTS_ENV) or os.path.expanduser(config["endpoints_path"])
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    endpoints = {}
+    for city, value in data.items():
+        try:
+            if isinstance(value, str):
+                host, _, port = value.rpartition(':')
+                endpoint = ProbeEndpoint(host, int(port), config["tls"])
+            else:
+                endpoint = ProbeEndpoint(value["host"], int(value.get("port", config["port"])),
+                                         bool(value.get("tls", config["tls"])))
+        except (KeyError, TypeError, ValueError):
+            continue
+        endpoints[city.lower()] = endpoint
+    return endpoints
+
+
+def measure_once(endpoint, timeout):
+    """Время установки TCP соединения (и TLS рукопожатия, если endpoint.tls) в мс"""
+    started = time.perf_counter()
+    with socket.create_connection((endpoint.host, endpoint.port), timeout=timeout) as sock:
+        if endpoint.tls:
+            # Измеряется только время рукопожатия - сертификат не проверяется
+            context = ssl.create_default_context()
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+            with context.wrap_socket(sock, server_hostname=endpoint.host):
+                pass
+    return (time.perf_counter() - started) * 1000
+
+
+def summarize(key, samples, error=""):
+    """Медиана и средний разброс между соседними замерами"""
+    if not samples:
+        return ProbeResult(key, error=error or "нет ответа")
+    jitter = (sum(abs(b - a) for a, b in zip(samples, samples[1:])) / (len(samples) - 1)
+              if len(samples) > 1 else 0.0)
+    return ProbeResult(key, statistics.median(samples), jitter, len(samples))
+
+
+class LatencyProber:
+    """Параллельное измерение задержки до локаций ограниченным пулом потоков.
+
+    on_result(ProbeResult) вызывается из рабочих потоков по мере готовности.
+    cancel() снимает еще не начатые измерения и прерывает начатые
+    между замерами.
+    """
+
+    def __init__(self, on_result, config=LATENCY_PROBE_CONFIG):
+        self.on_result = on_result
+        self.workers = config["workers"]
+        self.samples = config["samples"]
+        self.timeout = config["timeout"]
+        self.targets = {}
+        self._cancelled = threading.Event()
+        self._executor = None
+
+    def start(self, targets):
+        """Запускает измерение для {ключ: ProbeEndpoint}"""
+        self.targets = dict(targets)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                            thread_name_prefix="latency-probe")
+        for key, endpoint in targets.items():
+            self._executor.submit(self._probe, key, endpoint)
+        # Потоки завершатся сами после последнего измерения
+        self._executor.shutdown(wait=False)
+
+    def cancel(self):
+        self._cancelled.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _probe(self, key, endpoint):
+        samples = []
+        error = ""
+        for _ in range(self.samples):
+            if self._cancelled.is_set():
+                return
+            try:
+                samples.append(measure_once(endpoint, self.timeout))
+            except (OSError, ssl.SSLError) as e:
+                error = str(e) or type(e).__name__
+        if not self._cancelled.is_set():
+            self.on_result(summarize(key, samples, error))
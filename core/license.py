@@ -0,0 +1,55 @@
+import threading
+import time
+from core.cli import run_cli
+from core.parsers import parse_license
+
+# Сколько секунд считаем информацию о лицензии актуальной
+LICENSE_CACHE_TTL = 30
+
+
+def _parse_license_result(result):
+    """Возвращает LicenseSnapshot или None, если команда завершилась с ошибкой"""
+    if result.returncode != 0:
+        return None
+    return parse_license(result.stdout)
+
+
+class LicenseCache:
+    """Кэш информации о лицензии с ограниченным временем жизни"""
+
+    def __init__(self, ttl=LICENSE_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._fetched_at = 0
+        # Растет при invalidate(): ответ CLI, запрошенный до сброса, не кэшируется
+        self._generation = 0
+
+    def get(self, force=False):
+        """Возвращает LicenseSnapshot, при необходимости запрашивая CLI.
+
+        Исключения subprocess пробрасываются вызывающему.
+        """
+        with self._lock:
+            if (not force and self._snapshot is not None
+                    and time.monotonic() - self._fetched_at < self.ttl):
+                return self._snapshot
+            generation = self._generation
+
+        snapshot = run_cli('license', parse=_parse_license_result)
+
+        with self._lock:
+            if generation == self._generation:
+                self._snapshot = snapshot
+                self._fetched_at = time.monotonic() if snapshot is not None else 0
+        return snapshot
+
+    def invalidate(self):
+        """Сбрасывает кэш (после входа или выхода из аккаунта)"""
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+            self._fetched_at = 0
+
+
+license_cache = LicenseCache()
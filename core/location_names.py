@@ -0,0 +1,177 @@
+# Русские названия стран и городов из list-locations для поиска в окне выбора
+# локации. Транслитерация по буквам не находит "Москва" по "Moscow" или
+# "Хельсинки" по "Helsinki", поэтому привычные названия перечислены явно.
+# Ключи - английские названия в нижнем регистре, как их выводит CLI.
+RUSSIAN_NAMES = {
+    # Страны
+    "argentina": ("аргентина",),
+    "armenia": ("армения",),
+    "australia": ("австралия",),
+    "austria": ("австрия",),
+    "azerbaijan": ("азербайджан",),
+    "belgium": ("бельгия",),
+    "bosnia and herzegovina": ("босния и герцеговина", "босния"),
+    "brazil": ("бразилия",),
+    "bulgaria": ("болгария",),
+    "cambodia": ("камбоджа",),
+    "canada": ("канада",),
+    "chile": ("чили",),
+    "china": ("китай",),
+    "colombia": ("колумбия",),
+    "croatia": ("хорватия",),
+    "cyprus": ("кипр",),
+    "czech republic": ("чехия", "чешская республика"),
+    "czechia": ("чехия",),
+    "denmark": ("дания",),
+    "egypt": ("египет",),
+    "estonia": ("эстония",),
+    "finland": ("финляндия",),
+    "france": ("франция",),
+    "georgia": ("грузия",),
+    "germany": ("германия",),
+    "greece": ("греция",),
+    "hong kong": ("гонконг",),
+    "hungary": ("венгрия",),
+    "iceland": ("исландия",),
+    "india": ("индия",),
+    "indonesia": ("индонезия",),
+    "ireland": ("ирландия",),
+    "israel": ("израиль",),
+    "italy": ("италия",),
+    "japan": ("япония",),
+    "kazakhstan": ("казахстан",),
+    "kenya": ("кения",),
+    "latvia": ("латвия",),
+    "lithuania": ("литва",),
+    "luxembourg": ("люксембург",),
+    "malaysia": ("малайзия",),
+    "mexico": ("мексика",),
+    "moldova": ("молдова", "молдавия"),
+    "netherlands": ("нидерланды", "голландия"),
+    "new zealand": ("новая зеландия",),
+    "nigeria": ("нигерия",),
+    "norway": ("норвегия",),
+    "peru": ("перу",),
+    "philippines": ("филиппины",),
+    "poland": ("польша",),
+    "portugal": ("португалия",),
+    "romania": ("румыния",),
+    "russia": ("россия",),
+    "serbia": ("сербия",),
+    "singapore": ("сингапур",),
+    "slovakia": ("словакия",),
+    "slovenia": ("словения",),
+    "south africa": ("южная африка", "юар"),
+    "south korea": ("южная корея", "корея"),
+    "spain": ("испания",),
+    "sweden": ("швеция",),
+    "switzerland": ("швейцария",),
+    "taiwan": ("тайвань",),
+    "thailand": ("таиланд", "тайланд"),
+    "turkey": ("турция",),
+    "ukraine": ("украина",),
+    "united arab emirates": ("объединенные арабские эмираты", "оаэ", "эмираты"),
+    "united kingdom": ("великобритания", "британия", "англия"),
+    "united states": ("соединенные штаты", "сша", "америка"),
+    "vietnam": ("вьетнам",),
+
+    # Города
+    "almaty": ("алматы", "алма-ата"),
+    "amsterdam": ("амстердам",),
+    "astana": ("астана",),
+    "athens": ("афины",),
+    "atlanta": ("атланта",),
+    "auckland": ("окленд",),
+    "baku": ("баку",),
+    "bangkok": ("бангкок",),
+    "barcelona": ("барселона",),
+    "beijing": ("пекин",),
+    "belgrade": ("белград",),
+    "berlin": ("берлин",),
+    "bogota": ("богота",),
+    "boston": ("бостон",),
+    "bratislava": ("братислава",),
+    "brisbane": ("брисбен",),
+    "brussels": ("брюссель",),
+    "bucharest": ("бухарест",),
+    "budapest": ("будапешт",),
+    "buenos aires": ("буэнос-айрес",),
+    "cairo": ("каир",),
+    "chicago": ("чикаго",),
+    "chisinau": ("кишинев",),
+    "copenhagen": ("копенгаген",),
+    "dallas": ("даллас",),
+    "delhi": ("дели",),
+    "denver": ("денвер",),
+    "dubai": ("дубай",),
+    "dublin": ("дублин",),
+    "dusseldorf": ("дюссельдорф",),
+    "frankfurt": ("франкфурт",),
+    "helsinki": ("хельсинки",),
+    "ho chi minh city": ("хошимин",),
+    "istanbul": ("стамбул",),
+    "jakarta": ("джакарта",),
+    "johannesburg": ("йоханнесбург",),
+    "kuala lumpur": ("куала-лумпур",),
+    "kyiv": ("киев",),
+    "lagos": ("лагос",),
+    "las vegas": ("лас-вегас",),
+    "lima": ("лима",),
+    "lisbon": ("лиссабон",),
+    "ljubljana": ("любляна",),
+    "london": ("лондон",),
+    "los angeles": ("лос-анджелес",),
+    "madrid": ("мадрид",),
+    "manchester": ("манчестер",),
+    "manila": ("манила",),
+    "marseille": ("марсель",),
+    "melbourne": ("мельбурн",),
+    "mexico city": ("мехико",),
+    "miami": ("майами",),
+    "milan": ("милан",),
+    "montreal": ("монреаль",),
+    "moscow": ("москва",),
+    "mumbai": ("мумбаи",),
+    "munich": ("мюнхен",),
+    "nairobi": ("найроби",),
+    "new york": ("нью-йорк",),
+    "nicosia": ("никосия",),
+    "osaka": ("осака",),
+    "oslo": ("осло",),
+    "palermo": ("палермо",),
+    "paris": ("париж",),
+    "perth": ("перт",),
+    "phnom penh": ("пномпень",),
+    "phoenix": ("финикс",),
+    "prague": ("прага",),
+    "reykjavik": ("рейкьявик",),
+    "riga": ("рига",),
+    "rome": ("рим",),
+    "saint petersburg": ("санкт-петербург", "петербург"),
+    "salt lake city": ("солт-лейк-сити",),
+    "san jose": ("сан-хосе",),
+    "santiago": ("сантьяго",),
+    "sao paulo": ("сан-паулу",),
+    "sarajevo": ("сараево",),
+    "seattle": ("сиэтл",),
+    "seoul": ("сеул",),
+    "shanghai": ("шанхай",),
+    "silicon valley": ("силиконовая долина", "кремниевая долина"),
+    "sofia": ("софия",),
+    "stockholm": ("стокгольм",),
+    "sydney": ("сидней",),
+    "taipei": ("тайбэй",),
+    "tallinn": ("таллин",),
+    "tbilisi": ("тбилиси",),
+    "tel aviv": ("тель-авив",),
+    "tokyo": ("токио",),
+    "toronto": ("торонто",),
+    "vancouver": ("ванкувер",),
+    "vienna": ("вена",),
+    "vilnius": ("вильнюс",),
+    "warsaw": ("варшава",),
+    "washington": ("вашингтон",),
+    "yerevan": ("ереван",),
+    "zagreb": ("загреб",),
+    "zurich": ("цюрих",),
+}
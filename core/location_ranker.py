@@ -0,0 +1,145 @@
+import threading
+import time
+from typing import NamedTuple
+from config.manager_config import LOCATION_RANK_CONFIG, TUN_WATCH_CONFIG
+from core.cli import run_cli
+from core.locations_cache import locations_cache
+
+PROC_NET_ROUTE = "/proc/net/route"
+
+
+class RankedLocation(NamedTuple):
+    """Локация с оценкой: чем меньше score, тем лучше"""
+    city: str
+    country: str
+    iso: str
+    ping: int
+    success_rate: float
+    score: float
+
+
+def network_fingerprint():
+    """Маршруты по умолчанию вне VPN: меняются при смене сети (Wi-Fi, кабель и т.д.)"""
+    tun_names = TUN_WATCH_CONFIG["interface_names"]
+    routes = []
+    try:
+        with open(PROC_NET_ROUTE) as f:
+            next(f, None)
+            for line in f:
+                fields = line.split()
+                # Destination 00000000 - маршрут по умолчанию
+                if len(fields) > 2 and fields[1] == "00000000" and fields[0] not in tun_names:
+                    routes.append((fields[0], fields[2]))
+    except OSError:
+        pass
+    return tuple(sorted(routes))
+
+
+class LocationRanker:
+    """Фоновый рейтинг локаций по пингу из list-locations и доле успешных подключений.
+
+    Доля успехов берется из истории подключений (ConnectHistory) - той же,
+    что показывает окно выбора локации. Пинги обновляются редко
+    (refresh_interval) и при смене сети; поток Tk читает готовый рейтинг
+    без запуска процессов.
+    """
+
+    def __init__(self, is_logged_in, history, config=LOCATION_RANK_CONFIG):
+        self.is_logged_in = is_logged_in
+        self.history = history
+        self.refresh_interval = config["refresh_interval"]
+        self.network_check_interval = config["network_check_interval"]
+        self.min_success_rate = config["min_success_rate"]
+        self.ranking = []
+        self.refreshed_at = None
+        self._locations = []
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Запускает фоновое обновление рейтинга"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def request_refresh(self):
+        """Просит обновить пинги при ближайшей возможности"""
+        self._wake.set()
+
+    def best(self):
+        """Город с лучшей оценкой или None, если рейтинг еще не готов"""
+        ranking = self.ranking
+        return ranking[0].city if ranking else None
+
+    def rerank(self):
+        """Пересчитывает рейтинг после новой попытки подключения без запроса к CLI"""
+        self._rank()
+
+    def success_rate(self, city):
+        """Доля успешных подключений со сглаживанием: без истории - 0.5"""
+        stats = self.history.stats(city)
+        attempts, successes = (stats.attempts, stats.successes) if stats else (0, 0)
+        return (successes + 1) / (attempts + 2)
+
+    def _rank(self):
+        ranked = []
+        for location in self._locations:
+            try:
+                ping = int(location.ping)
+            except ValueError:
+                continue
+            rate = self.success_rate(location.city)
+            score = ping / max(rate, self.min_success_rate)
+            ranked.append(RankedLocation(location.city, location.country, location.iso,
+                                         ping, rate, score))
+        ranked.sort(key=lambda item: item.score)
+        # Список заменяется целиком: читатели всегда видят согласованный рейтинг
+        self.ranking = ranked
+
+    def _refresh(self):
+        if not self.is_logged_in():
+            return False
+        try:
+            locations = run_cli('list-locations', parse=locations_cache.store_result)
+        except Exception:
+            return False
+        if not locations:
+            return False
+        self._locations = locations
+        self.refreshed_at = time.time()
+        self._rank()
+        return True
+
+    def _run(self):
+        # До первого запроса рейтинг строится по сохраненному списку локаций;
+        # свежий кэш (например, от проверки входа при запуске) не запрашивается повторно
+        next_refresh = 0
+        cached = locations_cache.load()
+        if cached is not None and not self._locations:
+            self._locations = cached.locations
+            self.refreshed_at = cached.fetched_at
+            self._rank()
+            next_refresh = time.monotonic() + max(0, self.refresh_interval - cached.age)
+
+        fingerprint = network_fingerprint()
+        while not self._stop.is_set():
+            if time.monotonic() >= next_refresh or self._wake.is_set():
+                self._wake.clear()
+                # Пока пользователь не вошел в аккаунт, пробуем снова при следующей проверке сети
+                interval = self.refresh_interval if self._refresh() else self.network_check_interval
+                next_refresh = time.monotonic() + interval
+
+            timeout = min(self.network_check_interval, max(0, next_refresh - time.monotonic()))
+            self._wake.wait(timeout)
+
+            current = network_fingerprint()
+            if current != fingerprint:
+                fingerprint = current
+                self._wake.set()
@@ -0,0 +1,117 @@
+import re
+from core.location_names import RUSSIAN_NAMES
+
+# Кириллица -> латиница: запрос "франкфурт" находит "Frankfurt"
+CYRILLIC_TO_LATIN = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ж': 'zh', 'з': 'z',
+    'и': 'i', 'й': 'y', 'к': 'k', 'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o', 'п': 'p',
+    'р': 'r', 'с': 's', 'т': 't', 'у': 'u', 'ф': 'f', 'х': 'kh', 'ц': 'ts', 'ч': 'ch',
+    'ш': 'sh', 'щ': 'shch', 'ъ': '', 'ы': 'y', 'ь': '', 'э': 'e', 'ю': 'yu', 'я': 'ya',
+}
+
+# Латиница -> кириллица для индекса: названия, которых нет в RUSSIAN_NAMES,
+# находятся хотя бы по звучанию ("Dubai" по "дуба").
+# Сочетания букв проверяются раньше одиночных букв
+LATIN_TO_CYRILLIC = [
+    ('shch', 'щ'), ('sch', 'ш'), ('sh', 'ш'), ('ch', 'ч'), ('zh', 'ж'), ('kh', 'х'),
+    ('ts', 'ц'), ('ya', 'я'), ('yu', 'ю'), ('ew', 'ью'), ('ph', 'ф'), ('th', 'т'),
+    ('a', 'а'), ('b', 'б'), ('c', 'к'), ('d', 'д'), ('e', 'е'), ('f', 'ф'), ('g', 'г'),
+    ('h', 'х'), ('i', 'и'), ('j', 'дж'), ('k', 'к'), ('l', 'л'), ('m', 'м'), ('n', 'н'),
+    ('o', 'о'), ('p', 'п'), ('q', 'к'), ('r', 'р'), ('s', 'с'), ('t', 'т'), ('u', 'у'),
+    ('v', 'в'), ('w', 'в'), ('x', 'кс'), ('y', 'и'), ('z', 'з'),
+]
+LATIN_RE = re.compile('|'.join(latin for latin, _ in LATIN_TO_CYRILLIC))
+LATIN_MAP = dict(LATIN_TO_CYRILLIC)
+
+
+def normalize(text):
+    # Дефис как пробел: "нью йорк" и "нью-йорк" - один запрос
+    return str(text).casefold().replace('ё', 'е').replace('-', ' ').strip()
+
+
+def to_latin(text):
+    return ''.join(CYRILLIC_TO_LATIN.get(char, char) for char in text)
+
+
+def to_cyrillic(text):
+    return LATIN_RE.sub(lambda match: LATIN_MAP[match.group()], text)
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class LocationIndex:
+    """Поисковый индекс строк окна выбора локации.
+
+    Строка находится по подстроке ISO, страны или города, в том числе
+    по-русски: по названию из RUSSIAN_NAMES или по транслитерации.
+    Запросы короче трех символов ищутся по началу слов, длинные - по
+    триграммам с проверкой подстроки.
+    """
+
+    def __init__(self):
+        # Ключ строки -> варианты текста полей (как есть, русские названия, кириллицей)
+        self.texts = {}
+        self.prefixes = {}
+        self.trigrams = {}
+
+    def add(self, key, *fields):
+        """Добавляет (или заменяет) строку с полями fields"""
+        self.remove(key)
+        texts = set()
+        for field in fields:
+            text = normalize(field)
+            if text:
+                texts.add(text)
+                texts.add(to_cyrillic(text))
+                texts.update(normalize(name) for name in RUSSIAN_NAMES.get(str(field).casefold(), ()))
+        self.texts[key] = texts
+        for gram in self._grams(texts):
+            self._index_for(gram).setdefault(gram, set()).add(key)
+
+    def remove(self, key):
+        texts = self.texts.pop(key, None)
+        if texts is None:
+            return
+        for gram in self._grams(texts):
+            index = self._index_for(gram)
+            keys = index.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del index[gram]
+
+    def search(self, query):
+        """Ключи подходящих строк; None - запрос пустой, подходят все"""
+        query = normalize(query)
+        if not query:
+            return None
+
+        found = set()
+        for variant in {query, to_latin(query)}:
+            if len(variant) < 3:
+                found |= self.prefixes.get(variant, set())
+                continue
+            candidates = None
+            for gram in trigrams(variant):
+                keys = self.trigrams.get(gram, set())
+                candidates = keys if candidates is None else candidates & keys
+                if not candidates:
+                    break
+            found |= {key for key in candidates or ()
+                      if any(variant in text for text in self.texts[key])}
+        return found
+
+    def _index_for(self, gram):
+        return self.prefixes if len(gram) < 3 else self.trigrams
+
+    @staticmethod
+    def _grams(texts):
+        grams = set()
+        for text in texts:
+            grams |= trigrams(text)
+            for word in text.split():
+                grams.add(word[:1])
+                grams.add(word[:2])
+        return grams
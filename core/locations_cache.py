@@ -0,0 +1,86 @@
+import json
+import os
+import threading
+import time
+from typing import NamedTuple
+from config.manager_config import LOCATIONS_CACHE_CONFIG
+from core.parsers import Location, parse_locations
+
+
+class CachedLocations(NamedTuple):
+    """Список локаций и время его получения (time.time())"""
+    locations: list
+    fetched_at: float
+
+    @property
+    def age(self):
+        return time.time() - self.fetched_at
+
+
+class LocationsCache:
+    """Разобранный вывод list-locations, сохраненный на диске.
+
+    Любой успешный вызов list-locations (проверка входа при запуске,
+    рейтинг локаций, окно выбора) обновляет кэш через store_result.
+    """
+
+    def __init__(self, path=LOCATIONS_CACHE_CONFIG["path"], config=LOCATIONS_CACHE_CONFIG):
+        self.path = os.path.expanduser(path)
+        self.fresh_for = config["fresh_for"]
+        self._lock = threading.Lock()
+        self._cached = None
+        self._loaded = False
+
+    def load(self):
+        """CachedLocations или None, если кэша нет"""
+        with self._lock:
+            if not self._loaded:
+                self._loaded = True
+                self._cached = self._read()
+            return self._cached
+
+    def is_fresh(self):
+        cached = self.load()
+        return cached is not None and cached.age < self.fresh_for
+
+    def store(self, locations):
+        """Сохраняет новый список локаций"""
+        cached = CachedLocations(list(locations), time.time())
+        with self._lock:
+            self._cached = cached
+            self._loaded = True
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'fetched_at': cached.fetched_at,
+                               'locations': [list(location) for location in cached.locations]},
+                              f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Не удалось сохранить кэш локаций: {e}")
+        return cached
+
+    def store_result(self, result):
+        """parse для run_cli: разбирает успешный list-locations и сохраняет в кэш.
+
+        Возвращает список Location (пустой, если команда завершилась с ошибкой).
+        """
+        if result.returncode != 0:
+            return []
+        locations = parse_locations(result.stdout)
+        if locations:
+            self.store(locations)
+        return locations
+
+    def _read(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            return CachedLocations([Location(*row) for row in data['locations']],
+                                   float(data['fetched_at']))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+
+locations_cache = LocationsCache()
@@ -0,0 +1,40 @@
+import json
+import os
+import threading
+from config.manager_config import MANAGER_SETTINGS_PATH
+
+DEFAULT_SETTINGS = {
+    "auto_reconnect": False
+}
+
+_lock = threading.Lock()
+
+
+def _settings_path():
+    return os.path.expanduser(MANAGER_SETTINGS_PATH)
+
+
+def load_settings():
+    """Возвращает настройки менеджера (значения по умолчанию для отсутствующих)"""
+    settings = dict(DEFAULT_SETTINGS)
+    try:
+        with open(_settings_path(), encoding='utf-8') as f:
+            settings.update(json.load(f))
+    except (OSError, ValueError):
+        pass
+    return settings
+
+
+def get_setting(key):
+    return load_settings().get(key, DEFAULT_SETTINGS.get(key))
+
+
+def save_setting(key, value):
+    """Сохраняет одну настройку"""
+    with _lock:
+        settings = load_settings()
+        settings[key] = value
+        path = _settings_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(settings, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,173 @@
+import threading
+import time
+from contextlib import contextmanager
+from core.cli import run_cli, stats_key
+
+# Команды, которые отклоняются, пока выполняется или ждет очереди ключ словаря
+# ('*' - любая другая команда). Проверка симметрична
+MUTATION_CONFLICTS = {
+    'connect': {'config set-mode', 'config set-tun-routing-mode', 'config set-socks-port',
+                'config set-dns', 'logout'},
+    'update': {'*'},
+}
+
+# Команды, для которых ожидающий запрос заменяется более новым (важно только последнее значение)
+COALESCED_MUTATIONS = {
+    'config set-mode',
+    'config set-socks-port',
+    'config set-dns',
+    'config set-tun-routing-mode',
+    'config set-update-channel',
+}
+
+# Понятные названия команд для сообщений об отказе
+MUTATION_NAMES = {
+    'connect': "подключение",
+    'disconnect': "отключение",
+    'logout': "выход из аккаунта",
+    'update': "обновление AdGuard VPN",
+}
+
+
+class MutationRejected(Exception):
+    """Команда конфликтует с уже выполняющейся или ожидающей"""
+
+
+class MutationSuperseded(Exception):
+    """Пока команда ждала очереди, ее заменил более новый запрос того же вида"""
+
+
+class _Ticket:
+    def __init__(self, key):
+        self.key = key
+        self.queued_at = time.monotonic()
+        self.superseded = False
+
+
+class _MutationStats:
+    """Счетчики одной команды: сколько ждали очереди и сколько выполнялись"""
+
+    def __init__(self):
+        self.completed = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+        self.max_run = 0.0
+
+    def to_dict(self):
+        return {
+            'completed': self.completed,
+            'coalesced': self.coalesced,
+            'rejected': self.rejected,
+            'avg_wait': self.total_wait / self.completed if self.completed else 0.0,
+            'avg_run': self.total_run / self.completed if self.completed else 0.0,
+            'max_run': self.max_run,
+        }
+
+
+def _describe(key):
+    return MUTATION_NAMES.get(key, key)
+
+
+class MutationQueue:
+    """Единственный исполнитель команд CLI, меняющих состояние.
+
+    Команды выполняются по одной в порядке поступления (в потоке
+    вызывающего), ожидающий запрос заменяется более новым того же вида,
+    а конфликтующие команды сразу отклоняются с MutationRejected.
+    """
+
+    def __init__(self, conflicts=MUTATION_CONFLICTS, coalesced=COALESCED_MUTATIONS):
+        self.conflicts = conflicts
+        self.coalesced = coalesced
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._active = None
+        self._stats = {}
+
+    def depth(self):
+        """Сколько команд выполняется и ждет очереди"""
+        with self._cond:
+            return len(self._waiting) + (1 if self._active is not None else 0)
+
+    def run(self, *args, timeout=None, parse=None):
+        """Выполняет adguardvpn-cli в очереди; для потоков, не для потока Tk"""
+        with self.hold(*args):
+            return run_cli(*args, timeout=timeout, parse=parse)
+
+    @contextmanager
+    def hold(self, *args):
+        """Занимает очередь на время блока (например, для connect через PTY или update через Popen)"""
+        ticket = self._enter(stats_key(args))
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._leave(ticket, started)
+
+    def snapshot(self):
+        """Глубина очереди и задержки по командам"""
+        with self._cond:
+            return {
+                'active': self._active.key if self._active is not None else None,
+                'waiting': [ticket.key for ticket in self._waiting],
+                'commands': {key: stats.to_dict() for key, stats in self._stats.items()}
+            }
+
+    def _conflicts(self, first, second):
+        for key, other in ((first, second), (second, first)):
+            rejected = self.conflicts.get(key, ())
+            if '*' in rejected or other in rejected:
+                return True
+        return False
+
+    def _stat(self, key):
+        if key not in self._stats:
+            self._stats[key] = _MutationStats()
+        return self._stats[key]
+
+    def _enter(self, key):
+        with self._cond:
+            for other in ([self._active] if self._active is not None else []) + self._waiting:
+                if self._conflicts(key, other.key):
+                    self._stat(key).rejected += 1
+                    raise MutationRejected(
+                        f"Нельзя выполнить {_describe(key)}, пока идет {_describe(other.key)}")
+
+            if key in self.coalesced:
+                for other in [ticket for ticket in self._waiting if ticket.key == key]:
+                    other.superseded = True
+                    self._waiting.remove(other)
+                    self._stat(key).coalesced += 1
+
+            ticket = _Ticket(key)
+            self._waiting.append(ticket)
+            self._cond.notify_all()
+            while not ticket.superseded and (self._active is not None or self._waiting[0] is not ticket):
+                self._cond.wait()
+            if ticket.superseded:
+                raise MutationSuperseded(key)
+
+            self._waiting.pop(0)
+            self._active = ticket
+            return ticket
+
+    def _leave(self, ticket, started):
+        with self._cond:
+            duration = time.monotonic() - started
+            stats = self._stat(ticket.key)
+            stats.completed += 1
+            stats.total_wait += started - ticket.queued_at
+            stats.total_run += duration
+            stats.max_run = max(stats.max_run, duration)
+            self._active = None
+            self._cond.notify_all()
+
+
+mutation_queue = MutationQueue()
+
+
+def run_mutation(*args, timeout=None, parse=None):
+    """Выполняет меняющую состояние команду adguardvpn-cli через общую очередь"""
+    return mutation_queue.run(*args, timeout=timeout, parse=parse)
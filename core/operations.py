@@ -0,0 +1,125 @@
+import os
+import signal
+import subprocess
+import threading
+import time
+
+
+def kill_process_group(process, grace=2):
+    """Завершает процесс вместе с его группой (SIGTERM, затем SIGKILL).
+
+    Процесс должен быть запущен с start_new_session=True, иначе
+    сигнал получил бы и сам менеджер - тогда завершается только процесс.
+    """
+    if process is None or process.poll() is not None:
+        return
+
+    try:
+        group = os.getpgid(process.pid)
+    except OSError:
+        return
+    own_group = group == os.getpgid(0)
+
+    def send(sig):
+        try:
+            if own_group:
+                process.send_signal(sig)
+            else:
+                os.killpg(group, sig)
+        except OSError:
+            pass
+
+    send(signal.SIGTERM)
+    try:
+        process.wait(timeout=grace)
+    except subprocess.TimeoutExpired:
+        send(signal.SIGKILL)
+        process.wait()
+
+
+class Operation:
+    """Фоновая операция (подключение, смена локации) с отменой и общим пределом времени"""
+
+    def __init__(self, name, deadline):
+        self.name = name
+        self.started_at = time.monotonic()
+        self.deadline = self.started_at + deadline
+        self._cancelled = threading.Event()
+        self._on_cancel = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def remaining(self):
+        """Сколько секунд осталось до предела"""
+        return max(0.0, self.deadline - time.monotonic())
+
+    def wait(self, timeout):
+        """Ждет timeout секунд; возвращает True, если операцию отменили раньше"""
+        return self._cancelled.wait(timeout)
+
+    def on_cancel(self, callback):
+        """Регистрирует действие при отмене (например, завершение процесса)"""
+        with self._lock:
+            if not self.cancelled:
+                self._on_cancel.append(callback)
+                return
+        callback()
+
+    def cancel(self):
+        """Отменяет операцию; повторные вызовы ничего не делают"""
+        with self._lock:
+            if self.cancelled:
+                return
+            self._cancelled.set()
+            callbacks, self._on_cancel = self._on_cancel, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+
+class OperationRunner:
+    """Запускает операции в фоне, допуская только одну активную.
+
+    on_change(operation или None) вызывается из рабочего потока при начале
+    и завершении операции - обновлять интерфейс нужно через root.after.
+    """
+
+    def __init__(self, on_change=None):
+        self.on_change = on_change
+        self.active = None
+        self._lock = threading.Lock()
+
+    def start(self, name, target, deadline, *args):
+        """Запускает target(operation, *args); возвращает None, если уже идет другая операция"""
+        with self._lock:
+            if self.active is not None:
+                return None
+            operation = self.active = Operation(name, deadline)
+
+        thread = threading.Thread(target=self._run, args=(operation, target) + args)
+        thread.daemon = True
+        thread.start()
+        return operation
+
+    def cancel(self):
+        """Отменяет активную операцию, если она есть"""
+        operation = self.active
+        if operation is not None:
+            operation.cancel()
+        return operation
+
+    def _run(self, operation, target, *args):
+        if self.on_change:
+            self.on_change(operation)
+        try:
+            target(operation, *args)
+        finally:
+            with self._lock:
+                self.active = None
+            if self.on_change:
+                self.on_change(None)
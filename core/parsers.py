@@ -0,0 +1,375 @@
+"""Разбор вывода adguardvpn-cli.
+
+Все регулярные выражения компилируются один раз при импорте, а каждая
+функция проходит по тексту команды один раз и возвращает готовую запись.
+Записи - неизменяемые NamedTuple: их дешево создавать на каждом опросе.
+"""
+import re
+from typing import NamedTuple
+
+ANSI_ESCAPE = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+
+# status / status --verbose
+_CONNECTED_INDICATORS = re.compile('|'.join((
+    'connected to',
+    'successfully connected',
+    'you are connected',
+    'подключен к',
+    'running on tun',
+    'tun mode'
+)))
+_DISCONNECTED_INDICATORS = re.compile('|'.join((
+    'not connected',
+    'disconnected',
+    'no connection',
+    'не подключен',
+    'отключен'
+)))
+_LOCATION_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'Connected to (.+?) in',
+    r'Connected to (.+?)\n',
+    r'Connected to (.+?)\.',
+    r'Location: (.+)',
+    r'подключен к (.+?) в',
+    r'Подключено к (.+?) в',
+    r'Successfully Connected to (.+)',
+    r'You are connected to (.+?)\.'
+)]
+_KNOWN_LOCATIONS = {
+    'frankfurt': 'Frankfurt',
+    'london': 'London',
+    'new york': 'New York',
+    'singapore': 'Singapore',
+    'tokyo': 'Tokyo',
+    'amsterdam': 'Amsterdam',
+    'paris': 'Paris',
+    'moscow': 'Moscow'
+}
+_KEY_VALUE_PATTERN = re.compile(r'^[ \t]*([A-Za-z][A-Za-z0-9 _/-]*?)[ \t]*:[ \t]*(\S.*?)[ \t]*$', re.MULTILINE)
+
+# license
+_EMAIL_PATTERN = re.compile(r'Logged in as (.+)$')
+_DEVICES_PATTERN = re.compile(r'Up to (\d+) devices')
+_TRAFFIC_PATTERN = re.compile(r'(\d+\.?\d*)\s*(GB|MB)', re.IGNORECASE)
+_DATE_PATTERN = re.compile(r'(\d{4}-\d{2}-\d{2})')
+
+# -v / check-update
+_VERSION_PATTERN = re.compile(r'v?(\d+\.\d+\.\d+)')
+_UPDATE_VERSION_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'AdGuard VPN[^\n]*v?(\d+\.\d+\.\d+)[^\n]*is now available',
+    r'v?(\d+\.\d+\.\d+)[^\n]*is now available',
+    r'version[^\n]*v?(\d+\.\d+\.\d+)',
+    r'v?(\d+\.\d+\.\d+)[^\n]*available',
+    r'обновление[^\n]*v?(\d+\.\d+\.\d+)'
+)]
+_UPDATE_AVAILABLE_PHRASES = (
+    'is now available',
+    'update available',
+    'available',
+    'доступно',
+    'можно обновиться',
+    'new version'
+)
+_UP_TO_DATE_PHRASES = (
+    'latest version',
+    'up to date',
+    'актуальна',
+    'you are using the latest'
+)
+
+
+class StatusInfo(NamedTuple):
+    """Разобранный вывод adguardvpn-cli status [--verbose]"""
+    connected: bool = False
+    location: str = ""
+    mode: str = None
+    server: str = None
+    details: dict = None
+
+
+class LicenseSnapshot(NamedTuple):
+    """Разобранный вывод adguardvpn-cli license"""
+    email: str = None
+    license_type: str = "Free"
+    devices: str = None
+    traffic_left: str = None
+    expiry_date: str = None
+
+
+class Location(NamedTuple):
+    """Строка таблицы adguardvpn-cli list-locations"""
+    iso: str
+    country: str
+    city: str
+    ping: str
+
+
+class ConfigInfo(NamedTuple):
+    """Разобранный вывод adguardvpn-cli config show"""
+    mode: str = None
+    update_channel: str = None
+    values: dict = None
+
+
+class UpdateCheck(NamedTuple):
+    """Разобранный вывод adguardvpn-cli check-update"""
+    available: bool = False
+    up_to_date: bool = False
+    version: str = None
+
+
+def clean_ansi_codes(text):
+    """Очищает текст от ANSI escape sequences"""
+    return ANSI_ESCAPE.sub('', text)
+
+
+def check_if_connected(text):
+    """Точно проверяет, подключен ли VPN (текст уже без ANSI кодов)"""
+    text_lower = text.lower()
+    if _DISCONNECTED_INDICATORS.search(text_lower):
+        return False
+    return _CONNECTED_INDICATORS.search(text_lower) is not None
+
+
+def find_location(text):
+    """Ищет название локации в выводе status (текст уже без ANSI кодов)"""
+    for pattern in _LOCATION_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return match.group(1).strip()
+
+    text_lower = text.lower()
+    for key, value in _KNOWN_LOCATIONS.items():
+        if key in text_lower:
+            return value
+
+    return ""
+
+
+def parse_status(text):
+    """Разбирает вывод status или status --verbose в StatusInfo"""
+    clean_text = ANSI_ESCAPE.sub('', text)
+    details = {}
+    if ':' in clean_text:
+        # Пары "Ключ: значение" есть только в подробном выводе
+        details = {key.lower(): value for key, value in _KEY_VALUE_PATTERN.findall(clean_text)}
+
+    if not check_if_connected(clean_text):
+        return StatusInfo(connected=False, details=details)
+
+    location = find_location(clean_text)
+    server = details.get('server') or details.get('endpoint')
+    if not location:
+        location = details.get('location') or details.get('connected to') or server or ""
+
+    mode = details.get('mode')
+    if mode:
+        mode = mode.upper()
+    else:
+        text_lower = clean_text.lower()
+        if 'tun' in text_lower:
+            mode = "TUN"
+        elif 'socks' in text_lower:
+            mode = "SOCKS"
+
+    return StatusInfo(connected=True, location=location, mode=mode, server=server, details=details)
+
+
+def parse_license(text):
+    """Разбирает вывод adguardvpn-cli license в LicenseSnapshot за один проход"""
+    email = None
+    license_type = "Free"
+    devices = None
+    traffic_left = None
+    expiry_date = None
+
+    for line in ANSI_ESCAPE.sub('', text).split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        line_lower = line.lower()
+
+        # Email пользователя
+        if "Logged in as" in line:
+            email_match = _EMAIL_PATTERN.search(line)
+            if email_match:
+                email = email_match.group(1).strip().replace('(', '').replace(')', '')
+
+        # Тип лицензии
+        if "FREE version" in line:
+            license_type = "Free"
+        elif "premium" in line_lower:
+            license_type = "Premium"
+
+        # Количество устройств
+        if "devices simultaneously" in line:
+            devices_match = _DEVICES_PATTERN.search(line)
+            if devices_match:
+                devices = devices_match.group(1)
+
+        # Оставшийся трафик
+        if traffic_left is None and "left" in line_lower:
+            traffic_match = _TRAFFIC_PATTERN.search(line)
+            if traffic_match:
+                traffic_left = f"{traffic_match.group(1)} {traffic_match.group(2)}"
+
+        # Дата окончания
+        if "renewed on" in line_lower or "expires on" in line_lower or "valid until" in line_lower:
+            date_match = _DATE_PATTERN.search(line)
+            if date_match:
+                expiry_date = date_match.group(1)
+
+    # Если есть дата окончания - это не Free
+    if expiry_date and license_type == "Free":
+        license_type = "Premium"
+
+    return LicenseSnapshot(email, license_type, devices, traffic_left, expiry_date)
+
+
+class LocationColumns(NamedTuple):
+    """Начала колонок таблицы list-locations, найденные по заголовку"""
+    iso: int
+    country: int
+    city: int
+    ping: int
+
+
+def parse_location_header(line):
+    """Находит колонки по заголовку ISO/COUNTRY/CITY/PING; None - это не заголовок"""
+    columns = LocationColumns(line.find('ISO'), line.find('COUNTRY'), line.find('CITY'), line.find('PING'))
+    if min(columns) < 0 or list(columns) != sorted(columns):
+        return None
+    return columns
+
+
+def parse_location_line(line):
+    """Разбирает строку таблицы локаций (без ANSI кодов) по словам в Location.
+
+    Город из нескольких слов так не отделить от страны - это запасной вариант
+    для строк, где страна шире своей колонки или заголовка нет.
+    """
+    parts = line.split()
+    if len(parts) < 4:
+        return None
+
+    # Пинг - последнее число
+    ping = parts[-1]
+    if not ping.isdigit():
+        return None
+
+    # Все что между ISO и ping - это страна и город
+    middle_parts = parts[1:-1]
+    # Город - последнее слово, страна - все остальное
+    return Location(parts[0], ' '.join(middle_parts[:-1]), middle_parts[-1], ping)
+
+
+def parse_locations(text):
+    """Разбирает вывод adguardvpn-cli list-locations в список Location"""
+    return list(iter_locations(text))
+
+
+def iter_locations(text):
+    """Выдает Location по мере разбора вывода list-locations.
+
+    Колонки определяются один раз по заголовку, затем каждая строка
+    разбирается срезами за один проход; ANSI коды удаляются один раз для всего текста.
+    Если шире колонки только город, он берется от начала своей колонки;
+    остальные строки, не совпадающие с колонками, разбираются по словам.
+    """
+    lines = iter(ANSI_ESCAPE.sub('', text).split('\n'))
+
+    columns = None
+    for line in lines:
+        if 'ISO' in line and 'COUNTRY' in line and 'CITY' in line:
+            columns = parse_location_header(line)
+            break
+    else:
+        return
+
+    if columns is not None:
+        iso_at, country_at, city_at, ping_at = columns
+    else:
+        # Заголовок без PING или в другом порядке - только разбор по словам
+        iso_at = country_at = city_at = ping_at = 0
+
+    for line in lines:
+        # Пробелы в начале строки не убираем - от них отсчитываются колонки
+        line = line.rstrip()
+
+        # Граница каждой колонки должна приходиться на пробел
+        if (ping_at and len(line) > ping_at and line[country_at - 1] == ' '
+                and line[city_at - 1] == ' ' and line[ping_at - 1] == ' '):
+            ping = line[ping_at:].strip()
+            iso = line[iso_at:country_at].strip()
+            city = line[city_at:ping_at].strip()
+            if ping.isdigit() and iso and city:
+                yield Location(iso, line[country_at:city_at].strip(), city, ping)
+                continue
+
+        # Город шире своей колонки: ISO и страна на месте, пинг сдвинут вправо -
+        # город от начала колонки до последнего слова
+        if (ping_at and len(line) > city_at and line[country_at - 1] == ' '
+                and line[city_at - 1] == ' ' and line[city_at] != ' '):
+            city, _, ping = line[city_at:].rpartition(' ')
+            iso = line[iso_at:country_at].strip()
+            if ping.isdigit() and iso and city.strip():
+                yield Location(iso, line[country_at:city_at].strip(), city.strip(), ping)
+                continue
+
+        if not line:
+            continue
+        # Останавливаем парсинг когда начинаются инструкции
+        if 'You can connect to a location by running' in line or 'You are using a FREE version' in line:
+            break
+        if line.lstrip().startswith(('===', '---')):
+            continue
+
+        location = parse_location_line(line)
+        if location:
+            yield location
+
+
+def parse_config_show(text):
+    """Разбирает вывод adguardvpn-cli config show в ConfigInfo"""
+    values = {key.strip().lower(): value
+              for key, value in _KEY_VALUE_PATTERN.findall(ANSI_ESCAPE.sub('', text))}
+
+    channel = values.get('update channel')
+    if channel:
+        channel = channel.lower()
+        if 'beta' in channel:
+            channel = 'beta'
+        elif 'release' in channel:
+            channel = 'release'
+
+    mode = values.get('mode')
+    return ConfigInfo(mode=mode.upper() if mode else None, update_channel=channel, values=values)
+
+
+def parse_version(text):
+    """Извлекает версию из вывода adguardvpn-cli -v (или очищенный текст, если формат неизвестен)"""
+    version_output = ANSI_ESCAPE.sub('', text).strip()
+    version_match = _VERSION_PATTERN.search(version_output)
+    if version_match:
+        return version_match.group(1)
+    return version_output or None
+
+
+def parse_update_version(text):
+    """Извлекает версию доступного обновления из текста (без ANSI кодов)"""
+    for pattern in _UPDATE_VERSION_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return f"v{match.group(1)}"
+    return None
+
+
+def parse_check_update(text):
+    """Разбирает вывод adguardvpn-cli check-update в UpdateCheck"""
+    clean_text = ANSI_ESCAPE.sub('', text)
+    text_lower = clean_text.lower()
+    return UpdateCheck(
+        available=any(phrase in text_lower for phrase in _UPDATE_AVAILABLE_PHRASES),
+        up_to_date=any(phrase in text_lower for phrase in _UP_TO_DATE_PHRASES),
+        version=parse_update_version(clean_text)
+    )
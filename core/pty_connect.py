@@ -0,0 +1,251 @@
+import codecs
+import fcntl
+import os
+import pty
+import re
+import select
+import subprocess
+import termios
+import threading
+import time
+from config.manager_config import CONNECT_CONFIG
+from core.cli import cli_command
+from core.connect_machine import AUTHENTICATING, ESTABLISHING
+from core.operations import kill_process_group
+from core.parsers import clean_ansi_codes
+
+# Запросы, на которые менеджер отвечает сам
+_PASSWORD_PROMPT = re.compile(r'\[sudo\] password for|password( for [^:]*)?:\s*$', re.IGNORECASE)
+_CONFIRM_PROMPT = re.compile(r'[\[(]\s*y\s*/\s*n\s*[\])]', re.IGNORECASE)
+_PASSWORD_REJECTED = re.compile(r'sorry, try again|incorrect password', re.IGNORECASE)
+
+# Сколько дочитывать вывод после выхода CLI: терминал может остаться открытым
+# у запущенного им фонового процесса, и конца вывода тогда не будет
+_DRAIN_AFTER_EXIT = 1.0
+_READ_POLL = 0.2
+
+
+def _acquire_controlling_terminal():
+    """preexec_fn: делает терминал (stdin) управляющим для новой сессии.
+
+    sudo читает пароль из /dev/tty - без управляющего терминала он
+    завершается с "a terminal is required". setsid уже выполнен
+    через start_new_session=True.
+    """
+    fcntl.ioctl(0, termios.TIOCSCTTY, 0)
+
+
+class PtyConnect:
+    """adguardvpn-cli connect под псевдотерминалом, которым владеет менеджер.
+
+    Вывод построчно передается в on_output, подтверждения (y/n) отвечаются
+    автоматически. На запрос пароля sudo сначала отправляется
+    cached_password(), а если его нет или он отвергнут - пароль
+    запрашивается через ask_password(retry). Если ask_password вернул None,
+    подключение прерывается.
+    Интерфейс (args, start, exit_code, output, cleanup) тот же, что у TerminalConnect.
+
+    on_phase(этап) - единственный источник этапов процесса CLI: establishing
+    при запуске, authenticating только на время запроса пароля у
+    пользователя и снова establishing после ответа.
+
+    switch=True - смена локации: disconnect и connect выполняются одной
+    командой в том же терминале, поэтому пароль запрашивается один раз,
+    а отмена завершает обе команды.
+    """
+
+    def __init__(self, location=None, on_output=None, ask_password=None, switch=False,
+                 on_phase=None, cached_password=None, config=CONNECT_CONFIG):
+        self.args = ('connect', '-l', location) if location else ('connect',)
+        self.command = cli_command(*self.args)
+        if switch:
+            # Ошибка disconnect не мешает подключению: туннель мог уже оборваться
+            self.command = ['sh', '-c', '"$0" disconnect; exec "$0" "$@"'] + self.command
+        self.on_output = on_output
+        self.ask_password = ask_password
+        self.cached_password = cached_password
+        self.on_phase = on_phase
+        self.read_size = config["pty_read_size"]
+        self.process = None
+        self.cancelled = False
+        self._master = None
+        self._master_lock = threading.Lock()
+        self._exit_code = None
+        self._reader_done = False
+        self._chunks = []
+        self._line = ""
+        self._password_rejected = False
+        self._thread = None
+        self._waiter = None
+
+    def start(self):
+        """Запускает CLI под псевдотерминалом и поток чтения его вывода"""
+        self._master, slave = pty.openpty()
+        # Без эха: автоматические ответы не должны попадать в лог
+        attrs = termios.tcgetattr(slave)
+        attrs[3] &= ~termios.ECHO
+        termios.tcsetattr(slave, termios.TCSANOW, attrs)
+        try:
+            self.process = subprocess.Popen(
+                self.command,
+                stdin=slave,
+                stdout=slave,
+                stderr=slave,
+                start_new_session=True,
+                preexec_fn=_acquire_controlling_terminal,
+                close_fds=True
+            )
+        except Exception:
+            os.close(self._master)
+            self._master = None
+            raise
+        finally:
+            os.close(slave)
+
+        # До запуска потока чтения: authenticating может прийти только после этого этапа
+        self._phase(ESTABLISHING)
+        self._thread = threading.Thread(target=self._read_output)
+        self._thread.daemon = True
+        self._thread.start()
+        # Код возврата ждется отдельно от вывода: конец вывода может не наступить
+        self._waiter = threading.Thread(target=self._wait_process)
+        self._waiter.daemon = True
+        self._waiter.start()
+
+    @property
+    def exit_code(self):
+        """Код возврата CLI или None, если команда еще работает.
+
+        Код появляется после того, как дочитан вывод, поэтому последняя
+        строка (текст ошибки) к этому моменту уже есть в output().
+        """
+        return self._exit_code if self._reader_done else None
+
+    def output(self):
+        """Весь вывод CLI (без ANSI кодов), полученный на данный момент"""
+        return clean_ansi_codes(''.join(self._chunks))
+
+    def terminate(self):
+        """Завершает CLI и все запущенные им процессы (sudo и т.д.)"""
+        kill_process_group(self.process)
+
+    def wait_exit(self, timeout):
+        """Ждет, пока CLI завершится сам; False - не завершился за timeout"""
+        if self._waiter is not None:
+            self._waiter.join(timeout)
+        return self._exit_code is not None
+
+    def cleanup(self):
+        """Закрывает псевдотерминал; процесс не завершается (для этого есть terminate).
+
+        После успешного подключения в группе процессов CLI может работать
+        сам VPN, поэтому сигналы ей отправляются только при отмене.
+        """
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self._close_master()
+
+    def _close_master(self):
+        with self._master_lock:
+            master, self._master = self._master, None
+        if master is not None:
+            os.close(master)
+
+    def _wait_process(self):
+        self._exit_code = self.process.wait()
+
+    def _read_output(self):
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        drain_until = None
+        try:
+            while True:
+                master = self._master
+                if master is None:
+                    # Терминал закрыт через cleanup
+                    break
+                if self._exit_code is not None and drain_until is None:
+                    drain_until = time.monotonic() + _DRAIN_AFTER_EXIT
+                if drain_until is not None and time.monotonic() >= drain_until:
+                    break
+                try:
+                    ready, _, _ = select.select([master], [], [], _READ_POLL)
+                    if not ready:
+                        if drain_until is not None:
+                            # CLI завершился, а вывода больше нет
+                            break
+                        continue
+                    data = os.read(master, self.read_size)
+                except (OSError, ValueError):
+                    # EIO: все процессы закрыли терминал
+                    break
+                if not data:
+                    break
+                self._feed(decoder.decode(data))
+        finally:
+            if self._line.strip():
+                self._emit(self._line)
+            self._close_master()
+            # Вывод дочитан: код возврата можно показывать
+            self._reader_done = True
+
+    def _feed(self, text):
+        """Разбивает вывод на строки и отвечает на запросы в незавершенной строке"""
+        self._chunks.append(text)
+        lines = (self._line + text).split('\n')
+        self._line = lines.pop()
+        for line in lines:
+            self._emit(line)
+            # Запрос мог прийти вместе с переводом строки
+            if _CONFIRM_PROMPT.search(clean_ansi_codes(line)):
+                self._write("y\n")
+
+        pending = clean_ansi_codes(self._line)
+        if _PASSWORD_PROMPT.search(pending):
+            self._line = ""
+            self._answer_password()
+        elif _CONFIRM_PROMPT.search(pending):
+            self._emit(self._line)
+            self._line = ""
+            self._write("y\n")
+
+    def _emit(self, line):
+        # Спиннеры перерисовывают строку через \r - показываем последнее состояние
+        line = clean_ansi_codes(line).split('\r')
+        line = next((part for part in reversed(line) if part.strip()), "").strip()
+        if not line:
+            return
+        if _PASSWORD_REJECTED.search(line):
+            self._password_rejected = True
+        if self.on_output:
+            self.on_output(line)
+
+    def _answer_password(self):
+        rejected, self._password_rejected = self._password_rejected, False
+        password = None
+        if self.cached_password is not None and not rejected:
+            password = self.cached_password()
+        if password:
+            # Сохраненный пароль отправляется без остановки на этапе authenticating
+            self._write(password + "\n")
+            return
+
+        self._phase(AUTHENTICATING)
+        password = self.ask_password(rejected) if self.ask_password else None
+        if password is None:
+            self.cancelled = True
+            self.terminate()
+            return
+        self._write(password + "\n")
+        self._phase(ESTABLISHING)
+
+    def _phase(self, phase):
+        if self.on_phase:
+            self.on_phase(phase)
+
+    def _write(self, text):
+        if self._master is None:
+            return
+        try:
+            os.write(self._master, text.encode('utf-8'))
+        except OSError:
+            pass
@@ -0,0 +1,207 @@
+import queue
+import threading
+import time
+from config.manager_config import STATUS_POLL_CONFIG
+from core.cli import run_cli
+from core.connection_state import ConnectionState
+from core.license import license_cache
+from core.parsers import StatusInfo, parse_status
+
+
+def parse_status_result(result):
+    """Преобразует результат adguardvpn-cli status --verbose в StatusInfo"""
+    if result.returncode != 0:
+        return StatusInfo(connected=False)
+    return parse_status(result.stdout)
+
+
+def fetch_status_info():
+    """Один вызов status --verbose: подключение, локация, режим и сервер.
+
+    Блокирующий вызов, не для потока Tk. Одновременные вызовы из опроса
+    и из потоков подключения разделяют один процесс.
+    """
+    return run_cli('status', '--verbose', parse=parse_status_result)
+
+
+def fetch_status():
+    """Запрашивает статус подключения в виде ConnectionState"""
+    try:
+        info = fetch_status_info()
+    except Exception as e:
+        return ConnectionState(connected=False, error=str(e))
+
+    if not info.connected:
+        return ConnectionState(connected=False)
+    # Если CLI не сообщил локацию, она остается пустой: подпись - дело интерфейса,
+    # а location используется для переподключения и истории
+    return ConnectionState(connected=True, location=info.location or "")
+
+
+class PollScheduler:
+    """Вычисляет интервал до следующего опроса.
+
+    Во время подключения/отключения опрашивает часто, а пока состояние
+    не меняется - увеличивает интервал до потолка.
+    """
+
+    def __init__(self, config=STATUS_POLL_CONFIG):
+        self.base_interval = config["base_interval"]
+        self.fast_interval = config["fast_interval"]
+        self.max_interval = config["max_interval"]
+        self.backoff_factor = config["backoff_factor"]
+        self.transition_timeout = config["transition_timeout"]
+        self.watched_max_interval = config["watched_max_interval"]
+        # True, когда за состоянием следит TunWatcher и опрос нужен только как запасной
+        self.link_watched = False
+        self.current_interval = self.base_interval
+        self.spawn_count = 0
+        self._transition_until = 0
+        self._lock = threading.Lock()
+
+    def in_transition(self):
+        """Идет ли сейчас подключение/отключение"""
+        return time.monotonic() < self._transition_until
+
+    def begin_transition(self):
+        """Включает быстрый опрос на время подключения/отключения"""
+        with self._lock:
+            self._transition_until = time.monotonic() + self.transition_timeout
+            self.current_interval = self.fast_interval
+
+    def reset(self):
+        """Сбрасывает накопленное увеличение интервала"""
+        with self._lock:
+            if not self.in_transition():
+                self.current_interval = self.base_interval
+
+    def record_poll(self, changed):
+        """Учитывает результат опроса и возвращает интервал до следующего"""
+        with self._lock:
+            self.spawn_count += 1
+
+            if self.in_transition():
+                if changed:
+                    # Переход завершился - возвращаемся к обычному ритму
+                    self._transition_until = 0
+                    self.current_interval = self.base_interval
+                else:
+                    self.current_interval = self.fast_interval
+            elif changed:
+                self.current_interval = self.base_interval
+            else:
+                ceiling = self.watched_max_interval if self.link_watched else self.max_interval
+                self.current_interval = min(self.current_interval * self.backoff_factor,
+                                            ceiling)
+
+            return self.current_interval
+
+
+class StatusPoller:
+    """Фоновый поток, опрашивающий CLI и передающий результаты в очередь.
+
+    Поток Tk только забирает готовые сообщения из self.queue:
+    ('status', ConnectionState) и ('license', LicenseSnapshot или None).
+    """
+
+    def __init__(self, is_logged_in, config=STATUS_POLL_CONFIG):
+        self.is_logged_in = is_logged_in
+        self.license_interval = config["license_interval"]
+        self.scheduler = PollScheduler(config)
+        self.queue = queue.Queue()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._license_requested = True
+        self._thread = None
+        self.link_watcher = None
+
+    @property
+    def current_interval(self):
+        """Текущий интервал опроса в секундах"""
+        return self.scheduler.current_interval
+
+    @property
+    def spawn_count(self):
+        """Сколько раз поток опроса запрашивал статус у CLI"""
+        return self.scheduler.spawn_count
+
+    def start(self):
+        """Запускает поток опроса"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Останавливает поток опроса"""
+        self._stop.set()
+        self._wake.set()
+
+    def request_refresh(self):
+        """Просит выполнить опрос статуса немедленно"""
+        self._wake.set()
+
+    def request_license_refresh(self):
+        """Просит обновить информацию о лицензии при ближайшем опросе"""
+        self._license_requested = True
+        self._wake.set()
+
+    def begin_transition(self):
+        """Сообщает о начале подключения/отключения и сразу опрашивает статус"""
+        self.scheduler.begin_transition()
+        self._wake.set()
+
+    def attach_link_watcher(self, watcher):
+        """Подключает TunWatcher, чьи события заменяют частый опрос"""
+        self.link_watcher = watcher
+
+    def on_link_change(self, link_up):
+        """Вызывается TunWatcher: проверяем изменение одним запросом к CLI"""
+        self._wake.set()
+
+    def _link_state_agrees(self, state):
+        """Совпадает ли состояние tun-интерфейса с ответом CLI.
+
+        Если совпадает (режим TUN или отключено), изменения заметит
+        TunWatcher и опрос CLI может быть редким. В режиме SOCKS
+        интерфейса нет, поэтому остается обычный опрос.
+        """
+        watcher = self.link_watcher
+        if watcher is None or watcher.method is None:
+            return False
+        return state.connected == watcher.link_up
+
+    def reset_backoff(self):
+        """Возвращает обычный интервал опроса (например, при фокусе окна)"""
+        if self.scheduler.current_interval > self.scheduler.base_interval:
+            self.scheduler.reset()
+            self._wake.set()
+
+    def _run(self):
+        last_state = None
+        license_fetched_at = 0
+        while not self._stop.is_set():
+            state = fetch_status()
+            self.queue.put(('status', state))
+            self.scheduler.link_watched = self._link_state_agrees(state)
+            interval = self.scheduler.record_poll(state != last_state)
+            last_state = state
+
+            now = time.monotonic()
+            if self._license_requested or now - license_fetched_at >= self.license_interval:
+                self._license_requested = False
+                license_fetched_at = now
+                self.queue.put(('license', self._fetch_license()))
+
+            self._wake.wait(interval)
+            self._wake.clear()
+
+    def _fetch_license(self):
+        """Получает информацию о лицензии, если пользователь авторизован"""
+        if not self.is_logged_in():
+            return None
+        try:
+            return license_cache.get()
+        except Exception:
+            return None
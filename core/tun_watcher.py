@@ -0,0 +1,116 @@
+import os
+import socket
+import threading
+from config.manager_config import TUN_WATCH_CONFIG
+
+SYS_CLASS_NET = "/sys/class/net"
+
+# Константы netlink из linux/rtnetlink.h
+RTMGRP_LINK = 0x1
+IFF_UP = 0x1
+
+
+def list_tun_links(names=None):
+    """Возвращает множество поднятых tun-интерфейсов AdGuard VPN (имена из interface_names)"""
+    if names is None:
+        names = TUN_WATCH_CONFIG["interface_names"]
+
+    links = set()
+    for name in names:
+        try:
+            with open(os.path.join(SYS_CLASS_NET, name, "flags")) as f:
+                flags = int(f.read().strip(), 16)
+        except (OSError, ValueError):
+            continue
+        if flags & IFF_UP:
+            links.add(name)
+    return links
+
+
+class TunWatcher:
+    """Следит за появлением и исчезновением tun-интерфейса без запуска процессов.
+
+    Использует события netlink, а если они недоступны - периодически
+    просматривает /sys/class/net. При изменении вызывает on_change(link_up).
+    """
+
+    def __init__(self, on_change, config=TUN_WATCH_CONFIG):
+        self.on_change = on_change
+        self.names = config["interface_names"]
+        self.sysfs_interval = config["sysfs_interval"]
+        self.links = set()
+        self.method = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def available(self):
+        """Может ли наблюдатель работать на этой системе"""
+        return os.path.isdir(SYS_CLASS_NET)
+
+    @property
+    def link_up(self):
+        """Есть ли сейчас поднятый tun-интерфейс"""
+        return bool(self.links)
+
+    def start(self):
+        """Запускает наблюдение в фоновом потоке"""
+        if self._thread is not None or not self.available:
+            return
+        self.links = list_tun_links(self.names)
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Останавливает наблюдение"""
+        self._stop.set()
+
+    def _run(self):
+        sock = self._open_netlink()
+        if sock is not None:
+            self.method = "netlink"
+            try:
+                self._watch_netlink(sock)
+            finally:
+                sock.close()
+        else:
+            self.method = "sysfs"
+            self._watch_sysfs()
+
+    def _open_netlink(self):
+        """Подписывается на события изменения сетевых интерфейсов"""
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+            sock.bind((0, RTMGRP_LINK))
+            sock.settimeout(1.0)
+            return sock
+        except (AttributeError, OSError):
+            return None
+
+    def _watch_netlink(self, sock):
+        while not self._stop.is_set():
+            try:
+                sock.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                # Сокет сломался - продолжаем через sysfs
+                self.method = "sysfs"
+                self._watch_sysfs()
+                return
+            # Содержимое сообщения не разбираем: достаточно пересчитать tun-интерфейсы
+            self._check_links()
+
+    def _watch_sysfs(self):
+        while not self._stop.wait(self.sysfs_interval):
+            self._check_links()
+
+    def _check_links(self):
+        links = list_tun_links(self.names)
+        if links == self.links:
+            return
+        was_up = bool(self.links)
+        self.links = links
+        if bool(links) != was_up:
+            self.on_change(bool(links))
@@ -1,11 +1,4 @@
-import re
-import subprocess
-import os
-
-def clean_ansi_codes(text):
-    """Очищает текст от ANSI escape sequences"""
-    ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-    return ansi_escape.sub('', text)
+from core.parsers import clean_ansi_codes, find_location
 
 def detect_os():
     """Определяет операционную систему"""
@@ -46,74 +39,6 @@ def get_download_url(os_type, arch, version):
     download_url = f"https://github.com/AdguardTeam/AdGuardVPNCLI/releases/download/v{version}-release/{package_name}"
     return download_url, package_name
 
-def check_if_connected(text):
-    """Точно проверяет, подключен ли VPN"""
-    text_lower = text.lower()
-
-    connected_indicators = [
-        'connected to',
-        'successfully connected',
-        'you are connected',
-        'подключен к',
-        'running on tun',
-        'tun mode'
-    ]
-
-    disconnected_indicators = [
-        'not connected',
-        'disconnected',
-        'no connection',
-        'не подключен',
-        'отключен'
-    ]
-
-    for indicator in disconnected_indicators:
-        if indicator in text_lower:
-            return False
-
-    for indicator in connected_indicators:
-        if indicator in text_lower:
-            return True
-
-    return False
-
 def clean_location_output(text):
     """Очищает вывод локации от лишних данных, включая ANSI коды"""
-    ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-    clean_text = ansi_escape.sub('', text)
-
-    patterns = [
-        r'Connected to (.+?) in',
-        r'connected to (.+?) in',
-        r'Connected to (.+?)\n',
-        r'Connected to (.+?)\.',
-        r'Location: (.+)',
-        r'подключен к (.+?) в',
-        r'Подключено к (.+?) в',
-        r'Successfully Connected to (.+)',
-        r'You are connected to (.+?)\.'
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, clean_text, re.IGNORECASE)
-        if match:
-            location = match.group(1).strip()
-            return location
-
-    locations = {
-        'frankfurt': 'Frankfurt',
-        'london': 'London',
-        'new york': 'New York',
-        'singapore': 'Singapore',
-        'tokyo': 'Tokyo',
-        'amsterdam': 'Amsterdam',
-        'paris': 'Paris',
-        'moscow': 'Moscow'
-    }
-
-    clean_text_lower = clean_text.lower()
-    for key, value in locations.items():
-        if key in clean_text_lower:
-            return value
-
-    return ""
\ No newline at end of file
+    return find_location(clean_ansi_codes(text))
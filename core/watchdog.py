@@ -0,0 +1,106 @@
+import random
+import time
+from config.manager_config import WATCHDOG_CONFIG
+from core.manager_settings import get_setting
+
+# Подписи для отображения, которые не являются локациями для connect -l
+PLACEHOLDER_LOCATIONS = {"подключено", "🟢"}
+
+
+def is_known_location(location):
+    """Локация пригодна для connect -l: не пустая и не подпись"""
+    return bool(location) and location.strip().lower() not in PLACEHOLDER_LOCATIONS
+
+
+class ReconnectWatchdog:
+    """Решает, когда и куда переподключаться после неожиданного обрыва VPN.
+
+    Получает состояния из ConnectionStateStore (observe) и возвращает
+    локацию для переподключения; сами попытки выполняет менеджер
+    по плану из plan(): задержка растет экспоненциально со случайным
+    отклонением, а после нескольких неудач берется следующая локация.
+    """
+
+    def __init__(self, fallback_locations=None, config=WATCHDOG_CONFIG):
+        # fallback_locations() - города в порядке предпочтения (рейтинг локаций)
+        self.fallback_locations = fallback_locations
+        self.base_delay = config["base_delay"]
+        self.backoff_factor = config["backoff_factor"]
+        self.max_delay = config["max_delay"]
+        self.jitter = config["jitter"]
+        self.attempts_per_location = config["attempts_per_location"]
+        self.max_fallbacks = config["fallback_locations"]
+        self.max_duration = config["max_duration"]
+        self.suppress_timeout = config["suppress_timeout"]
+        self.last_location = None
+        self._previous = None
+        # До какого момента (time.monotonic()) отключение считается ожидаемым
+        self._suppressed_until = 0.0
+
+    @property
+    def enabled(self):
+        return bool(get_setting("auto_reconnect"))
+
+    def suppress(self):
+        """Следующее отключение ожидаемо (пользователь отключился, вышел, меняет локацию).
+
+        Если отключения так и не было (команда не выполнилась), пометка
+        снимается через unsuppress() или сама истекает через suppress_timeout.
+        """
+        self._suppressed_until = time.monotonic() + self.suppress_timeout
+
+    def unsuppress(self):
+        """Ожидаемое отключение не состоялось - снова следим за обрывами"""
+        self._suppressed_until = 0.0
+
+    @property
+    def suppressed(self):
+        return time.monotonic() < self._suppressed_until
+
+    def observe(self, state):
+        """Учитывает новое состояние; возвращает локацию, если нужно переподключиться"""
+        # Ошибка опроса CLI - это не обрыв туннеля
+        if state.error:
+            return None
+
+        previous, self._previous = self._previous, state
+        if state.connected:
+            self.unsuppress()
+            if is_known_location(state.location):
+                self.last_location = state.location
+            return None
+
+        if previous is None or not previous.connected:
+            return None
+        if self.suppressed:
+            self.unsuppress()
+            return None
+        if not self.enabled:
+            return None
+        if self.last_location:
+            return self.last_location
+        return previous.location if is_known_location(previous.location) else None
+
+    def delay(self, attempt):
+        """Задержка перед попыткой attempt (с нуля) с экспоненциальным ростом и jitter.
+
+        Для каждой новой локации отсчет попыток начинается заново.
+        """
+        delay = self.base_delay * self.backoff_factor ** attempt
+        return min(delay * (1 + random.uniform(-self.jitter, self.jitter)), self.max_delay)
+
+    def plan(self, location):
+        """Попытки переподключения: (номер, локация, задержка перед попыткой)"""
+        locations = [location]
+        if self.fallback_locations is not None:
+            for city in self.fallback_locations():
+                if len(locations) > self.max_fallbacks:
+                    break
+                if city.lower() not in (known.lower() for known in locations):
+                    locations.append(city)
+
+        attempt = 0
+        for city in locations:
+            for location_attempt in range(self.attempts_per_location):
+                yield attempt, city, self.delay(location_attempt)
+                attempt += 1
@@ -1,24 +1,35 @@
 #!/usr/bin/env python3
 import tkinter as tk
+import atexit
+import locale
 import os
 import sys
-import subprocess
+from core.cli import run_cli, is_cli_installed
+from core.cli_stats import cli_stats
+from core.locations_cache import locations_cache
 from core.auth import SudoAuthWindow, AuthWindow
 from core.installer import AdGuardVPNInstaller
 from ui.windows.manager import AdGuardVPNManager
 
+# Путь, по которому при выходе сохраняется статистика вызовов adguardvpn-cli
+CLI_STATS_ENV = "ADGUARDVPN_MANAGER_CLI_STATS"
+
+def dump_cli_stats(path):
+    """Сохраняет статистику вызовов CLI при выходе"""
+    try:
+        cli_stats.dump_json(path)
+    except OSError as e:
+        print(f"Не удалось сохранить статистику CLI: {e}")
+
 def is_adguard_installed():
-    return os.path.exists("/usr/local/bin/adguardvpn-cli")
+    return is_cli_installed()
 
 def is_logged_in():
     """Проверяет, авторизован ли пользователь"""
     try:
-        result = subprocess.run(
-            ['adguardvpn-cli', 'list-locations'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
+        result = run_cli('list-locations', timeout=5)
+        # Вывод не пропадает зря: им заполняется кэш окна выбора локации
+        locations_cache.store_result(result)
         return result.returncode == 0
     except:
         return False
@@ -28,6 +39,16 @@ def main():
         print("Не запускайте скрипт напрямую от root!")
         sys.exit(1)
 
+    # Названия в окне выбора локации сортируются по правилам языка системы
+    try:
+        locale.setlocale(locale.LC_COLLATE, '')
+    except locale.Error:
+        pass
+
+    stats_path = os.environ.get(CLI_STATS_ENV)
+    if stats_path:
+        atexit.register(dump_cli_stats, os.path.expanduser(stats_path))
+
     # Сначала проверяем установлен ли AdGuard VPN
     if not is_adguard_installed():
         print("AdGuard VPN не установлен, запуск установки...")
@@ -53,6 +74,8 @@ def main():
     root = tk.Tk()
     app = AdGuardVPNManager(root)
     app.run()
+    # Окно закрыто во время подключения - не оставляем CLI работать без менеджера
+    app.operations.cancel()
 
 if __name__ == "__main__":
     main()
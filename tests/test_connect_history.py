@@ -0,0 +1,73 @@
+import os
+import random
+import statistics
+import tempfile
+import unittest
+from core.connect_history import (OUTCOME_CANCELLED, OUTCOME_CONNECTED, OUTCOME_FAILED,
+                                  ConnectHistory, RunningMedian)
+
+
+class RunningMedianTest(unittest.TestCase):
+    def test_empty(self):
+        self.assertIsNone(RunningMedian(5).value)
+
+    def test_odd_and_even_counts(self):
+        median = RunningMedian(5)
+        for value in (3, 1, 2):
+            median.add(value)
+        self.assertEqual(median.value, 2)
+        median.add(10)
+        self.assertEqual(median.value, 2.5)
+
+    def test_window_matches_statistics_median(self):
+        median = RunningMedian(7)
+        values = [random.uniform(0, 30) for _ in range(100)]
+        for count, value in enumerate(values, 1):
+            median.add(value)
+            self.assertAlmostEqual(median.value, statistics.median(values[max(0, count - 7):count]))
+
+    def test_equal_values_leave_window(self):
+        median = RunningMedian(2)
+        for value in (5, 5, 1, 1):
+            median.add(value)
+        self.assertEqual(median.value, 1)
+
+
+class ConnectHistoryTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "history", "connect_history.sqlite3")
+        self.history = self.open()
+
+    def open(self):
+        history = ConnectHistory(self.path, {"median_window": 3})
+        self.addCleanup(history.close)
+        return history
+
+    def test_unknown_location(self):
+        self.assertIsNone(self.history.stats("Paris"))
+
+    def test_counts_are_upserted_per_location(self):
+        self.history.record("Paris", 0, 4, OUTCOME_CONNECTED)
+        self.history.record("paris", 10, 12, OUTCOME_CONNECTED)
+        self.history.record("PARIS", 20, 30, OUTCOME_FAILED, "timeout")
+        self.history.record("Paris", 40, 41, OUTCOME_CANCELLED)
+
+        stats = self.history.stats("Paris")
+        self.assertEqual((stats.attempts, stats.successes, stats.median_time), (3, 2, 3))
+        self.assertAlmostEqual(stats.success_rate, 2 / 3)
+
+    def test_stats_survive_reopen(self):
+        for started_at, connect_time in enumerate((8, 1, 2, 3)):
+            self.history.record("Tokyo", started_at, started_at + connect_time, OUTCOME_CONNECTED)
+        self.history.record("Tokyo", 0, 1, OUTCOME_FAILED)
+        self.history.close()
+
+        stats = self.open().stats("tokyo")
+        # Медиана только по последним median_window успешным подключениям
+        self.assertEqual((stats.attempts, stats.successes, stats.median_time), (5, 4, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+from unittest import mock
+from core.license import LicenseCache
+from core.parsers import LicenseSnapshot
+
+
+class LicenseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = LicenseCache(ttl=30)
+
+    def test_result_is_cached(self):
+        with mock.patch("core.license.run_cli", return_value=LicenseSnapshot("a@example.com")) as run_cli:
+            self.cache.get()
+            self.assertEqual(self.cache.get().email, "a@example.com")
+        self.assertEqual(run_cli.call_count, 1)
+
+    def test_invalidate_during_fetch_discards_stale_result(self):
+        def fetch_and_logout(*args, **kwargs):
+            # Выход из аккаунта, пока license еще выполняется
+            self.cache.invalidate()
+            return LicenseSnapshot("old@example.com")
+
+        with mock.patch("core.license.run_cli", side_effect=fetch_and_logout):
+            self.assertEqual(self.cache.get().email, "old@example.com")
+        with mock.patch("core.license.run_cli", return_value=LicenseSnapshot("new@example.com")) as run_cli:
+            self.assertEqual(self.cache.get().email, "new@example.com")
+        self.assertEqual(run_cli.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from core.location_search import LocationIndex
+from core.parsers import parse_locations
+
+LOCATIONS_OUTPUT = """ISO   COUNTRY              CITY                           PING ESTIMATE
+FI    Finland              Helsinki                       40
+RU    Russia               Moscow                         60
+RU    Russia               Saint Petersburg               58
+FR    France               Paris                          30
+DE    Germany              Frankfurt                      25
+US    United States        New York                       95
+AE    United Arab Emirates Dubai                          144
+JP    Japan                Tokyo                          250
+"""
+
+
+class LocationIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = LocationIndex()
+        for location in parse_locations(LOCATIONS_OUTPUT):
+            self.index.add(location.city, location.iso, location.country, location.city)
+
+    def search(self, query):
+        return sorted(self.index.search(query))
+
+    def test_empty_query_matches_everything(self):
+        self.assertIsNone(self.index.search(""))
+        self.assertIsNone(self.index.search("   "))
+
+    def test_latin_substring(self):
+        self.assertEqual(self.search("furt"), ["Frankfurt"])
+        self.assertEqual(self.search("united"), ["Dubai", "New York"])
+
+    def test_short_query_matches_word_prefix(self):
+        self.assertEqual(self.search("de"), ["Frankfurt"])
+        self.assertEqual(self.search("p"), ["Paris", "Saint Petersburg"])
+
+    def test_russian_city_names(self):
+        self.assertEqual(self.search("хельс"), ["Helsinki"])
+        self.assertEqual(self.search("Москва"), ["Moscow"])
+        self.assertEqual(self.search("париж"), ["Paris"])
+        self.assertEqual(self.search("петербург"), ["Saint Petersburg"])
+        self.assertEqual(self.search("нью-йорк"), ["New York"])
+        self.assertEqual(self.search("нью йорк"), ["New York"])
+        self.assertEqual(self.search("токио"), ["Tokyo"])
+
+    def test_russian_country_names(self):
+        self.assertEqual(self.search("Россия"), ["Moscow", "Saint Petersburg"])
+        self.assertEqual(self.search("германия"), ["Frankfurt"])
+        self.assertEqual(self.search("сша"), ["New York"])
+        self.assertEqual(self.search("оаэ"), ["Dubai"])
+
+    def test_transliteration_without_alias(self):
+        self.assertEqual(self.search("франкф"), ["Frankfurt"])
+        self.assertEqual(self.search("дуба"), ["Dubai"])
+
+    def test_remove(self):
+        self.index.remove("Moscow")
+        self.assertEqual(self.search("москва"), [])
+        self.assertEqual(self.search("россия"), ["Saint Petersburg"])
+
+
+if __name__ == '__main__':
+    unittest.main()
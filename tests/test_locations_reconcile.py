@@ -0,0 +1,60 @@
+import unittest
+from ui.windows.locations import COLUMNS, plan_reconcile
+
+FRANKFURT = (("DE", "frankfurt"), ("DE", "Germany", "Frankfurt", "25", "—", "—"))
+PARIS = (("FR", "paris"), ("FR", "France", "Paris", "30", "—", "—"))
+TOKYO = (("JP", "tokyo"), ("JP", "Japan", "Tokyo", "250", "—", "—"))
+
+
+def apply(current, operations):
+    """Применяет план к списку строк так же, как окно выбора к таблице"""
+    rows = list(current.items())
+    for operation in operations:
+        kind, key = operation[0], operation[1]
+        keys = [row_key for row_key, _ in rows]
+        if kind == 'delete':
+            del rows[keys.index(key)]
+        elif kind == 'update':
+            values = rows[keys.index(key)][1]
+            rows[keys.index(key)] = (key, tuple(operation[2].get(column, value)
+                                                for column, value in zip(COLUMNS, values)))
+        elif kind == 'insert':
+            rows.insert(operation[2], (key, operation[3]))
+        elif kind == 'move':
+            rows.insert(operation[2], rows.pop(keys.index(key)))
+    return rows
+
+
+class PlanReconcileTest(unittest.TestCase):
+    def check(self, current, target):
+        operations = plan_reconcile(dict(current), target)
+        self.assertEqual(apply(dict(current), operations), target)
+        return operations
+
+    def test_unchanged(self):
+        self.assertEqual(self.check([FRANKFURT, PARIS], [FRANKFURT, PARIS]), [])
+
+    def test_delete_and_insert_in_place(self):
+        operations = self.check([FRANKFURT, PARIS], [FRANKFURT, TOKYO])
+        self.assertEqual(operations, [('delete', PARIS[0]), ('insert', TOKYO[0], 1, TOKYO[1])])
+
+    def test_update_changed_cells_only(self):
+        faster = (PARIS[0], PARIS[1][:3] + ("12",) + PARIS[1][4:])
+        operations = self.check([FRANKFURT, PARIS], [FRANKFURT, faster])
+        self.assertEqual(operations, [('update', PARIS[0], {"Ping": "12"})])
+
+    def test_reordered_rows_are_moved(self):
+        operations = self.check([FRANKFURT, PARIS, TOKYO], [TOKYO, FRANKFURT, PARIS])
+        self.assertEqual([operation[0] for operation in operations], ['move'] * 3)
+
+    def test_duplicate_keys_are_shown_once(self):
+        duplicate = (PARIS[0], ("FR", "France", "Paris", "45", "—", "—"))
+        operations = plan_reconcile({}, [PARIS, FRANKFURT, duplicate])
+        self.assertEqual(operations, [('insert', PARIS[0], 0, PARIS[1]),
+                                      ('insert', FRANKFURT[0], 1, FRANKFURT[1])])
+        self.assertEqual(self.check([PARIS, FRANKFURT], [PARIS, FRANKFURT]), [])
+        self.assertEqual(plan_reconcile(dict([PARIS, FRANKFURT]), [PARIS, FRANKFURT, duplicate]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
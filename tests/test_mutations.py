@@ -0,0 +1,106 @@
+import threading
+import unittest
+from core.mutations import MutationQueue, MutationRejected, MutationSuperseded
+
+
+class MutationQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.queue = MutationQueue()
+
+    def start_holder(self, *args):
+        """Занимает очередь в отдельном потоке до release.set()"""
+        entered, release = threading.Event(), threading.Event()
+        outcome = []
+
+        def hold():
+            try:
+                with self.queue.hold(*args):
+                    entered.set()
+                    release.wait(5)
+                outcome.append('done')
+            except (MutationRejected, MutationSuperseded) as e:
+                outcome.append(type(e).__name__)
+
+        thread = threading.Thread(target=hold, daemon=True)
+        thread.start()
+        self.addCleanup(release.set)
+        return thread, entered, release, outcome
+
+    def wait_for_depth(self, depth):
+        for _ in range(500):
+            if self.queue.depth() == depth:
+                return
+            threading.Event().wait(0.01)
+        self.fail(f"depth {self.queue.depth()} != {depth}")
+
+    def test_conflict_is_rejected_both_ways(self):
+        thread, entered, release, _ = self.start_holder('connect')
+        self.assertTrue(entered.wait(5))
+        with self.assertRaises(MutationRejected):
+            with self.queue.hold('config', 'set-mode', 'SOCKS'):
+                pass
+        release.set()
+        thread.join(5)
+
+        thread, entered, release, _ = self.start_holder('logout')
+        self.assertTrue(entered.wait(5))
+        with self.assertRaises(MutationRejected):
+            with self.queue.hold('connect'):
+                pass
+        release.set()
+        thread.join(5)
+        self.assertEqual(self.queue.snapshot()['commands']['connect']['rejected'], 1)
+
+    def test_update_conflicts_with_everything(self):
+        thread, entered, release, _ = self.start_holder('update')
+        self.assertTrue(entered.wait(5))
+        with self.assertRaises(MutationRejected):
+            with self.queue.hold('disconnect'):
+                pass
+        release.set()
+        thread.join(5)
+
+    def test_waiting_request_is_coalesced(self):
+        holder, entered, release, _ = self.start_holder('disconnect')
+        self.assertTrue(entered.wait(5))
+
+        first, _, _, first_outcome = self.start_holder('config', 'set-dns', '1.1.1.1')
+        self.wait_for_depth(2)
+        second, second_entered, second_release, second_outcome = self.start_holder(
+            'config', 'set-dns', '8.8.8.8')
+        first.join(5)
+        self.assertEqual(first_outcome, ['MutationSuperseded'])
+        self.assertEqual(self.queue.snapshot()['waiting'], ['config set-dns'])
+
+        release.set()
+        self.assertTrue(second_entered.wait(5))
+        second_release.set()
+        second.join(5)
+        holder.join(5)
+        self.assertEqual(second_outcome, ['done'])
+        stats = self.queue.snapshot()['commands']['config set-dns']
+        self.assertEqual((stats['completed'], stats['coalesced']), (1, 1))
+
+    def test_runs_in_arrival_order(self):
+        holder, entered, release, _ = self.start_holder('disconnect')
+        self.assertTrue(entered.wait(5))
+        order = []
+        threads = []
+        for key in ('config set-mode', 'config set-dns'):
+            thread = threading.Thread(target=self._run_and_log, args=(key.split(), order))
+            thread.start()
+            threads.append(thread)
+            self.wait_for_depth(len(threads) + 1)
+        release.set()
+        for thread in threads + [holder]:
+            thread.join(5)
+        self.assertEqual(order, ['set-mode', 'set-dns'])
+        self.assertEqual(self.queue.depth(), 0)
+
+    def _run_and_log(self, args, order):
+        with self.queue.hold(*args):
+            order.append(args[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import glob
+import json
+import os
+import unittest
+from core.parsers import parse_locations, parse_status
+
+# Эталоны: NAME.txt - вывод CLI, NAME.json - ожидаемый разбор.
+# Новые эталоны можно записать с настоящего CLI через FAKE_ADGUARDVPN_RECORD
+# (см. tools/fake_adguardvpn_cli.py)
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "samples")
+
+
+def load_samples(pattern):
+    for text_path in sorted(glob.glob(os.path.join(SAMPLES_DIR, pattern))):
+        with open(text_path, encoding='utf-8') as f:
+            text = f.read()
+        with open(os.path.splitext(text_path)[0] + ".json", encoding='utf-8') as f:
+            yield os.path.basename(text_path), text, json.load(f)
+
+
+class ParseLocationsTest(unittest.TestCase):
+    def test_samples(self):
+        samples = list(load_samples("list-locations*.txt"))
+        self.assertTrue(samples)
+        for name, text, expected in samples:
+            with self.subTest(sample=name):
+                self.assertEqual([list(location) for location in parse_locations(text)], expected)
+
+    def test_city_wider_than_column(self):
+        text = ("ISO   COUNTRY              CITY                           PING ESTIMATE\n"
+                "US    United States        Washington Dulles International 88\n")
+        self.assertEqual(parse_locations(text)[0].city, "Washington Dulles International")
+
+    def test_country_wider_than_column_falls_back_to_words(self):
+        text = ("ISO   COUNTRY              CITY                           PING ESTIMATE\n"
+                "BA    Bosnia and Herzegovina Sarajevo                       80\n")
+        self.assertEqual(tuple(parse_locations(text)[0]), ("BA", "Bosnia and Herzegovina", "Sarajevo", "80"))
+
+    def test_without_header(self):
+        self.assertEqual(parse_locations("DE Germany Frankfurt 25\n"), [])
+
+
+class ParseStatusTest(unittest.TestCase):
+    def test_samples(self):
+        samples = list(load_samples("status*.txt"))
+        self.assertTrue(samples)
+        for name, text, expected in samples:
+            with self.subTest(sample=name):
+                status = parse_status(text)
+                self.assertEqual({field: getattr(status, field) for field in expected}, expected)
+
+    def test_verbose_details(self):
+        status = parse_status("Connected to FRANKFURT in TUN mode, running on tun0\nInterface: tun0\n")
+        self.assertEqual(status.details["interface"], "tun0")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from core.status_poller import PollScheduler
+
+CONFIG = {
+    "base_interval": 2,
+    "fast_interval": 0.5,
+    "max_interval": 10,
+    "backoff_factor": 2,
+    "transition_timeout": 30,
+    "watched_max_interval": 60,
+}
+
+
+class PollSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = PollScheduler(CONFIG)
+
+    def test_backoff_up_to_ceiling(self):
+        intervals = [self.scheduler.record_poll(changed=False) for _ in range(5)]
+        self.assertEqual(intervals, [4, 8, 10, 10, 10])
+        self.assertEqual(self.scheduler.spawn_count, 5)
+
+    def test_change_resets_interval(self):
+        self.scheduler.record_poll(changed=False)
+        self.scheduler.record_poll(changed=False)
+        self.assertEqual(self.scheduler.record_poll(changed=True), 2)
+
+    def test_watched_link_raises_ceiling(self):
+        self.scheduler.link_watched = True
+        intervals = [self.scheduler.record_poll(changed=False) for _ in range(6)]
+        self.assertEqual(intervals, [4, 8, 16, 32, 60, 60])
+
+    def test_transition_polls_fast_until_change(self):
+        self.scheduler.record_poll(changed=False)
+        self.scheduler.begin_transition()
+        self.assertTrue(self.scheduler.in_transition())
+        self.assertEqual(self.scheduler.record_poll(changed=False), 0.5)
+        self.assertEqual(self.scheduler.record_poll(changed=False), 0.5)
+        self.assertEqual(self.scheduler.record_poll(changed=True), 2)
+        self.assertFalse(self.scheduler.in_transition())
+
+    def test_reset_keeps_fast_interval_during_transition(self):
+        self.scheduler.begin_transition()
+        self.scheduler.reset()
+        self.assertEqual(self.scheduler.current_interval, 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from core import tun_watcher
+
+
+class ListTunLinksTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        patcher = mock.patch.object(tun_watcher, "SYS_CLASS_NET", self.root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def add_link(self, name, flags):
+        os.makedirs(os.path.join(self.root, name))
+        with open(os.path.join(self.root, name, "flags"), "w") as f:
+            f.write(f"{flags:#x}\n")
+
+    def test_only_configured_names_count(self):
+        self.add_link("tun0", 0x1091)
+        # tun другого VPN (OpenVPN, WireGuard и т.д.) - не подключение AdGuard VPN
+        self.add_link("tun1", 0x1091)
+        self.add_link("eth0", 0x1003)
+        self.assertEqual(tun_watcher.list_tun_links(["tun0"]), {"tun0"})
+
+    def test_down_or_missing_link(self):
+        self.add_link("tun0", 0x1090)
+        self.assertEqual(tun_watcher.list_tun_links(["tun0", "tun5"]), set())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from unittest import mock
+from core.connection_state import ConnectionState
+from core.watchdog import ReconnectWatchdog, is_known_location
+
+CONFIG = {
+    "base_delay": 2,
+    "backoff_factor": 2,
+    "max_delay": 10,
+    "jitter": 0.3,
+    "attempts_per_location": 2,
+    "fallback_locations": 2,
+    "max_duration": 900,
+    "suppress_timeout": 120,
+}
+
+
+class ReconnectWatchdogTest(unittest.TestCase):
+    def setUp(self):
+        self.ranked = ["Frankfurt", "helsinki", "Paris", "London"]
+        self.watchdog = ReconnectWatchdog(lambda: self.ranked, CONFIG)
+        patcher = mock.patch("core.watchdog.get_setting", return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_delay_backoff_without_jitter(self):
+        with mock.patch("core.watchdog.random.uniform", return_value=0):
+            self.assertEqual([self.watchdog.delay(attempt) for attempt in range(4)], [2, 4, 8, 10])
+
+    def test_delay_jitter_bounds_and_ceiling(self):
+        with mock.patch("core.watchdog.random.uniform", return_value=0.3):
+            self.assertAlmostEqual(self.watchdog.delay(1), 5.2)
+            self.assertEqual(self.watchdog.delay(2), 10)
+        with mock.patch("core.watchdog.random.uniform", return_value=-0.3):
+            self.assertAlmostEqual(self.watchdog.delay(0), 1.4)
+        for _ in range(100):
+            self.assertTrue(1.4 <= self.watchdog.delay(0) <= 2.6)
+
+    def test_plan_falls_back_to_ranked_locations(self):
+        with mock.patch("core.watchdog.random.uniform", return_value=0):
+            plan = list(self.watchdog.plan("Helsinki"))
+        # Текущая локация не повторяется, берется не больше fallback_locations запасных
+        self.assertEqual(plan, [(0, "Helsinki", 2), (1, "Helsinki", 4),
+                                (2, "Frankfurt", 2), (3, "Frankfurt", 4),
+                                (4, "Paris", 2), (5, "Paris", 4)])
+
+    def test_plan_without_ranking(self):
+        watchdog = ReconnectWatchdog(config=CONFIG)
+        self.assertEqual([city for _, city, _ in watchdog.plan("Tokyo")], ["Tokyo", "Tokyo"])
+
+    def test_unexpected_drop_reconnects_to_last_location(self):
+        self.watchdog.observe(ConnectionState(True, "Paris"))
+        self.assertEqual(self.watchdog.observe(ConnectionState(False)), "Paris")
+
+    def test_suppressed_drop_is_ignored_once(self):
+        self.watchdog.observe(ConnectionState(True, "Paris"))
+        self.watchdog.suppress()
+        self.assertTrue(self.watchdog.suppressed)
+        self.assertIsNone(self.watchdog.observe(ConnectionState(False)))
+        self.assertFalse(self.watchdog.suppressed)
+
+    def test_unsuppress_restores_watching(self):
+        self.watchdog.observe(ConnectionState(True, "Paris"))
+        self.watchdog.suppress()
+        self.watchdog.unsuppress()
+        self.assertEqual(self.watchdog.observe(ConnectionState(False)), "Paris")
+
+    def test_poll_error_is_not_a_drop(self):
+        self.watchdog.observe(ConnectionState(True, "Paris"))
+        self.assertIsNone(self.watchdog.observe(ConnectionState(False, error="timeout")))
+
+    def test_placeholder_location_is_not_remembered(self):
+        self.assertFalse(is_known_location("Подключено"))
+        self.assertFalse(is_known_location(""))
+        self.watchdog.observe(ConnectionState(True, "🟢"))
+        self.assertIsNone(self.watchdog.observe(ConnectionState(False)))
+
+
+if __name__ == '__main__':
+    unittest.main()
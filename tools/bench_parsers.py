@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Микро-бенчмарк разбора вывода adguardvpn-cli.
+
+Сравнивает core.parsers со старыми функциями, которые на каждый вызов
+компилировали регулярные выражения и заново разбивали тот же текст.
+
+Правильность разбора проверяют тесты по эталонам: python3 -m unittest tests.test_parsers
+
+Запуск из корня проекта: python3 tools/bench_parsers.py [число повторов]
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import parsers
+
+STATUS_OUTPUT = "\x1b[32mConnected to FRANKFURT in TUN mode, running on tun0\x1b[0m\n"
+
+LICENSE_OUTPUT = (
+    "\x1b[1mLogged in as user@example.com\x1b[0m\n"
+    "You are using the FREE version\n"
+    "Up to 2 devices simultaneously\n"
+    "You have 2.85 GB left\n"
+    "Upgrade to get unlimited traffic\n"
+)
+
+LOCATIONS_OUTPUT = (
+    "ISO   COUNTRY              CITY                           PING ESTIMATE\n"
+    + "".join(f"\x1b[0mDE    Germany              Frankfurt                      {i % 300}\n" for i in range(60))
+    + "You can connect to a location by running \"adguardvpn-cli connect -l <city, country or ISO code>\"\n"
+)
+
+# Синтетическая таблица на несколько тысяч строк с городами из нескольких слов
+_LARGE_ROWS = [("US", "United States", "New York"), ("US", "United States", "Los Angeles"),
+               ("HK", "Hong Kong", "Hong Kong"), ("DE", "Germany", "Frankfurt"),
+               ("AE", "United Arab Emirates", "Dubai"), ("US", "United States", "Salt Lake City")]
+LARGE_LOCATIONS_OUTPUT = (
+    f"{'ISO':<6}{'COUNTRY':<21}{'CITY':<31}PING ESTIMATE\n"
+    + "".join(f"\x1b[0m{iso:<6}{country:<21}{city:<31}{i % 300}\n"
+              for i, (iso, country, city) in enumerate(_LARGE_ROWS * 800))
+    + "You can connect to a location by running \"adguardvpn-cli connect -l <city, country or ISO code>\"\n"
+)
+
+VERSION_OUTPUT = "AdGuard VPN CLI v1.5.10\n"
+
+# --- Старые реализации (до core.parsers) ---
+
+def legacy_clean(text):
+    ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+    return ansi_escape.sub('', text)
+
+
+def legacy_status(text):
+    clean_text = re.compile(r'\x1B\[[0-9;]*m').sub('', text)
+    text_lower = clean_text.lower()
+    connected = False
+    for indicator in ['not connected', 'disconnected', 'no connection', 'не подключен', 'отключен']:
+        if indicator in text_lower:
+            return False, ""
+    for indicator in ['connected to', 'successfully connected', 'you are connected',
+                      'подключен к', 'running on tun', 'tun mode']:
+        if indicator in text_lower:
+            connected = True
+            break
+    if not connected:
+        return False, ""
+    clean_text = legacy_clean(clean_text)
+    for pattern in [r'Connected to (.+?) in', r'connected to (.+?) in', r'Connected to (.+?)\n',
+                    r'Connected to (.+?)\.', r'Location: (.+)']:
+        match = re.search(pattern, clean_text, re.IGNORECASE)
+        if match:
+            return True, match.group(1).strip()
+    return True, ""
+
+
+def legacy_license_field(text, predicate, pattern):
+    for line in legacy_clean(text).split('\n'):
+        line = line.strip()
+        if predicate(line):
+            match = re.search(pattern, line, re.IGNORECASE)
+            if match:
+                return match.group(1)
+    return None
+
+
+def legacy_license(text):
+    # Старый update_email_display разбирал один и тот же вывод четырьмя функциями
+    email = legacy_license_field(text, lambda l: "Logged in as" in l, r'Logged in as (.+)$')
+    license_type = "Free"
+    for line in legacy_clean(text).split('\n'):
+        if "FREE version" in line:
+            license_type = "Free"
+            break
+        elif "PREMIUM" in line.upper():
+            license_type = "Premium"
+            break
+    traffic = legacy_license_field(text, lambda l: "left" in l.lower(), r'(\d+\.?\d*\s*(?:GB|MB))')
+    expiry = legacy_license_field(text, lambda l: "renewed on" in l or "expires on" in l.lower(),
+                                  r'(\d{4}-\d{2}-\d{2})')
+    return email, license_type, traffic, expiry
+
+
+def legacy_locations(text):
+    rows = []
+    header_found = False
+    for line in legacy_clean(text).strip().split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if 'ISO' in line and 'COUNTRY' in line and 'CITY' in line:
+            header_found = True
+            continue
+        if header_found:
+            if 'You can connect to a location by running' in line:
+                break
+            line = legacy_clean(line)
+            parts = ' '.join(line.split()).split()
+            if len(parts) < 4 or not parts[-1].isdigit():
+                continue
+            rows.append((parts[0], ' '.join(parts[1:-2]), parts[-2], parts[-1]))
+    return rows
+
+
+def legacy_version(text):
+    version_output = legacy_clean(text).strip()
+    match = re.search(r'v?(\d+\.\d+\.\d+)', version_output)
+    return match.group(1) if match else version_output
+
+
+# (название, старая реализация, новая, во сколько раз меньше повторов)
+CASES = [
+    ("status", lambda: legacy_status(STATUS_OUTPUT), lambda: parsers.parse_status(STATUS_OUTPUT), 1),
+    ("license", lambda: legacy_license(LICENSE_OUTPUT), lambda: parsers.parse_license(LICENSE_OUTPUT), 1),
+    ("list-locations", lambda: legacy_locations(LOCATIONS_OUTPUT),
+     lambda: parsers.parse_locations(LOCATIONS_OUTPUT), 1),
+    ("locations x4800", lambda: legacy_locations(LARGE_LOCATIONS_OUTPUT),
+     lambda: parsers.parse_locations(LARGE_LOCATIONS_OUTPUT), 100),
+    ("-v", lambda: legacy_version(VERSION_OUTPUT), lambda: parsers.parse_version(VERSION_OUTPUT), 1),
+]
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    print(f"{'вывод':<16}{'старый, мкс':>14}{'новый, мкс':>14}{'ускорение':>12}")
+    for name, legacy, current, divisor in CASES:
+        repeat = max(1, number // divisor)
+        legacy_time = timeit.timeit(legacy, number=repeat) / repeat
+        current_time = timeit.timeit(current, number=repeat) / repeat
+        print(f"{name:<16}{legacy_time * 1e6:>14.1f}{current_time * 1e6:>14.1f}"
+              f"{legacy_time / current_time:>11.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""Имитация adguardvpn-cli для бенчмарков и проверки сценариев без сети.
+
+Менеджер запускается с подменой CLI через переменную окружения:
+
+    ADGUARDVPN_CLI=$PWD/tools/fake_adguardvpn_cli.py python3 main.py
+
+Состояние (вход, подключение, лицензия, таблица локаций, настройки) хранится
+в JSON файле FAKE_ADGUARDVPN_STATE (по умолчанию во временном каталоге)
+и меняется самими командами: connect, disconnect, login, logout, config set-*.
+Управление имитацией:
+
+    fake_adguardvpn_cli.py --sim show               показать состояние
+    fake_adguardvpn_cli.py --sim reset [сценарий]   начальное состояние (+ JSON сценария)
+    fake_adguardvpn_cli.py --sim set ключ=значение  изменить поле (значение - JSON)
+
+Задержки, зависания и ошибки задаются по подкомандам ("status", "config get-mode")
+или через "default":
+
+    --sim set 'latency={"default": 0.05, "connect": 2}'
+    --sim set 'hang=["license"]'
+    --sim set 'fail={"connect": 1}'
+
+Запись и воспроизведение реальных ответов:
+
+    FAKE_ADGUARDVPN_RECORD=каталог  - проксирует вызовы в настоящий CLI
+        (FAKE_ADGUARDVPN_REAL, по умолчанию /usr/local/bin/adguardvpn-cli)
+        и сохраняет вывод, код возврата и длительность в каталог;
+    FAKE_ADGUARDVPN_REPLAY=каталог  - отвечает последними записанными ответами
+        с исходной задержкой (множитель FAKE_ADGUARDVPN_REPLAY_SPEED, 0 - без задержки).
+
+Адреса email в записи заменяются на user@example.com.
+"""
+import fcntl
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+STATE_ENV = "FAKE_ADGUARDVPN_STATE"
+RECORD_ENV = "FAKE_ADGUARDVPN_RECORD"
+REPLAY_ENV = "FAKE_ADGUARDVPN_REPLAY"
+REPLAY_SPEED_ENV = "FAKE_ADGUARDVPN_REPLAY_SPEED"
+REAL_CLI_ENV = "FAKE_ADGUARDVPN_REAL"
+
+DEFAULT_STATE_PATH = os.path.join(tempfile.gettempdir(), "fake-adguardvpn-cli", "state.json")
+DEFAULT_REAL_CLI = "/usr/local/bin/adguardvpn-cli"
+# Сколько ответов на одну команду хранить в записи
+SAMPLES_PER_COMMAND = 20
+# Сколько "висит" команда из списка hang
+HANG_SECONDS = 3600
+
+GREEN = "\x1b[32m"
+BOLD = "\x1b[1m"
+RESET = "\x1b[0m"
+
+DEFAULT_STATE = {
+    "logged_in": True,
+    "email": "user@example.com",
+    "license": "free",
+    "devices": 2,
+    "traffic_left": "2.85 GB",
+    "expiry_date": "2027-01-01",
+    "connected": None,
+    "interface": "tun0",
+    "mode": "TUN",
+    "socks_port": 1080,
+    "dns": "default",
+    "tun_routing_mode": "AUTO",
+    "update_channel": "release",
+    "version": "1.5.10",
+    "latest_version": "1.5.10",
+    "sudo_prompt": False,
+    "sudo_password": "password",
+    "login_delay": 3,
+    "locations": [
+        ["DE", "Germany", "Frankfurt", 25],
+        ["NL", "Netherlands", "Amsterdam", 31],
+        ["FR", "France", "Paris", 38],
+        ["GB", "United Kingdom", "London", 42],
+        ["FI", "Finland", "Helsinki", 55],
+        ["US", "United States", "New York", 110],
+        ["JP", "Japan", "Tokyo", 250],
+        ["SG", "Singapore", "Singapore", 270]
+    ],
+    "latency": {"default": 0.05},
+    "hang": [],
+    "fail": {}
+}
+
+EMAIL_PATTERN = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
+
+
+def state_path():
+    return os.environ.get(STATE_ENV) or DEFAULT_STATE_PATH
+
+
+@contextmanager
+def locked_state():
+    """Открывает файл состояния под блокировкой (команды могут идти параллельно)"""
+    path = state_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a+', encoding='utf-8') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.seek(0)
+        content = f.read()
+        state = dict(DEFAULT_STATE)
+        if content.strip():
+            state.update(json.loads(content))
+
+        yield state
+
+        f.seek(0)
+        f.truncate()
+        json.dump(state, f, ensure_ascii=False, indent=2)
+
+
+def command_key(args):
+    """Ключ подкоманды для задержек и ошибок: 'config get-mode', 'status', 'connect'"""
+    if not args:
+        return ""
+    if args[0] == 'config' and len(args) > 1:
+        return f"config {args[1]}"
+    return args[0]
+
+
+def lookup(table, args):
+    """Ищет значение для команды: сначала 'config get-mode', потом 'config', потом default"""
+    key = command_key(args)
+    for name in (key, key.split(' ')[0], "default"):
+        if name in table:
+            return table[name]
+    return None
+
+
+# --- Ответы команд ---
+
+def find_location(state, query):
+    """Ищет локацию по ISO коду, стране или городу (без учета регистра)"""
+    query = query.strip().lower()
+    for location in state["locations"]:
+        if query in (location[0].lower(), location[1].lower(), location[2].lower()):
+            return location
+    return None
+
+
+def cmd_status(state, args):
+    if not state["connected"]:
+        print("VPN is disconnected")
+        return 0
+
+    print(f"{GREEN}Connected to {state['connected'].upper()} in {state['mode']} mode, "
+          f"running on {state['interface']}{RESET}")
+    if '--verbose' in args:
+        print(f"Location: {state['connected']}")
+        print(f"Mode: {state['mode']}")
+        print(f"Interface: {state['interface']}")
+    return 0
+
+
+def cmd_license(state, args):
+    print(f"{BOLD}Logged in as {state['email']}{RESET}")
+    if state["license"] == "premium":
+        print("You are using the PREMIUM version")
+        print(f"Up to {state['devices']} devices simultaneously")
+        print(f"Your subscription will be renewed on {state['expiry_date']}")
+    else:
+        print("You are using the FREE version")
+        print(f"Up to {state['devices']} devices simultaneously")
+        print(f"You have {state['traffic_left']} left")
+        print("Upgrade to get unlimited traffic")
+    return 0
+
+
+def cmd_list_locations(state, args):
+    print(f"{'ISO':<6}{'COUNTRY':<21}{'CITY':<31}PING ESTIMATE")
+    for iso, country, city, ping in state["locations"]:
+        print(f"{RESET}{iso:<6}{country:<21}{city:<31}{ping}")
+    print()
+    print('You can connect to a location by running "adguardvpn-cli connect -l <city, country or ISO code>"')
+    return 0
+
+
+def ask_sudo_password(state, attempts=3):
+    """Как настоящий sudo: пароль читается из управляющего терминала (/dev/tty),
+    а не из stdin, и дается три попытки"""
+    try:
+        tty_in = open('/dev/tty')
+        tty_out = open('/dev/tty', 'w')
+    except OSError:
+        print("sudo: a terminal is required to read the password", file=sys.stderr)
+        return False
+
+    with tty_in, tty_out:
+        for attempt in range(attempts):
+            tty_out.write(f"[sudo] password for {os.environ.get('USER', 'user')}: ")
+            tty_out.flush()
+            password = tty_in.readline().rstrip('\n')
+            tty_out.write("\n")
+            if password == state["sudo_password"]:
+                return True
+            if attempt + 1 < attempts:
+                tty_out.write("Sorry, try again.\n")
+            tty_out.flush()
+    print(f"sudo: {attempts} incorrect password attempts", file=sys.stderr)
+    return False
+
+
+def cmd_connect(state, args):
+    if '-l' in args:
+        index = args.index('-l')
+        query = args[index + 1] if index + 1 < len(args) else ""
+        location = find_location(state, query)
+        if location is None:
+            print(f"Location {query} not found", file=sys.stderr)
+            return 1
+    else:
+        location = min(state["locations"], key=lambda l: l[3])
+
+    print("Do you want to continue? [y/n] ", end='', flush=True)
+    answer = sys.stdin.readline().strip().lower()
+    if answer not in ('', 'y', 'yes'):
+        print("Connection cancelled")
+        return 1
+
+    if state["mode"] == "TUN" and state["sudo_prompt"] and not ask_sudo_password(state):
+        return 1
+
+    state["connected"] = location[2]
+    print(f"{GREEN}Successfully Connected to {location[2].upper()}{RESET}")
+    return 0
+
+
+def cmd_disconnect(state, args):
+    state["connected"] = None
+    print("Disconnected successfully")
+    return 0
+
+
+def cmd_login(state, args):
+    print("Please open the following link in your browser to log in:")
+    print("https://auth.adguard-vpn.com/login?client=cli&token=fake", flush=True)
+    time.sleep(state["login_delay"])
+    state["logged_in"] = True
+    print(f"Logged in as {state['email']}")
+    return 0
+
+
+def cmd_logout(state, args):
+    state["logged_in"] = False
+    state["connected"] = None
+    print("Logged out successfully")
+    return 0
+
+
+def cmd_version(state, args):
+    print(f"AdGuard VPN CLI v{state['version']}")
+    return 0
+
+
+def cmd_check_update(state, args):
+    if state["latest_version"] != state["version"]:
+        print(f"AdGuard VPN CLI v{state['latest_version']} is now available")
+    else:
+        print("You are using the latest version")
+    return 0
+
+
+def cmd_update(state, args):
+    if state["latest_version"] == state["version"]:
+        print("You are using the latest version")
+        return 0
+    print(f"Update to v{state['latest_version']}? [y/n] ", end='', flush=True)
+    if sys.stdin.readline().strip().lower() not in ('', 'y', 'yes'):
+        return 1
+    state["version"] = state["latest_version"]
+    print(f"AdGuard VPN CLI updated to v{state['version']}")
+    return 0
+
+
+CONFIG_FIELDS = {
+    'mode': 'mode',
+    'socks-port': 'socks_port',
+    'dns': 'dns',
+    'tun-routing-mode': 'tun_routing_mode',
+    'update-channel': 'update_channel'
+}
+
+
+def cmd_config(state, args):
+    action = args[1] if len(args) > 1 else 'show'
+
+    if action == 'show':
+        print(f"Mode: {state['mode']}")
+        print(f"SOCKS port: {state['socks_port']}")
+        print(f"DNS upstream: {state['dns']}")
+        print(f"TUN routing mode: {state['tun_routing_mode']}")
+        print(f"Update channel: {state['update_channel'].capitalize()}")
+        return 0
+
+    field = CONFIG_FIELDS.get(action[4:])
+    if field is None:
+        print(f"Unknown config command: {action}", file=sys.stderr)
+        return 1
+
+    if action.startswith('get-'):
+        print(state[field])
+        return 0
+
+    if len(args) < 3:
+        print(f"Missing value for {action}", file=sys.stderr)
+        return 1
+    value = args[2]
+    state[field] = value.upper() if field in ('mode', 'tun_routing_mode') else value
+    print(f"{action[4:]} set to {state[field]}")
+    return 0
+
+
+COMMANDS = {
+    'status': cmd_status,
+    'license': cmd_license,
+    'list-locations': cmd_list_locations,
+    'connect': cmd_connect,
+    'disconnect': cmd_disconnect,
+    'login': cmd_login,
+    'logout': cmd_logout,
+    '-v': cmd_version,
+    'check-update': cmd_check_update,
+    'update': cmd_update,
+    'config': cmd_config
+}
+
+# Команды, которые работают без входа в аккаунт
+ANONYMOUS_COMMANDS = {'login', '-v', 'check-update', 'update', 'config'}
+
+
+def simulate(args):
+    """Выполняет команду на состоянии имитации и возвращает код возврата"""
+    command = COMMANDS.get(args[0]) if args else None
+    if command is None:
+        print(f"Unknown command: {' '.join(args)}", file=sys.stderr)
+        return 1
+
+    with locked_state() as state:
+        snapshot = json.loads(json.dumps(state))
+
+    if command_key(args) in snapshot["hang"] or args[0] in snapshot["hang"]:
+        time.sleep(HANG_SECONDS)
+
+    time.sleep(lookup(snapshot["latency"], args) or 0)
+
+    exit_code = lookup(snapshot["fail"], args)
+    if exit_code:
+        print(f"Error: simulated failure of {command_key(args)}", file=sys.stderr)
+        return exit_code
+
+    if not snapshot["logged_in"] and args[0] not in ANONYMOUS_COMMANDS:
+        print("You are not logged in. Please run \"adguardvpn-cli login\"", file=sys.stderr)
+        return 1
+
+    # Команды, которые читают stdin или долго ждут, не держат блокировку
+    if args[0] in ('connect', 'login', 'update'):
+        exit_code = command(snapshot, args)
+        with locked_state() as state:
+            state.update(snapshot)
+        return exit_code
+
+    with locked_state() as state:
+        return command(state, args)
+
+
+# --- Запись и воспроизведение ---
+
+def sample_path(directory, args):
+    name = re.sub(r'[^A-Za-z0-9.-]+', '_', ' '.join(args)).strip('_') or 'none'
+    return os.path.join(directory, f"{name}.json")
+
+
+def redact(text):
+    return EMAIL_PATTERN.sub('user@example.com', text)
+
+
+def _pump(source, target, chunks):
+    """Переписывает поток вызывающему и запоминает его содержимое"""
+    for line in iter(source.readline, ''):
+        target.write(line)
+        target.flush()
+        chunks.append(line)
+    source.close()
+
+
+def record(directory, args):
+    """Проксирует вызов в настоящий CLI и сохраняет ответ"""
+    real_cli = os.environ.get(REAL_CLI_ENV) or DEFAULT_REAL_CLI
+    start = time.monotonic()
+    process = subprocess.Popen([real_cli] + args, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               text=True)
+
+    stdout, stderr = [], []
+    pumps = [threading.Thread(target=_pump, args=(process.stdout, sys.stdout, stdout)),
+             threading.Thread(target=_pump, args=(process.stderr, sys.stderr, stderr))]
+    for pump in pumps:
+        pump.start()
+    exit_code = process.wait()
+    for pump in pumps:
+        pump.join()
+
+    os.makedirs(directory, exist_ok=True)
+    path = sample_path(directory, args)
+    corpus = {"args": args, "samples": []}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            corpus = json.load(f)
+
+    corpus["samples"].append({
+        "stdout": redact(''.join(stdout)),
+        "stderr": redact(''.join(stderr)),
+        "exit_code": exit_code,
+        "duration": time.monotonic() - start,
+        "recorded_at": time.time()
+    })
+    corpus["samples"] = corpus["samples"][-SAMPLES_PER_COMMAND:]
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(corpus, f, ensure_ascii=False, indent=2)
+    return exit_code
+
+
+def replay(directory, args):
+    """Отвечает последним записанным ответом на ту же команду"""
+    path = sample_path(directory, args)
+    if not os.path.exists(path):
+        print(f"No recorded sample for: {' '.join(args)}", file=sys.stderr)
+        return 1
+
+    with open(path, encoding='utf-8') as f:
+        sample = json.load(f)["samples"][-1]
+
+    speed = float(os.environ.get(REPLAY_SPEED_ENV, "1"))
+    time.sleep(sample["duration"] * speed)
+    sys.stdout.write(sample["stdout"])
+    sys.stderr.write(sample["stderr"])
+    return sample["exit_code"]
+
+
+# --- Управление имитацией ---
+
+def sim_command(args):
+    action = args[0] if args else 'show'
+
+    if action == 'reset':
+        with locked_state() as state:
+            state.clear()
+            state.update(json.loads(json.dumps(DEFAULT_STATE)))
+            if len(args) > 1:
+                with open(args[1], encoding='utf-8') as f:
+                    state.update(json.load(f))
+    elif action == 'set':
+        with locked_state() as state:
+            for assignment in args[1:]:
+                key, _, value = assignment.partition('=')
+                try:
+                    state[key] = json.loads(value)
+                except ValueError:
+                    state[key] = value
+    elif action != 'show':
+        print(f"Unknown --sim action: {action}", file=sys.stderr)
+        return 1
+
+    with locked_state() as state:
+        print(json.dumps(state, ensure_ascii=False, indent=2))
+    return 0
+
+
+def main():
+    args = sys.argv[1:]
+
+    if args and args[0] == '--sim':
+        return sim_command(args[1:])
+
+    if os.environ.get(RECORD_ENV):
+        return record(os.environ[RECORD_ENV], args)
+    if os.environ.get(REPLAY_ENV):
+        return replay(os.environ[REPLAY_ENV], args)
+    return simulate(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Локальный стенд для кнопки "Измерить пинг" в окне выбора локации.
+
+Открывает TCP порты на 127.0.0.1 для каждого города и записывает файл
+адресов, который менеджер читает вместо настоящего:
+
+    python3 tools/fake_probe_listener.py /tmp/probe_endpoints.json Frankfurt Paris "New York"
+    ADGUARDVPN_PROBE_ENDPOINTS=/tmp/probe_endpoints.json python3 main.py
+
+Без списка городов берутся локации из list-locations (в том числе
+из tools/fake_adguardvpn_cli.py, если он подставлен через ADGUARDVPN_CLI).
+Города после --down получают закрытый порт - для проверки ошибок.
+Работает до Ctrl+C.
+"""
+import json
+import os
+import socket
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.cli import run_cli
+from core.parsers import parse_locations
+
+
+def serve(sock):
+    """Принимает и сразу закрывает соединения"""
+    while True:
+        try:
+            connection, _ = sock.accept()
+        except OSError:
+            return
+        connection.close()
+
+
+def closed_port():
+    """Порт, на котором гарантированно никто не слушает"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    args = sys.argv[1:]
+    if not args:
+        print(__doc__)
+        return 1
+
+    path = args[0]
+    cities, down = args[1:], []
+    if '--down' in cities:
+        index = cities.index('--down')
+        cities, down = cities[:index], cities[index + 1:]
+    if not cities:
+        cities = [location.city for location in parse_locations(run_cli('list-locations').stdout)]
+
+    endpoints = {}
+    for city in cities:
+        if city in down:
+            endpoints[city] = {"host": "127.0.0.1", "port": closed_port(), "tls": False}
+            continue
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        sock.listen(64)
+        threading.Thread(target=serve, args=(sock,), daemon=True).start()
+        endpoints[city] = {"host": "127.0.0.1", "port": sock.getsockname()[1], "tls": False}
+    for city in down:
+        if city not in endpoints:
+            endpoints[city] = {"host": "127.0.0.1", "port": closed_port(), "tls": False}
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(endpoints, f, ensure_ascii=False, indent=2)
+    print(f"Адреса {len(endpoints)} локаций записаны в {path}, Ctrl+C - остановка")
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
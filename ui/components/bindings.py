@@ -0,0 +1,29 @@
+_MISSING = object()
+
+
+class WidgetBinding:
+    """Применяет к виджету только те свойства, которые действительно изменились.
+
+    Все изменения отслеживаемых свойств должны идти через apply(),
+    иначе запомненные значения разойдутся с виджетом.
+    """
+
+    def __init__(self, widget):
+        self.widget = widget
+        self._applied = {}
+
+    def apply(self, **options):
+        """Конфигурирует виджет изменившимися свойствами, возвращает их"""
+        changed = {key: value for key, value in options.items()
+                   if self._applied.get(key, _MISSING) != value}
+        if changed:
+            self.widget.config(**changed)
+            self._applied.update(changed)
+        return changed
+
+    def forget(self, *keys):
+        """Забывает запомненные значения (например, после внешнего изменения виджета)"""
+        if not keys:
+            self._applied.clear()
+        for key in keys:
+            self._applied.pop(key, None)
@@ -204,3 +204,84 @@ def show_question_dialog(parent, title, message):
 
     dialog.wait_window()
     return result[0]
+
+
+def ask_password_dialog(parent, title, message, on_open=None):
+    """Запрашивает пароль; возвращает строку или None, если пользователь отменил ввод.
+
+    on_open(close) получает функцию, которая закрывает окно извне (как отмена).
+    """
+    result = [None]
+
+    dialog = tk.Toplevel(parent)
+    dialog.title(title)
+    dialog.configure(bg='#182030')
+    dialog.transient(parent)
+    dialog.grab_set()
+
+    lines = message.count('\n') + 1
+    dialog.geometry(f"350x{130 + (lines - 1) * 20}")
+
+    # Сообщение
+    message_frame = tk.Frame(dialog, bg='#182030', pady=5)
+    message_frame.pack(fill=tk.BOTH, expand=True, padx=15)
+
+    message_label = tk.Label(message_frame, text=message, font=("Arial", 11),
+                            bg='#182030', fg='white', justify=tk.LEFT, anchor=tk.W)
+    message_label.pack(fill=tk.X, pady=(5, 5))
+
+    password_entry = tk.Entry(message_frame, show="*", font=('Arial', 12),
+                              bg='#15354D', fg='white', insertbackground='white')
+    password_entry.pack(fill=tk.X)
+
+    # Кнопки
+    button_frame = tk.Frame(dialog, bg='#182030', pady=10)
+    button_frame.pack(fill=tk.X)
+
+    def on_ok():
+        password = password_entry.get()
+        if not password:
+            return
+        result[0] = password
+        dialog.destroy()
+
+    def on_cancel():
+        result[0] = None
+        dialog.destroy()
+
+    button_style = {
+        'font': ('Arial', 10),
+        'bg': '#15354D',
+        'fg': 'white',
+        'bd': 0,
+        'padx': 10,
+        'pady': 6,
+        'width': 8,
+        'highlightthickness':0,
+        'cursor': 'hand2'
+    }
+
+    ok_btn = create_hover_button(button_frame, text="OK",
+                                 command=on_ok, **button_style)
+    ok_btn.grid(row=0, column=1, padx=(0, 10))
+
+    cancel_btn = create_hover_button(button_frame, text="Отмена",
+                                     command=on_cancel, **button_style)
+    cancel_btn.grid(row=0, column=2)
+
+    # Центрируем весь фрейм с кнопками
+    button_frame.grid_columnconfigure(0, weight=1)
+    button_frame.grid_columnconfigure(1, weight=1)
+    button_frame.grid_columnconfigure(2, weight=1)
+    button_frame.grid_columnconfigure(3, weight=1)
+
+    # Закрытие по клавишам
+    dialog.bind('<Return>', lambda e: on_ok())
+    dialog.bind('<Escape>', lambda e: on_cancel())
+    dialog.protocol("WM_DELETE_WINDOW", on_cancel)
+    password_entry.focus_set()
+    if on_open is not None:
+        on_open(on_cancel)
+
+    dialog.wait_window()
+    return result[0]
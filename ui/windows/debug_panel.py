@@ -0,0 +1,179 @@
+import os
+import time
+import tkinter as tk
+from tkinter import scrolledtext
+from core.cli_stats import cli_stats, LATENCY_BUCKETS
+from core.mutations import mutation_queue
+from core.connect_machine import PHASE_NAMES
+from ui.components.button_styler import create_hover_button
+
+# Куда по умолчанию сохраняется статистика из панели
+DEFAULT_STATS_PATH = os.path.expanduser("~/adguardvpn-cli-stats.json")
+# Как часто панель перечитывает статистику (мс)
+REFRESH_INTERVAL_MS = 1000
+
+
+def format_mutations(snapshot):
+    """Форматирует состояние очереди меняющих команд"""
+    waiting = ", ".join(snapshot['waiting']) or "-"
+    lines = [
+        f"Очередь команд: выполняется {snapshot['active'] or '-'}, ждут: {waiting}",
+        f"{'команда':<28}{'выполн':>7}{'замен':>7}{'откл':>6}{'ожид':>8}{'сред':>8}{'макс':>8}"
+    ]
+    for name, stats in sorted(snapshot['commands'].items()):
+        lines.append(
+            f"{name:<28}{stats['completed']:>7}{stats['coalesced']:>7}{stats['rejected']:>6}"
+            f"{stats['avg_wait']:>8.2f}{stats['avg_run']:>8.2f}{stats['max_run']:>8.2f}"
+        )
+    return '\n'.join(lines)
+
+
+def format_phases(phase_stats):
+    """Форматирует длительность этапов подключения"""
+    lines = [
+        "Этапы подключения (с):",
+        f"{'этап':<28}{'раз':>7}{'сред':>8}{'макс':>8}"
+    ]
+    for phase, stats in phase_stats.items():
+        lines.append(f"{PHASE_NAMES.get(phase, phase):<28}{stats['count']:>7}"
+                     f"{stats['avg']:>8.2f}{stats['max']:>8.2f}")
+    return '\n'.join(lines)
+
+
+def format_stats(snapshot):
+    """Форматирует снимок статистики CLI для вывода в панели"""
+    uptime = snapshot['uptime']
+    spawned = snapshot['total_spawned']
+    shared = snapshot['total_shared']
+    per_minute = spawned / (uptime / 60) if uptime > 0 else 0.0
+
+    lines = [
+        f"Время работы: {uptime:.0f} с",
+        f"Запущено процессов: {spawned} ({per_minute:.1f} в минуту)",
+        f"Запросов обслужено общим процессом: {shared}",
+        "",
+        f"{'подкоманда':<22}{'запуск':>7}{'общих':>7}{'тайм':>6}{'ошиб':>6}{'код≠0':>7}"
+        f"{'сред':>8}{'p95':>8}{'макс':>8}"
+    ]
+
+    commands = sorted(snapshot['commands'].items(), key=lambda item: -item[1]['spawned'])
+    for name, stats in commands:
+        lines.append(
+            f"{name:<22}{stats['spawned']:>7}{stats['shared']:>7}{stats['timeouts']:>6}"
+            f"{stats['errors']:>6}{stats['failed']:>7}{stats['avg_time']:>8.2f}"
+            f"{stats['p95_time']:>8.2f}{stats['max_time']:>8.2f}"
+        )
+
+    lines.append("")
+    lines.append("Гистограмма длительности (с):")
+    labels = [f"≤{bound:g}" if bound != float('inf') else f">{LATENCY_BUCKETS[-2]:g}"
+              for bound in LATENCY_BUCKETS]
+    lines.append(f"{'':<22}" + "".join(f"{label:>7}" for label in labels))
+    for name, stats in commands:
+        lines.append(f"{name:<22}" + "".join(f"{count:>7}" for count in stats['histogram'].values()))
+
+    lines.append("")
+    lines.append("Последние вызовы:")
+    for call in reversed(snapshot['recent'][-30:]):
+        if call['timed_out']:
+            outcome = "таймаут"
+        elif call['error']:
+            outcome = f"ошибка: {call['error']}"
+        else:
+            outcome = f"код {call['exit_code']}"
+        lines.append(
+            f"{time.strftime('%H:%M:%S', time.localtime(call['time']))} "
+            f"{call['subcommand']:<20}{call['duration']:>6.2f} с  {outcome:<12} {call['caller']}"
+        )
+
+    return '\n'.join(lines)
+
+
+class DebugPanel:
+    """Скрытая панель отладки: сколько процессов adguardvpn-cli запускает менеджер"""
+
+    def __init__(self, parent, connect_machine=None):
+        self.parent = parent
+        self.connect_machine = connect_machine
+        self.root = tk.Toplevel(parent)
+        self.root.title("Отладка: вызовы adguardvpn-cli")
+        self.root.geometry("820x520")
+        self.root.configure(bg='#182030')
+        self.root.transient(parent)
+        self.refresh_job = None
+
+        self.setup_ui()
+        self.refresh()
+
+    def setup_ui(self):
+        """Создает интерфейс панели"""
+        self.stats_text = scrolledtext.ScrolledText(
+            self.root,
+            font=('Monospace', 9),
+            bg='#15354D',
+            fg='white',
+            relief=tk.FLAT,
+            wrap=tk.NONE
+        )
+        self.stats_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 5))
+
+        self.status_var = tk.StringVar(value="")
+        status_label = tk.Label(self.root, textvariable=self.status_var, font=('Arial', 9),
+                                bg='#182030', fg='#A9A9A9', anchor=tk.W)
+        status_label.pack(fill=tk.X, padx=10)
+
+        button_frame = tk.Frame(self.root, bg='#182030')
+        button_frame.pack(fill=tk.X, padx=10, pady=10)
+
+        button_style = {
+            'font': ('Arial', 10),
+            'bg': '#15354D',
+            'fg': 'white',
+            'bd': 0,
+            'padx': 12,
+            'pady': 5,
+            'highlightthickness': 0,
+            'cursor': 'hand2'
+        }
+
+        create_hover_button(button_frame, text="Сохранить JSON", command=self.save_json,
+                            **button_style).pack(side=tk.LEFT)
+        create_hover_button(button_frame, text="Сбросить", command=self.reset,
+                            **button_style).pack(side=tk.LEFT, padx=(10, 0))
+        create_hover_button(button_frame, text="Закрыть", command=self.close_window,
+                            **button_style).pack(side=tk.RIGHT)
+
+        self.root.protocol("WM_DELETE_WINDOW", self.close_window)
+
+    def refresh(self):
+        """Перечитывает статистику и планирует следующее обновление"""
+        position = self.stats_text.yview()[0]
+        self.stats_text.config(state=tk.NORMAL)
+        self.stats_text.delete('1.0', tk.END)
+        text = format_stats(cli_stats.snapshot()) + "\n\n" + format_mutations(mutation_queue.snapshot())
+        if self.connect_machine is not None:
+            text += "\n\n" + format_phases(self.connect_machine.phase_stats())
+        self.stats_text.insert('1.0', text)
+        self.stats_text.config(state=tk.DISABLED)
+        self.stats_text.yview_moveto(position)
+
+        self.refresh_job = self.root.after(REFRESH_INTERVAL_MS, self.refresh)
+
+    def save_json(self):
+        """Сохраняет статистику в JSON файл"""
+        try:
+            cli_stats.dump_json(DEFAULT_STATS_PATH)
+            self.status_var.set(f"Сохранено: {DEFAULT_STATS_PATH}")
+        except OSError as e:
+            self.status_var.set(f"Не удалось сохранить: {e}")
+
+    def reset(self):
+        """Сбрасывает накопленную статистику"""
+        cli_stats.reset()
+        self.status_var.set("Статистика сброшена")
+
+    def close_window(self):
+        if self.refresh_job:
+            self.root.after_cancel(self.refresh_job)
+            self.refresh_job = None
+        self.root.destroy()
@@ -2,9 +2,10 @@ import tkinter as tk
 import webbrowser
 import subprocess
 import urllib.parse
-import re
 import os
 from urllib.request import urlopen
+from core.cli import run_cli
+from core.parsers import parse_version
 from ui.components.button_styler import create_hover_button
 from config.manager_config import MANAGER_CONFIG
 _last_available_site = None
@@ -35,24 +36,10 @@ def setup_window_properties(self):
 def get_adguard_current_version():
     """Получает текущую версию AdGuard VPN"""
     try:
-        result = subprocess.run(
-            ['adguardvpn-cli', '-v'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
+        result = run_cli('-v')
 
         if result.returncode == 0:
-            # Очищаем вывод от ANSI кодов и лишних символов
-            version_output = clean_ansi_codes(result.stdout).strip()
-
-            # Ищем версию в формате vX.X.X или X.X.X
-            version_match = re.search(r'v?(\d+\.\d+\.\d+)', version_output)
-            if version_match:
-                return f"{version_match.group(1)}"
-
-            # Если не нашли через regex, возвращаем как есть (очищенное)
-            return version_output if version_output else "Неизвестно"
+            return parse_version(result.stdout) or "Неизвестно"
 
         return "Неизвестно"
     except Exception as e:
@@ -62,11 +49,6 @@ def get_manager_version():
     """Получает версию менеджера"""
     return MANAGER_CONFIG.get("current_version", "Неизвестно")
 
-def clean_ansi_codes(text):
-    """Очищает текст от ANSI escape sequences"""
-    ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-    return ansi_escape.sub('', text)
-
 def get_available_site():
     """Возвращает доступный сайт с кэшированием на 5 минут"""
     global _last_available_site, _last_check_time
@@ -1,71 +1,21 @@
-import tkinter as tk
 import subprocess
-import re
-from datetime import datetime
+import threading
+from core.license import license_cache
 from ui.components.dialogs import show_message_dialog
 
 class LicenseWindow:
     def __init__(self, parent):
         self.parent = parent
 
-    def clean_license_output(self, text):
-        """Удаляет escape-символы из вывода"""
-        ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-        cleaned = ansi_escape.sub('', text)
-        return cleaned.strip()
-
-    def parse_license_info(self, text):
-        """Парсит и форматирует информацию о лицензии"""
-        cleaned = self.clean_license_output(text)
-        lines = cleaned.split('\n')
-
-        # Извлекаем информацию
-        email = None
-        license_type = "Free"
-        devices = "2"
-        traffic_left = None
-        expiry_date = None
-
-        for line in lines:
-            line = line.strip()
-
-            # Email пользователя
-            if "Logged in as" in line:
-                email_match = re.search(r'Logged in as (.+)$', line)
-                if email_match:
-                    email = email_match.group(1).strip()
-
-            # Тип лицензии
-            if "FREE version" in line:
-                license_type = "Free"
-            elif "PREMIUM" in line.upper():
-                license_type = "Premium"
-
-            # Количество устройств
-            if "devices simultaneously" in line:
-                devices_match = re.search(r'Up to (\d+) devices', line)
-                if devices_match:
-                    devices = devices_match.group(1)
-
-            # Оставшийся трафик
-            if "GB left" in line or "MB left" in line:
-                traffic_match = re.search(r'You have (\d+\.?\d*)\s*(GB|MB) left', line)
-                if traffic_match:
-                    amount = traffic_match.group(1)
-                    unit = traffic_match.group(2)
-                    traffic_left = f"{amount} {unit}"
-
-            # Дата окончания
-            if "renewed on" in line or "expires on" in line:
-                date_match = re.search(r'(\d{4}-\d{2}-\d{2})', line)
-                if date_match:
-                    expiry_date = date_match.group(1)
+    def format_license_info(self, snapshot):
+        """Форматирует информацию о лицензии"""
+        devices = snapshot.devices or "2"
 
         # Форматируем вывод в зависимости от типа лицензии
-        if license_type == "Premium":
-            return self.format_premium_info(email, devices, expiry_date)
+        if snapshot.license_type == "Premium":
+            return self.format_premium_info(snapshot.email, devices, snapshot.expiry_date)
         else:
-            return self.format_free_info(email, devices, traffic_left)
+            return self.format_free_info(snapshot.email, devices, snapshot.traffic_left)
 
     def format_free_info(self, email, devices, traffic_left):
         """Форматирует информацию для Free версии"""
@@ -131,15 +81,10 @@ class LicenseWindow:
     def get_license_info(self):
         """Получает информацию о лицензии"""
         try:
-            result = subprocess.run(
-                ['adguardvpn-cli', 'license'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-
-            if result.returncode == 0:
-                return self.parse_license_info(result.stdout)
+            snapshot = license_cache.get()
+
+            if snapshot is not None:
+                return self.format_license_info(snapshot)
             else:
                 return "❌ Не удалось получить информацию о лицензии\n\n" \
                        "Возможные причины:\n" \
@@ -155,6 +100,14 @@ class LicenseWindow:
                    "Проверьте установлен ли AdGuard VPN."
 
     def run(self):
-        """Запускает окно с информацией о лицензии"""
+        """Запрашивает лицензию в фоновом потоке и показывает окно с информацией"""
+        thread = threading.Thread(target=self._fetch_thread)
+        thread.daemon = True
+        thread.start()
+
+    def _fetch_thread(self):
         license_info = self.get_license_info()
+        self.parent.after(0, self.show_license_info, license_info)
+
+    def show_license_info(self, license_info):
         show_message_dialog(self.parent, "Информация о лицензии", license_info, "info")
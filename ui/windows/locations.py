@@ -1,19 +1,100 @@
 import tkinter as tk
 from tkinter import ttk
-import subprocess
-import re
+import locale
 import os
-from ui.components.dialogs import show_message_dialog
+import queue
+import re
+import threading
+import time
+from config.manager_config import LOCATION_PICKER_CONFIG
+from core.cli import run_cli
+from core.locations_cache import locations_cache
+from core.latency_probe import LatencyProber, load_endpoints
+from core.location_search import LocationIndex
 from ui.components.button_styler import create_hover_button, apply_hover_effect
 
 
+# Колонки таблицы в порядке значений строки
+COLUMNS = ("ISO", "Country", "City", "Ping", "Time", "Success")
+HEADINGS = {
+    "ISO": "ISO",
+    "Country": "Страна",
+    "City": "Город",
+    "Ping": "Пинг",
+    "Time": "Подключение",
+    "Success": "Успешно",
+}
+# Число в начале ячейки: "42", "42±3", "1.5 с", "80% (5)"
+NUMBER_RE = re.compile(r'\d+(?:\.\d+)?')
+
+
+def location_key(location):
+    """Постоянный ключ строки таблицы: ISO и город"""
+    return location.iso, location.city.lower()
+
+
+def plan_reconcile(current, target):
+    """Изменения, превращающие показанные строки current в target.
+
+    current - {ключ: значения} в порядке строк таблицы, target - [(ключ, значения)].
+    Операции: ('delete', ключ), ('update', ключ, {колонка: значение}),
+    ('insert', ключ, позиция, значения), ('move', ключ, позиция).
+    Строки с повторяющимся ключом (тот же ISO и город) показываются один раз - первая.
+    """
+    unique = {}
+    for key, values in target:
+        unique.setdefault(key, values)
+    target = list(unique.items())
+    target_keys = unique.keys()
+    operations = [('delete', key) for key in current if key not in target_keys]
+
+    for index, (key, values) in enumerate(target):
+        old = current.get(key)
+        if old is None:
+            operations.append(('insert', key, index, values))
+            continue
+        changed = {column: value for column, before, value in zip(COLUMNS, old, values)
+                   if before != value}
+        if changed:
+            operations.append(('update', key, changed))
+
+    # Новые строки встают на место, только если оставшиеся сохранили порядок;
+    # иначе (CLI отсортировал список по-другому) строки переставляются по target
+    kept = [key for key in current if key in target_keys]
+    if kept != [key for key, _ in target if key in current]:
+        operations.extend(('move', key, index) for index, (key, _) in enumerate(target))
+    return operations
+
+
+def cell_number(text):
+    """Числа ячейки для сортировки; None - значения нет ("—", "…")"""
+    numbers = NUMBER_RE.findall(str(text))
+    return tuple(float(number) for number in numbers) if numbers else None
+
+
+def row_sort_keys(values):
+    """Ключи сортировки строки по колонкам: названия по правилам локали, остальное - числа"""
+    iso, country, city = (locale.strxfrm(str(value).casefold()) for value in values[:3])
+    return (iso, country, city) + tuple(cell_number(value) for value in values[3:])
+
+
+def format_connect_stats(stats):
+    """Медиана времени подключения и доля успехов для строки таблицы"""
+    if stats is None:
+        return "—", "—"
+    median = f"{stats.median_time:.1f} с" if stats.median_time is not None else "—"
+    return median, f"{stats.success_rate:.0%} ({stats.attempts})"
+
+
 class LocationSelectionWindow:
-    def __init__(self, parent):
+    def __init__(self, parent, history=None):
         self.parent = parent
+        # История подключений (ConnectHistory) для колонок времени и успеха
+        self.history = history
         self.root = tk.Toplevel(parent)
         self.setup_window_properties()
         self.root.title("Выбор локации")
-        self.root.geometry("520x400")
+        self.root.geometry("680x440")
         self.root.configure(bg='#182030')
         self.root.transient(parent)
         self.root.grab_set()
@@ -26,6 +107,31 @@ class LocationSelectionWindow:
             pass
 
         self.selected_location = None
+        self.batch_size = LOCATION_PICKER_CONFIG["batch_size"]
+        self.poll_interval_ms = LOCATION_PICKER_CONFIG["poll_interval_ms"]
+        # Строки от фоновой загрузки; номер загрузки отсекает результаты прошлых попыток
+        self.rows_queue = queue.Queue()
+        self.load_id = 0
+        self.drain_job = None
+        self.closed = False
+        # Строки таблицы по location_key: элемент Treeview, показанные значения и обратно
+        self.items = {}
+        self.rows = {}
+        self.keys = {}
+        # Порядок строк из CLI; показ (фильтр и сортировка) строится поверх него
+        self.order = []
+        # Запланированные изменения таблицы, применяются пачками по кадрам
+        self.pending = []
+        # Поиск и сортировка: индекс по ISO/стране/городу и ключи сортировки строк
+        self.index = LocationIndex()
+        self.sort_keys = {}
+        self.sort_column = None
+        self.sort_reverse = False
+        # Измерение пинга: результаты приходят из рабочих потоков через очередь
+        self.prober = None
+        self.probe_queue = queue.Queue()
+        self.probe_job = None
+        self.probe_pending = 0
         self.setup_ui()
 
     def setup_window_properties(self):
@@ -55,14 +161,31 @@ class LocationSelectionWindow:
 
         title_label = tk.Label(main_frame, text="Выберите локацию для подключения",
                               font=("Arial", 16, "bold"), fg='white', bg='#182030')
-        title_label.pack(pady=(0, 20))
+        title_label.pack(pady=(0, 15))
+
+        # Поиск по мере ввода
+        search_frame = tk.Frame(main_frame, bg='#182030')
+        search_frame.pack(fill=tk.X)
+
+        tk.Label(search_frame, text="Поиск:", font=('Arial', 11),
+                 fg='white', bg='#182030').pack(side=tk.LEFT, padx=(0, 8))
+
+        self.search_var = tk.StringVar()
+        self.search_entry = tk.Entry(search_frame, textvariable=self.search_var, font=('Arial', 12),
+                                     bg='#15354D', fg='white', insertbackground='white',
+                                     relief=tk.FLAT, highlightthickness=0)
+        self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, ipady=4)
+        self.search_var.trace_add('write', lambda *args: self.apply_view())
+        self.search_entry.bind('<Return>', self.choose_first_match)
+        self.search_entry.bind('<Escape>', lambda event: self.search_var.set(""))
+        self.search_entry.focus_set()
 
         # Фрейм для списка локаций
         list_frame = tk.Frame(main_frame, bg='#182030')
         list_frame.pack(fill=tk.BOTH, expand=True, pady=10)
 
         # Создаем Treeview для отображения локаций
-        columns = ("ISO", "Country", "City", "Ping")
+        columns = COLUMNS
         self.tree = ttk.Treeview(list_frame, columns=columns, show="headings", height=10)
 
         # Основной стиль таблицы
@@ -106,21 +229,22 @@ class LocationSelectionWindow:
                 foreground=[('selected', 'white')])
 
         # Создаем Treeview для отображения локаций
-        columns = ("ISO", "Country", "City", "Ping")
+        columns = COLUMNS
         self.tree = ttk.Treeview(list_frame, columns=columns, show="headings", height=10,
                                 selectmode="browse")  # ← Режим выбора одной строки
 
-        # Настраиваем заголовки
-        self.tree.heading("ISO", text="ISO")
-        self.tree.heading("Country", text="Страна")
-        self.tree.heading("City", text="Город")
-        self.tree.heading("Ping", text="Пинг")
+        # Настраиваем заголовки (нажатие сортирует по колонке)
+        for column in COLUMNS:
+            self.tree.heading(column, text=HEADINGS[column],
+                              command=lambda column=column: self.sort_by(column))
 
         # Настраиваем ширину колонок
         self.tree.column("ISO", width=50, anchor="center")
         self.tree.column("Country", width=150)
         self.tree.column("City", width=150)
-        self.tree.column("Ping", width=50, anchor="center")
+        self.tree.column("Ping", width=70, anchor="center")
+        self.tree.column("Time", width=90, anchor="center")
+        self.tree.column("Success", width=80, anchor="center")
 
         # Кастомный скроллбар с измененным цветом
         scrollbar = ttk.Scrollbar(list_frame,
@@ -132,6 +256,20 @@ class LocationSelectionWindow:
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
+        # Индикатор загрузки и повтор после ошибки
+        status_frame = tk.Frame(main_frame, bg='#182030')
+        status_frame.pack(fill=tk.X)
+
+        self.status_var = tk.StringVar(value="")
+        status_label = tk.Label(status_frame, textvariable=self.status_var, font=('Arial', 10),
+                                fg='#A9A9A9', bg='#182030', anchor=tk.W)
+        status_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        self.retry_btn = create_hover_button(status_frame, text="Повторить",
+                                             command=lambda: self.load_locations(force=True),
+                                             font=('Arial', 10), bg='#15354D', fg='white', bd=0,
+                                             padx=10, pady=2, highlightthickness=0, cursor='hand2')
+
         # Кнопки
         btn_frame = tk.Frame(main_frame, bg='#182030')
         btn_frame.pack(fill=tk.X, pady=10)
@@ -148,137 +286,286 @@ class LocationSelectionWindow:
             'cursor': 'hand2'
         }
 
+        self.measure_btn = create_hover_button(btn_frame, text="Измерить пинг",
+                                               command=self.measure_latency, **button_style)
+        self.measure_btn.grid(row=0, column=1, padx=(0, 10))
+
         choose_btn = create_hover_button(btn_frame, text="Выбрать",
                                          command=self.select_location, **button_style)
-        choose_btn.grid(row=0, column=1, padx=(0, 10))
+        choose_btn.grid(row=0, column=2, padx=(0, 10))
 
         back_btn = create_hover_button(btn_frame, text="Назад",
                                        command=self.close_window, **button_style)
-        back_btn.grid(row=0, column=2)
+        back_btn.grid(row=0, column=3)
 
         # Центрируем весь фрейм с кнопками
         btn_frame.grid_columnconfigure(0, weight=1)
         btn_frame.grid_columnconfigure(1, weight=1)
         btn_frame.grid_columnconfigure(2, weight=1)
         btn_frame.grid_columnconfigure(3, weight=1)
-
-    def load_locations(self):
-        """Загружает список локаций через adguardvpn-cli list-locations"""
+        btn_frame.grid_columnconfigure(4, weight=1)
+
+        self.root.protocol("WM_DELETE_WINDOW", self.close_window)
+
+    def load_locations(self, force=False):
+        """Показывает сохраненный список локаций и обновляет его в фоне.
+
+        Если кэш свежий (и обновление не запрошено явно), CLI не вызывается.
+        """
+        # Таблица не очищается: новый список сверяется с показанными строками,
+        # поэтому выделение и прокрутка сохраняются
+        self.load_id += 1
+        self.retry_btn.pack_forget()
+        cached = locations_cache.load()
+
+        if cached is not None:
+            self.rows_queue.put((self.load_id, 'locations', cached.locations))
+            fetched = time.strftime('%H:%M', time.localtime(cached.fetched_at))
+            if not force and locations_cache.is_fresh():
+                self.rows_queue.put((self.load_id, 'done',
+                                     f"Локаций: {len(cached.locations)} (список от {fetched})"))
+            else:
+                self.status_var.set(f"Список от {fetched}, обновление...")
+                self._start_fetch()
+        else:
+            self.status_var.set("⏳ Загрузка локаций...")
+            self._start_fetch()
+
+        if self.drain_job is None:
+            self.drain_job = self.root.after(self.poll_interval_ms, self._drain_rows)
+
+    def _start_fetch(self):
+        thread = threading.Thread(target=self._fetch_locations, args=(self.load_id,))
+        thread.daemon = True
+        thread.start()
+
+    def _fetch_locations(self, load_id):
+        """Поток загрузки: выполняет list-locations, сохраняет кэш и передает список окну"""
         try:
-            # Очищаем таблицу
-            for item in self.tree.get_children():
-                self.tree.delete(item)
+            result = run_cli('list-locations')
+            if result.returncode != 0:
+                self.rows_queue.put((load_id, 'error', "Не удалось получить список локаций"))
+                return
 
-            # Получаем список локаций
-            result = subprocess.run(
-                ['adguardvpn-cli', 'list-locations'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-
-            if result.returncode == 0:
-                self.parse_locations_output(result.stdout)
-            else:
-                self.root.after(0, lambda: show_message_dialog(self.root, "Ошибка", "Не удалось получить список локаций", "error"))
+            locations = locations_cache.store_result(result)
+            self.rows_queue.put((load_id, 'locations', locations))
+            self.rows_queue.put((load_id, 'done',
+                                 f"Локаций: {len(locations)}" if locations else "Список локаций пуст"))
 
         except Exception as e:
-            self.root.after(0, lambda: show_message_dialog(self.root, "Ошибка", f"Ошибка при получении локаций: {str(e)}", "error"))
-
-    def parse_locations_output(self, output):
-        """Парсит вывод команды list-locations"""
-        # Очищаем вывод от ANSI escape sequences
-        clean_output = self.clean_ansi_codes(output)
-
-        lines = clean_output.strip().split('\n')
-        header_found = False
-
-        for line in lines:
-            line = line.strip()
-
-            # Пропускаем пустые строки
-            if not line:
-                continue
-
-            # Ищем заголовок таблицы
-            if 'ISO' in line and 'COUNTRY' in line and 'CITY' in line:
-                header_found = True
-                continue
-
-            # Если нашли заголовок, парсим данные до конца таблицы
-            if header_found:
-                # Останавливаем парсинг когда начинаются инструкции
-                if 'You can connect to a location by running' in line:
-                    break
-                if 'You are using a FREE version' in line:
-                    break
-                if line.startswith('===') or line.startswith('---'):
-                    continue
-
-                # Парсим строку с локацией
-                location_data = self.parse_table_line(line)
-                if location_data:
-                    iso, country, city, ping = location_data
-                    self.tree.insert("", "end", values=(iso, country, city, ping))
-
-    def clean_ansi_codes(self, text):
-        """Очищает текст от ANSI escape sequences"""
-        ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-        return ansi_escape.sub('', text)
-
-    def parse_table_line(self, line):
-        """Парсит строку таблицы с фиксированными колонками"""
-        try:
-            # Сначала очищаем от ANSI кодов на всякий случай
-            line = self.clean_ansi_codes(line)
+            self.rows_queue.put((load_id, 'error', f"Ошибка при получении локаций: {str(e)}"))
 
-            # Убираем лишние пробелы
-            line = ' '.join(line.split())
+    def _drain_rows(self):
+        """Применяет не больше одной пачки изменений таблицы за проход цикла Tk"""
+        self.drain_job = None
+        if self.closed:
+            return
 
-            # Разбиваем на части
-            parts = line.split()
-            if len(parts) < 4:
-                return None
+        # Следующее сообщение (в том числе 'done') - только после всех изменений
+        if self.pending:
+            self._apply_pending()
+            self.drain_job = self.root.after(0, self._drain_rows)
+            return
 
-            # ISO код - первые 2 символа
-            iso = parts[0]
+        try:
+            load_id, kind, value = self.rows_queue.get_nowait()
+        except queue.Empty:
+            load_id, kind = None, None
+
+        if load_id == self.load_id:
+            if kind == 'locations':
+                self.reconcile_locations(value)
+            elif kind == 'done':
+                self.status_var.set(value)
+                return
+            elif kind == 'error':
+                self.status_var.set(f"❌ {value}")
+                self.retry_btn.pack(side=tk.RIGHT)
+                return
+
+        self.drain_job = self.root.after(0 if kind else self.poll_interval_ms, self._drain_rows)
+
+    def reconcile_locations(self, locations):
+        """Планирует изменения таблицы под новый список локаций"""
+        target = []
+        for location in locations:
+            stats = self.history.stats(location.city) if self.history is not None else None
+            values = (location.iso, location.country, location.city, location.ping,
+                      *format_connect_stats(stats))
+            target.append((location_key(location), values))
+
+        current = {key: self.rows[key] for key in self.order}
+        self.pending = plan_reconcile(current, target)
+
+    def _apply_pending(self):
+        """Применяет очередные batch_size изменений из плана.
+
+        Перестановки меняют только self.order - порядок показа восстанавливает
+        apply_view, когда план применен целиком.
+        """
+        batch, self.pending = self.pending[:self.batch_size], self.pending[self.batch_size:]
+        for operation in batch:
+            kind, key = operation[0], operation[1]
+            if kind == 'delete':
+                item = self.items.pop(key)
+                del self.rows[key], self.keys[item], self.sort_keys[key]
+                self.order.remove(key)
+                self.index.remove(key)
+                self.tree.delete(item)
+            elif kind == 'update':
+                self.set_cells(key, operation[2])
+            elif kind == 'insert':
+                index, values = operation[2], operation[3]
+                item = self.tree.insert("", index, values=values)
+                self.items[key], self.rows[key], self.keys[item] = item, values, key
+                self.sort_keys[key] = row_sort_keys(values)
+                self.order.insert(index, key)
+                self.index.add(key, *values[:3])
+            elif kind == 'move':
+                self.order.remove(key)
+                self.order.insert(operation[2], key)
+
+        if not self.pending:
+            self.apply_view()
+
+    def set_cells(self, key, changed):
+        """Обновляет только перечисленные ячейки строки"""
+        item = self.items.get(key)
+        if item is None:
+            return
+        values = list(self.rows[key])
+        for column, value in changed.items():
+            self.tree.set(item, column, value)
+            values[COLUMNS.index(column)] = value
+        self.rows[key] = tuple(values)
+        self.sort_keys[key] = row_sort_keys(values)
+        if {"ISO", "Country", "City"} & changed.keys():
+            self.index.add(key, *values[:3])
+
+    def apply_view(self):
+        """Показывает строки под поиск и сортировку.
+
+        Таблица не перестраивается: лишние строки отсоединяются, нужные
+        присоединяются и переставляются одним вызовом set_children.
+        """
+        matches = self.index.search(self.search_var.get())
+        keys = self.order if matches is None else [key for key in self.order if key in matches]
+
+        if self.sort_column is not None:
+            # Строки без значения (пинг не измерен) всегда внизу
+            column = COLUMNS.index(self.sort_column)
+            present = [key for key in keys if self.sort_keys[key][column] is not None]
+            missing = [key for key in keys if self.sort_keys[key][column] is None]
+            keys = sorted(present, key=lambda key: self.sort_keys[key][column],
+                          reverse=self.sort_reverse) + missing
+
+        visible = tuple(self.items[key] for key in keys)
+        if visible != self.tree.get_children():
+            shown = set(visible)
+            hidden = [item for item in self.tree.selection() if item not in shown]
+            if hidden:
+                self.tree.selection_remove(*hidden)
+            self.tree.set_children("", *visible)
+
+        if matches is not None:
+            self.status_var.set(f"Найдено: {len(visible)} из {len(self.order)}")
+
+    def sort_by(self, column):
+        """Сортирует по колонке; повторное нажатие меняет направление"""
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column, self.sort_reverse = column, False
+
+        for name in COLUMNS:
+            arrow = (" ▼" if self.sort_reverse else " ▲") if name == column else ""
+            self.tree.heading(name, text=HEADINGS[name] + arrow)
+        self.apply_view()
+
+    def choose_first_match(self, event=None):
+        """Enter в поиске выбирает выделенную строку или первую найденную"""
+        children = self.tree.get_children()
+        if not children:
+            return
+        if not self.tree.selection():
+            self.tree.selection_set(children[0])
+        self.select_location()
 
-            # Пинг - последнее число
-            ping = parts[-1]
-            if not ping.isdigit():
-                return None
+    def measure_latency(self):
+        """Заново измеряет задержку до всех локаций из файла адресов"""
+        if self.prober is not None:
+            return
 
-            # Все что между ISO и ping - это страна и город
-            middle_parts = parts[1:-1]
+        endpoints = load_endpoints()
+        targets = {key: endpoints[key[1]] for key in self.items if key[1] in endpoints}
+        if not targets:
+            self.status_var.set("❌ Адреса серверов для измерения не заданы")
+            return
 
-            if len(middle_parts) < 2:
-                return None
+        for key in targets:
+            self.set_cells(key, {"Ping": "…"})
+        self.probe_pending = len(targets)
+        self.measure_btn.config(state=tk.DISABLED)
+        self.status_var.set(f"⏳ Измерение пинга: 0 из {len(targets)}")
 
-            # Город - последнее слово в middle_parts
-            city = middle_parts[-1]
-            # Страна - все остальное
-            country = ' '.join(middle_parts[:-1])
+        self.prober = LatencyProber(self.probe_queue.put)
+        self.prober.start(targets)
+        self.probe_job = self.root.after(self.poll_interval_ms, self._drain_probes)
 
-            return (iso, country, city, ping)
+    def _drain_probes(self):
+        """Обновляет ячейки пинга по мере готовности результатов"""
+        self.probe_job = None
+        if self.closed:
+            return
 
-        except Exception as e:
-            print(f"Ошибка парсинга строки: '{line}' - {e}")
-            return None
+        updated = False
+        while True:
+            try:
+                result = self.probe_queue.get_nowait()
+            except queue.Empty:
+                break
+            self.probe_pending -= 1
+            text = f"{result.median:.0f}±{result.jitter:.0f}" if result.median is not None else "—"
+            self.set_cells(result.key, {"Ping": text})
+            updated = True
+
+        if updated and self.sort_column == "Ping":
+            self.apply_view()
+
+        total = len(self.prober.targets) if self.prober else 0
+        if self.probe_pending > 0:
+            self.status_var.set(f"⏳ Измерение пинга: {total - self.probe_pending} из {total}")
+            self.probe_job = self.root.after(self.poll_interval_ms, self._drain_probes)
+        else:
+            self.status_var.set(f"Пинг измерен для {total} локаций (медиана±разброс, мс)")
+            self.prober = None
+            self.measure_btn.config(state=tk.NORMAL)
 
     def select_location(self):
         selected_item = self.tree.selection()
         if not selected_item:
             return
 
-        item = self.tree.item(selected_item[0])
-        location_data = item['values']
-
         # Используем город как локацию для подключения
-        self.selected_location = location_data[2]  # Город
-        self.root.destroy()
+        self.selected_location = self.rows[self.keys[selected_item[0]]][2]  # Город
+        self._destroy()
 
     def close_window(self):
         self.selected_location = None
+        self._destroy()
+
+    def _destroy(self):
+        # Фоновая загрузка может еще идти - ее результаты просто не будут показаны
+        self.closed = True
+        if self.drain_job is not None:
+            self.root.after_cancel(self.drain_job)
+            self.drain_job = None
+        # Незавершенные измерения пинга снимаются вместе с окном
+        if self.prober is not None:
+            self.prober.cancel()
+        if self.probe_job is not None:
+            self.root.after_cancel(self.probe_job)
+            self.probe_job = None
         self.root.destroy()
 
     def run(self):
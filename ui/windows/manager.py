@@ -1,25 +1,45 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, PhotoImage
-import subprocess
 import threading
+import queue
 import time
 import webbrowser
 import sys
-import re
 from datetime import datetime, date
 from ui.windows.locations import LocationSelectionWindow
 from ui.windows.settings import SettingsWindow
 from ui.windows.updates import UpdateWindow
 from core.uninstall import UninstallWindow
 from ui.components.common import create_tooltip
+from ui.components.bindings import WidgetBinding
 from core.auth import ManagerAuthWindow
-from core.utils import clean_ansi_codes, clean_location_output, check_if_connected
+from core.cli import run_cli, track_cli_call
+from core.connect_monitor import ConnectMonitor, TerminalConnect
+from core.pty_connect import PtyConnect
+from core.operations import OperationRunner
+from core import connect_machine
+from core.connect_machine import ConnectStateMachine, ACTION_NAMES, PHASE_NAMES, FINAL_PHASES
+from core.mutations import mutation_queue, run_mutation, MutationRejected
+from core.location_ranker import LocationRanker
+from core.locations_cache import locations_cache
+from core.connect_history import (ConnectHistory, OUTCOME_CONNECTED, OUTCOME_FAILED,
+                                  OUTCOME_DEADLINE, OUTCOME_CANCELLED)
+from core.watchdog import ReconnectWatchdog
+from config.manager_config import CONNECT_CONFIG, LOCATION_RANK_CONFIG, WATCHDOG_CONFIG
+from core.license import license_cache
+from core.connection_state import ConnectionStateStore
+from core.status_poller import StatusPoller
+from core.tun_watcher import TunWatcher
 import os
-from ui.components.dialogs import show_message_dialog, show_question_dialog
+from ui.components.dialogs import show_message_dialog, show_question_dialog, ask_password_dialog
 from ui.components.button_styler import create_hover_button, create_hover_button_for_manager
 from ui.windows.license import LicenseWindow
 from ui.windows.info_dialog import show_info_dialog
 from ui.windows.donat import DonationWindow
+from ui.windows.debug_panel import DebugPanel
+
+# Если переменная равна 1, пункт "Отладка CLI" всегда виден в меню настроек
+DEBUG_PANEL_ENV = "ADGUARDVPN_MANAGER_DEBUG"
 _last_available_site = None
 _last_check_time = 0
 
@@ -107,6 +127,16 @@ class AdGuardVPNManager:
         self.sudo_password = None
         self.current_location = ""
         self.is_connected = False
+        self.license_snapshot = None
+        # Все подписчики получают состояние подключения отсюда
+        self.connection_store = ConnectionStateStore()
+        # Подключение и смена локации: не больше одной операции одновременно
+        self.operations = OperationRunner(
+            on_change=lambda operation: self.root.after(0, self._on_operation_change, operation))
+        # Этапы подключения/отключения: события для окна, лога и других подписчиков
+        self.connect_machine = ConnectStateMachine()
+        self.connect_machine.subscribe(
+            lambda event: self.root.after(0, self._on_connect_event, event))
 
         self.is_logged_in = False
         self.check_initial_login_status()  # Проверяем статус при запуске
@@ -120,8 +150,25 @@ class AdGuardVPNManager:
         self.root.bind("<FocusOut>", self.on_focus_out)
 
         self.setup_gui()
-        self.update_status()
         self.update_ui_for_auth_status()
+        self.connection_store.subscribe(self.apply_status)
+
+        # Опрос CLI выполняется в фоне, окно только забирает результаты
+        self.status_poller = StatusPoller(lambda: self.is_logged_in)
+        self.tun_watcher = TunWatcher(self.status_poller.on_link_change)
+        self.status_poller.attach_link_watcher(self.tun_watcher)
+        self.tun_watcher.start()
+        self.connect_monitor = ConnectMonitor(self.status_poller, self.connection_store)
+        self.status_poller.start()
+        # История попыток подключения: медиана времени и доля успехов в окне выбора
+        # локации и в рейтинге локаций
+        self.connect_history = ConnectHistory()
+        # Рейтинг локаций для кнопки "Подключиться" обновляется в фоне
+        self.location_ranker = LocationRanker(lambda: self.is_logged_in, self.connect_history)
+        self.location_ranker.start()
+        # Переподключение после обрыва (включается в настройках)
+        self.watchdog = ReconnectWatchdog(lambda: [item.city for item in self.location_ranker.ranking])
+        self.connection_store.subscribe(self._watch_connection)
         self.schedule_status_update()
         self.hide_log()
         self.log_visible = False
@@ -149,7 +196,8 @@ class AdGuardVPNManager:
 
     def on_focus_in(self, event):
         """Обрабатывает получение фокуса окном"""
-        pass  # Можно добавить логику при необходимости
+        # Пользователь вернулся к окну - статус должен быть свежим
+        self.status_poller.reset_backoff()
 
     def on_focus_out(self, event):
         """Обрабатывает потерю фокуса окном - закрываем меню"""
@@ -158,13 +206,10 @@ class AdGuardVPNManager:
     def check_initial_login_status(self):
         """Синхронно проверяет статус авторизации при запуске"""
         try:
-            result = subprocess.run(
-                ['adguardvpn-cli', 'list-locations'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_cli('list-locations', timeout=5)
             self.is_logged_in = (result.returncode == 0)
+            # Тот же вывод сразу заполняет кэш окна выбора локации
+            locations_cache.store_result(result)
         except:
             self.is_logged_in = False
 
@@ -199,8 +244,6 @@ class AdGuardVPNManager:
                             font=("Arial", 11), fg='#8e8e93', bg='#182030', justify='left')
         self.email_label.pack(side=tk.LEFT, padx=(0, 15))
 
-        self.update_email_display()
-
         # Логотип и заголовок по центру
         logo_container = tk.Frame(header_frame, bg='#182030')
         logo_container.pack(expand=True, fill=tk.BOTH)
@@ -239,6 +282,7 @@ class AdGuardVPNManager:
         self.status_label.bind("<Enter>", lambda e: self.status_label.config(fg='#30d158'))
         self.status_label.bind("<Leave>", lambda e: self.status_label.config(fg='#0a84ff'))
         create_tooltip(self.status_label, "Статус подключения к VPN")
+        self.status_binding = WidgetBinding(self.status_label)
 
         # Иконка глаза для скрытия/показа лога
         self.eye_icon = tk.Label(icons_frame, text="📝", font=("Arial", 14),
@@ -256,6 +300,8 @@ class AdGuardVPNManager:
         self.settings_icon.bind("<Enter>", lambda e: self.settings_icon.config(fg='#30d158'))
         self.settings_icon.bind("<Leave>", lambda e: self.settings_icon.config(fg='#0a84ff'))
         self.settings_icon.bind("<Button-1>", self.toggle_settings_menu)
+        # Shift+клик открывает меню с пунктом панели отладки
+        self.settings_icon.bind("<Shift-Button-1>", lambda e: self.toggle_settings_menu(debug=True))
         create_tooltip(self.settings_icon, "Настройки")
 
         # Иконка информации
@@ -292,6 +338,7 @@ class AdGuardVPNManager:
                                         highlightthickness=0, cursor='hand2',
                                         activebackground='#5BA06A', activeforeground='white', takefocus=0)
         self.connect_button.grid(row=0, column=1, padx=(0, 10))
+        self.connect_binding = WidgetBinding(self.connect_button)
 
 
         location_button = create_hover_button_for_manager(btn_frame, "Выбрать локацию", self.select_location)
@@ -317,7 +364,17 @@ class AdGuardVPNManager:
         self.log_text.config(state=tk.DISABLED)
 
     def log_message(self, message):
-        """Добавление сообщения в лог"""
+        """Добавление сообщения в лог (из любого потока).
+
+        Рабочие потоки (подключение, смена локации, переподключение) не трогают
+        виджеты сами: сообщение добавляется в потоке Tk через root.after.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            self.root.after(0, self._append_log, message)
+            return
+        self._append_log(message)
+
+    def _append_log(self, message):
         self.log_text.config(state=tk.NORMAL)
         self.log_text.insert(tk.END, f"{message}\n")
         self.log_text.see(tk.END)
@@ -380,7 +437,7 @@ class AdGuardVPNManager:
         self.account_menu.wm_overrideredirect(True)
 
         # Получаем тип лицензии для определения текста кнопки
-        license_type = self.get_license_type() if self.is_logged_in else "Free"
+        license_type = self.get_current_license_type() if self.is_logged_in else "Free"
 
         # Динамически рассчитываем высоту меню
         if self.is_logged_in:
@@ -528,7 +585,7 @@ class AdGuardVPNManager:
     def renew_license(self):
         """Открывает страницу покупки/продления лицензии"""
         self.close_account_menu()
-        license_type = self.get_license_type() if self.is_logged_in else "Free"
+        license_type = self.get_current_license_type() if self.is_logged_in else "Free"
 
         if license_type == "Free":
             action_text = "покупки лицензии"
@@ -539,15 +596,15 @@ class AdGuardVPNManager:
         webbrowser.open(available_site)
         self.log_message(f"🔗 Открыта страница {action_text}")
 
-    def toggle_settings_menu(self, event=None):
+    def toggle_settings_menu(self, event=None, debug=False):
         """Открывает/закрывает меню настроек"""
         if hasattr(self, 'settings_menu_open') and self.settings_menu_open:
             self.close_settings_menu()
         else:
-            self.open_settings_menu()
+            self.open_settings_menu(debug=debug)
 
-    def open_settings_menu(self):
-        """Открывает меню настроек"""
+    def open_settings_menu(self, debug=False):
+        """Открывает меню настроек (debug - с пунктом панели отладки)"""
         if hasattr(self, 'settings_menu_open') and self.settings_menu_open:
             return
 
@@ -563,7 +620,9 @@ class AdGuardVPNManager:
 
         self.settings_menu = tk.Toplevel(self.root)
         self.settings_menu.wm_overrideredirect(True)
-        self.settings_menu.geometry(f"180x135+{menu_x}+{menu_y}")
+        debug = debug or os.environ.get(DEBUG_PANEL_ENV) == "1"
+        menu_height = 180 if debug else 135
+        self.settings_menu.geometry(f"180x{menu_height}+{menu_x}+{menu_y}")
         self.settings_menu.configure(bg='#15354D', relief=tk.RAISED, bd=1)
 
         # Стиль для кнопок меню
@@ -610,6 +669,18 @@ class AdGuardVPNManager:
         uninstall_button.bind("<Enter>", lambda e: uninstall_button.config(bg='#1e4a6a'))
         uninstall_button.bind("<Leave>", lambda e: uninstall_button.config(bg='#15354D'))
 
+        if debug:
+            # Разделитель
+            separator = tk.Frame(self.settings_menu, height=1, bg='#1e4a6a')
+            separator.pack(fill=tk.X, padx=5, pady=2)
+
+            # Кнопка "Отладка CLI"
+            debug_button = create_hover_button_for_manager(self.settings_menu, text="Отладка CLI",
+                                    command=self.handle_debug_panel, **menu_button_style)
+            debug_button.pack(fill=tk.X)
+            debug_button.bind("<Enter>", lambda e: debug_button.config(bg='#1e4a6a'))
+            debug_button.bind("<Leave>", lambda e: debug_button.config(bg='#15354D'))
+
         # Bind событие клика вне меню для закрытия
         self.settings_menu.bind("<FocusOut>", lambda e: self.close_settings_menu())
         self.root.bind("<Button-1>", self.check_close_settings_menu)
@@ -666,6 +737,11 @@ class AdGuardVPNManager:
         self.close_settings_menu()
         self.uninstall()
 
+    def handle_debug_panel(self):
+        """Обрабатывает клик по Отладка CLI"""
+        self.close_settings_menu()
+        DebugPanel(self.root, self.connect_machine)
+
     def open_info_link(self, event=None):
         """Открывает ссылку на справку AdGuard VPN"""
         webbrowser.open("https://adguard-vpn.com/kb/ru/")
@@ -682,100 +758,108 @@ class AdGuardVPNManager:
         settings_window.run()
 
     def update_status(self):
-        try:
-            result = subprocess.run(
-                ['adguardvpn-cli', 'status'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+        """Просит фоновый опрос обновить статус (можно вызывать из любого потока)"""
+        self.status_poller.request_refresh()
 
-            if result.returncode == 0:
-                ansi_escape = re.compile(r'\x1B\[[0-9;]*m')
-                clean_text = ansi_escape.sub('', result.stdout)
-
-                is_connected = check_if_connected(clean_text)
-
-                if is_connected:
-                    location = clean_location_output(clean_text)
-                    if location:
-                        self.current_location = location
-                        self.status_label.config(text="🟢")
-                        self.connect_button.config(text="Отключиться", bg='#ff3b30',
-                                                activebackground='#ff3b30')  # Тот же цвет при нажатии
-                        self.is_connected = True
-                    else:
-                        self.current_location = "Подключено"
-                        self.status_label.config(text="🟢")
-                        self.connect_button.config(text="Отключиться", bg='#ff3b30',
-                                                activebackground='#ff3b30')  # Тот же цвет при нажатии
-                        self.is_connected = True
-                else:
-                    self.current_location = ""
-                    self.status_label.config(text="🔴")
-                    self.connect_button.config(text="Подключиться", bg='#5BA06A',
-                                            activebackground='#5BA06A')  # Тот же цвет при нажатии
-                    self.is_connected = False
-            else:
-                self.current_location = ""
-                self.status_label.config(text="🔴")
-                self.connect_button.config(text="Подключиться", bg='#5BA06A',
-                                        activebackground='#5BA06A')  # Тот же цвет при нажатии
-                self.is_connected = False
-        except Exception as e:
-            self.current_location = ""
-            self.status_label.config(text="🔴")
-            self.connect_button.config(text="Подключиться", bg='#15354D',
-                                    activebackground='#15354D')  # Тот же цвет при нажатии
-            self.is_connected = False
-
-    def get_user_email(self):
-        """Получает email пользователя из информации о лицензии"""
-        try:
-            result = subprocess.run(
-                ['adguardvpn-cli', 'license'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+    def apply_status(self, state):
+        """Применяет изменившееся состояние подключения к интерфейсу"""
+        self.current_location = state.location
+        self.is_connected = state.connected
+        self.status_binding.apply(text="🟢" if state.connected else "🔴")
 
-            if result.returncode == 0:
-                return self.parse_user_email(result.stdout)
-            return None
-        except:
-            return None
-
-    def parse_user_email(self, license_text):
-        """Парсит email пользователя из вывода adguardvpn-cli license"""
-        try:
-            # Очищаем ANSI коды
-            ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-            clean_text = ansi_escape.sub('', license_text)
-
-            lines = clean_text.split('\n')
-
-            for line in lines:
-                line_clean = line.strip()
+        # Пока идет подключение, кнопка работает как "Отменить"
+        if self.operations.active is not None:
+            return
 
-                # Ищем email в строке "Logged in as"
-                if "Logged in as" in line_clean:
-                    email_match = re.search(r'Logged in as (.+)$', line_clean)
-                    if email_match:
-                        email = email_match.group(1).strip()
-                        # Убираем скобки если есть
-                        email = email.replace('(', '').replace(')', '')
-                        return email
+        if state.connected:
+            self.connect_binding.apply(text="Отключиться", bg='#ff3b30',
+                                       activebackground='#ff3b30')  # Тот же цвет при нажатии
+        elif state.error:
+            self.connect_binding.apply(text="Подключиться", bg='#15354D',
+                                       activebackground='#15354D')  # Тот же цвет при нажатии
+        else:
+            self.connect_binding.apply(text="Подключиться", bg='#5BA06A',
+                                       activebackground='#5BA06A')  # Тот же цвет при нажатии
+
+    def _on_connect_event(self, event):
+        """Показывает этап подключения в окне и логе"""
+        # authenticating наступает, только когда окно пароля действительно показано
+        if event.phase == connect_machine.AUTHENTICATING:
+            self.log_message("🔑 Ожидание пароля администратора...")
+        elif event.phase == connect_machine.VERIFYING:
+            self.log_message("🔍 Проверка подключения...")
+
+        if event.phase not in FINAL_PHASES:
+            self.status_binding.apply(text="🟡")
+            return
 
-            return None
+        if event.durations:
+            phases = ", ".join(f"{PHASE_NAMES[phase]} {duration:.1f} с"
+                               for phase, duration in event.durations)
+            self.log_message(f"⏱️ {ACTION_NAMES.get(event.action, event.action)}: "
+                             f"{event.elapsed:.1f} с ({phases})")
+        if self.connection_store.state is not None:
+            self.apply_status(self.connection_store.state)
+
+    def _on_operation_change(self, operation):
+        """Переключает кнопку подключения между "Отменить" и обычным видом"""
+        if operation is not None:
+            self.connect_binding.apply(text="Отменить", bg='#ff9500', activebackground='#ff9500')
+        elif self.connection_store.state is not None:
+            self.apply_status(self.connection_store.state)
+        else:
+            self.connect_binding.apply(text="Подключиться", bg='#5BA06A', activebackground='#5BA06A')
+
+    def _watch_connection(self, state):
+        """Запускает переподключение, если туннель оборвался без участия пользователя"""
+        location = self.watchdog.observe(state)
+        if location and self.operations.active is None:
+            self.operations.start("reconnect", self._reconnect_thread,
+                                  WATCHDOG_CONFIG["max_duration"], location)
+
+    def _reconnect_thread(self, operation, location):
+        """Поток переподключения по плану watchdog: задержки, попытки, запасные локации"""
+        dropped_at = time.monotonic()
+        self.log_message(f"⚠️ VPN отключился - автоматическое переподключение к {location}")
+
+        attempts = 0
+        for attempt, city, delay in self.watchdog.plan(location):
+            attempts = attempt + 1
+            self.log_message(f"🔄 Попытка {attempts}: {city} через {delay:.1f} с")
+            if operation.wait(min(delay, operation.remaining())) or operation.remaining() <= 0:
+                break
+            if self.is_connected:
+                self.log_message("✅ Подключение восстановилось")
+                return
+
+            started = time.monotonic()
+            self.status_poller.begin_transition()
+            if self._run_connect(operation, city):
+                self.log_message(f"✅ Переподключено к {city} за {time.monotonic() - started:.1f} с "
+                                 f"(без VPN {time.monotonic() - dropped_at:.1f} с)")
+                return
+            if operation.cancelled:
+                break
+            self.log_message(f"❌ Попытка {attempts} не удалась за {time.monotonic() - started:.1f} с")
+
+        if operation.cancelled:
+            self.log_message("⛔ Переподключение отменено")
+        else:
+            self.log_message(f"⛔ Переподключение прекращено после {attempts} попыток "
+                             f"({time.monotonic() - dropped_at:.0f} с)")
 
-        except Exception as e:
-            return None
+    def cancel_operation(self):
+        """Отменяет текущее подключение или смену локации"""
+        operation = self.operations.cancel()
+        if operation is not None:
+            self.log_message("⛔ Отмена подключения...")
 
     def update_email_display(self):
         """Обновляет отображение email пользователя и информации о лицензии"""
         if self.is_logged_in:
-            email = self.get_user_email()
-            license_type = self.get_license_type()
+            snapshot = self.license_snapshot
+            email = snapshot.email if snapshot else None
+            license_type = snapshot.license_type if snapshot else "Неизвестно"
 
             if email:
                 # Сокращаем email для отображения
@@ -786,7 +870,7 @@ class AdGuardVPNManager:
 
                 # Для Free версии показываем трафик
                 if license_type == "Free":
-                    traffic = self.get_traffic_left()
+                    traffic = snapshot.traffic_left
                     if traffic:
                         display_text = f"{display_email} ({traffic})"
                     else:
@@ -794,7 +878,7 @@ class AdGuardVPNManager:
 
                 # Для Premium версий показываем дни до окончания
                 elif license_type in ["Premium"]:
-                    expiry_date = self.get_license_expiry()
+                    expiry_date = snapshot.expiry_date
                     if expiry_date:
                         days_left = self.get_days_until_expiry(expiry_date)
                         if days_left is not None:
@@ -821,210 +905,10 @@ class AdGuardVPNManager:
             # Для неавторизованного пользователя
             self.email_label.config(text="Не авторизован", fg='#8e8e93')
 
-    def get_traffic_left(self):
-        """Получает оставшийся трафик из информации о лицензии"""
-        try:
-            result = subprocess.run(
-                ['adguardvpn-cli', 'license'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-
-            if result.returncode == 0:
-                return self.parse_traffic_left(result.stdout)
-            return None
-        except:
-            return None
-
-    def parse_traffic_left(self, license_text):
-        """Парсит оставшийся трафик из вывода adguardvpn-cli license"""
-        try:
-            # Очищаем ANSI коды
-            ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-            clean_text = ansi_escape.sub('', license_text)
-
-            lines = clean_text.split('\n')
-
-            for line in lines:
-                line_clean = line.strip()
-
-                # Ищем оставшийся трафик в разных форматах
-                if "GB left" in line_clean or "MB left" in line_clean:
-                    # Паттерн для "You have X.XX GB left" или подобных
-                    traffic_match = re.search(r'(\d+\.?\d*)\s*(GB|MB)\s*left', line_clean, re.IGNORECASE)
-                    if traffic_match:
-                        amount = traffic_match.group(1)
-                        unit = traffic_match.group(2)
-                        return f"{amount} {unit}"
-
-                # Альтернативный паттерн
-                if "left" in line_clean.lower():
-                    traffic_match = re.search(r'(\d+\.?\d*)\s*(GB|MB)', line_clean, re.IGNORECASE)
-                    if traffic_match:
-                        amount = traffic_match.group(1)
-                        unit = traffic_match.group(2)
-                        return f"{amount} {unit}"
-
-            return None
-
-        except Exception as e:
-            return None
-
-    def get_license_type(self):
-        """Получает тип лицензии"""
-        try:
-            result = subprocess.run(
-                ['adguardvpn-cli', 'license'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-
-            if result.returncode == 0:
-                license_type = self.parse_license_type(result.stdout)
-
-                # Дополнительная проверка: если есть дата окончания - это не Free
-                expiry_date = self.parse_license_expiry(result.stdout)
-                if expiry_date and license_type == "Free":
-                    return "Premium"
-
-                return license_type
-            return "Неизвестно"
-        except:
-            return "Неизвестно"
-
-    def parse_license_type(self, license_text):
-        """Парсит тип лицензии из вывода adguardvpn-cli license"""
-        try:
-            # Очищаем ANSI коды
-            ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-            clean_text = ansi_escape.sub('', license_text)
-
-            lines = clean_text.split('\n')
-
-            for line in lines:
-                line_clean = line.strip()
-
-                # Ищем тип лицензии
-                if "FREE version" in line_clean:
-                    return "Free"
-                elif "PREMIUM" in line_clean.upper():
-                    return "Premium"
-
-            # Если не нашли явного указания, считаем Free
-            return "Free"
-
-        except Exception as e:
-            return "Неизвестно"
-
-    def parse_license_info(self, license_text):
-        """Парсит информацию о лицензии из вывода adguardvpn-cli license"""
-        try:
-            # Очищаем ANSI коды
-            ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-            clean_text = ansi_escape.sub('', license_text)
-
-            lines = clean_text.split('\n')
-            license_type = "Неизвестно"
-            devices = ""
-            traffic_left = ""
-            email = ""
-
-            for line in lines:
-                line_clean = line.strip()
-
-                # Ищем тип лицензии
-                if "FREE version" in line_clean:
-                    license_type = "Free"
-                elif "PREMIUM" in line_clean.upper():
-                    license_type = "Premium"
-
-                # Ищем информацию об устройствах
-                if "devices simultaneously" in line_clean:
-                    devices_match = re.search(r'Up to (\d+) devices', line_clean)
-                    if devices_match:
-                        devices = f", {devices_match.group(1)} устройств"
-
-                # Ищем оставшийся трафик
-                if "GB left" in line_clean or "MB left" in line_clean:
-                    traffic_match = re.search(r'(\d+\.?\d*)\s*(GB|MB)\s*left', line_clean)
-                    if traffic_match:
-                        traffic_left = f", {traffic_match.group(1)} {traffic_match.group(2)}"
-
-                # Ищем email
-                if "Logged in as" in line_clean:
-                    email_match = re.search(r'Logged in as (.+)$', line_clean)
-                    if email_match:
-                        email = email_match.group(1)
-                        # Сокращаем email для отображения
-                        if len(email) > 20:
-                            email = email[:15] + "..."
-                        email = f" ({email})"
-
-            # Формируем финальную строку
-            if license_type != "Неизвестно":
-                return f"Лицензия: {license_type}{devices}{traffic_left}{email}"
-            else:
-                # Если не нашли явного указания типа, но есть другие данные
-                if devices or traffic_left:
-                    return f"Лицензия: Free{devices}{traffic_left}{email}"
-                else:
-                    return "Лицензия: Free"
-
-        except Exception as e:
-            return "Лицензия: Ошибка парсинга"
-
-
-    def get_license_expiry(self):
-        """Получает дату окончания лицензии"""
-        try:
-            result = subprocess.run(
-                ['adguardvpn-cli', 'license'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-
-            if result.returncode == 0:
-                return self.parse_license_expiry(result.stdout)
-            return None
-        except:
-            return None
-
-    def parse_license_expiry(self, license_text):
-        """Парсит дату окончания лицензии из вывода adguardvpn-cli license"""
-        try:
-            # Очищаем ANSI коды
-            ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-            clean_text = ansi_escape.sub('', license_text)
-
-            lines = clean_text.split('\n')
-
-            for line in lines:
-                line_clean = line.strip()
-
-                # Ищем дату окончания в разных форматах
-                if "subscription will be renewed on" in line_clean:
-                    date_match = re.search(r'(\d{4}-\d{2}-\d{2})', line_clean)
-                    if date_match:
-                        return date_match.group(1)
-
-                # Альтернативные форматы
-                elif "expires on" in line_clean.lower():
-                    date_match = re.search(r'(\d{4}-\d{2}-\d{2})', line_clean)
-                    if date_match:
-                        return date_match.group(1)
-
-                elif "valid until" in line_clean.lower():
-                    date_match = re.search(r'(\d{4}-\d{2}-\d{2})', line_clean)
-                    if date_match:
-                        return date_match.group(1)
-
-            return None
-
-        except Exception as e:
-            return None
+    def get_current_license_type(self):
+        """Возвращает тип лицензии из последнего полученного опросом снимка"""
+        snapshot = self.license_snapshot
+        return snapshot.license_type if snapshot else "Неизвестно"
 
     def get_days_text(self, days):
         """Возвращает правильное склонение слова 'день' в зависимости от числа"""
@@ -1058,7 +942,7 @@ class AdGuardVPNManager:
         """Обновляет состояние UI в зависимости от статуса авторизации"""
         if self.is_logged_in:
             # Разблокировать кнопки
-            self.connect_button.config(state=tk.NORMAL, bg='#15354D')
+            self.connect_binding.apply(state=tk.NORMAL, bg='#15354D')
             # Найти кнопку "Выбрать локацию" (вторая кнопка в left_panel)
             for widget in self.connect_button.master.winfo_children():
                 if isinstance(widget, tk.Button) and widget.cget('text') == "Выбрать локацию":
@@ -1066,7 +950,7 @@ class AdGuardVPNManager:
                     break
         else:
             # Заблокировать кнопки
-            self.connect_button.config(state=tk.DISABLED, bg='#2a4d6a')
+            self.connect_binding.apply(state=tk.DISABLED, bg='#2a4d6a')
             # Найти кнопку "Выбрать локацию"
             for widget in self.connect_button.master.winfo_children():
                 if isinstance(widget, tk.Button) and widget.cget('text') == "Выбрать локацию":
@@ -1074,207 +958,266 @@ class AdGuardVPNManager:
                     break
 
     def schedule_status_update(self):
-        """Периодически обновляет статус"""
-        self.update_status()
-
-        # Обновляем email и трафик каждые 30 секунд
-        static_info_counter = getattr(self, '_static_info_counter', 0) + 1
-        self._static_info_counter = static_info_counter
-
-        if static_info_counter >= 10:  # 30 секунд (10 * 3 секунды)
-            self.update_email_display()  # Теперь обновляет и email и трафик
-            self._static_info_counter = 0
-
-        self.root.after(3000, self.schedule_status_update)
-
-    def check_connection_status(self):
-        """Проверяет статус подключения и возвращает True если подключен"""
+        """Периодически забирает результаты фонового опроса"""
         try:
-            result = subprocess.run(
-                ['adguardvpn-cli', 'status'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-
-            if result.returncode == 0:
-                status_text = result.stdout.strip()
-                connected = check_if_connected(status_text)
-
-                if connected:
-                    location = clean_location_output(status_text)
-                    if location:
-                        self.current_location = location
-                    else:
-                        detailed_location = self.get_current_location()
-                        if detailed_location:
-                            self.current_location = detailed_location
-                        else:
-                            self.current_location = "🟢"
-                    return True
-                else:
-                    self.current_location = ""
-                    return False
+            while True:
+                kind, value = self.status_poller.queue.get_nowait()
+                if kind == 'status':
+                    self.connection_store.set(value)
+                elif kind == 'license':
+                    self.license_snapshot = value
+                    self.update_email_display()
+        except queue.Empty:
+            pass
 
-            result = subprocess.run(
-                ['adguardvpn-cli', 'list-locations'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+        self.root.after(100, self.schedule_status_update)
 
-            if result.returncode == 0:
-                current_location = self.get_current_location()
-                if current_location:
-                    self.current_location = current_location
-                else:
-                    self.current_location = "🟢"
-                return True
+    def connect_vpn(self):
+        """Подключается к VPN, а во время подключения - отменяет его"""
+        if self.operations.active is not None:
+            self.cancel_operation()
+            return
 
-            return False
+        if self.is_connected:
+            self.disconnect_vpn()
+            return
 
-        except Exception as e:
-            self.current_location = ""
-            return False
+        self.status_poller.begin_transition()
 
-    def get_current_location(self):
-        """Получает текущую локацию через детальную команду"""
+        # Запускаем в отдельном потоке, чтобы GUI не блокировался
+        self.operations.start("connect", self._connect_vpn_thread, CONNECT_CONFIG["deadline"])
+
+    def _connect_vpn_thread(self, operation):
+        location = self.location_ranker.best() if LOCATION_RANK_CONFIG["auto_select"] else None
+        if location:
+            self.log_message(f"🔗 Подключение к лучшей локации: {location}...")
+        elif CONNECT_CONFIG["mode"] == "terminal":
+            self.log_message("🔗 Запуск подключения в терминале...")
+        else:
+            self.log_message("🔗 Подключение...")
         try:
-            result = subprocess.run(
-                ['adguardvpn-cli', 'status', '--verbose'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-
-            if result.returncode == 0:
-                output = result.stdout
-                location_patterns = [
-                    r'Location:\s*(.+)',
-                    r'Server:\s*(.+)',
-                    r'Endpoint:\s*(.+)',
-                    r'Connected to:\s*(.+)'
-                ]
-
-                for pattern in location_patterns:
-                    match = re.search(pattern, output, re.IGNORECASE)
-                    if match:
-                        location = match.group(1).strip()
-                        return location
-
-            result = subprocess.run(
-                ['adguardvpn-cli', 'status'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-
-            if result.returncode == 0:
-                text = result.stdout
-                if 'connected to' in text.lower():
-                    parts = text.split()
-                    for i, part in enumerate(parts):
-                        if part.lower() == 'connected' and i + 2 < len(parts) and parts[i + 1].lower() == 'to':
-                            location = parts[i + 2]
-                            return location
-
-            return None
-
+            self._run_connect(operation, location)
         except Exception as e:
+            self.log_message(f"❌ Ошибка при запуске подключения: {str(e)}")
+
+    def _create_connect_run(self, operation, location=None, switch=False):
+        """Создает запуск connect в выбранном режиме (PTY менеджера или konsole)"""
+        # Этапы процесса CLI сообщает только сам запуск (on_phase)
+        if CONNECT_CONFIG["mode"] == "terminal":
+            return TerminalConnect(location, on_phase=self.connect_machine.advance)
+        return PtyConnect(
+            location,
+            on_output=lambda line: self.log_message(f"   {line}"),
+            ask_password=lambda retry: self._ask_sudo_password(operation, retry),
+            switch=switch,
+            on_phase=self.connect_machine.advance,
+            cached_password=lambda: self.sudo_password
+        )
+
+    def _ask_sudo_password(self, operation, retry=False):
+        """Спрашивает пароль sudo для connect в окне; вызывается из потока чтения PTY.
+
+        Сохраненный пароль PtyConnect отправляет сам, без этого окна.
+        Окно пароля закрывается, если операцию отменили или истек ее предел.
+        """
+        answer = {}
+        done = threading.Event()
+        close = []
+        message = "Неверный пароль, попробуйте еще раз:" if retry else \
+                  "Для подключения требуется пароль администратора:"
+
+        def ask():
+            # Операция могла закончиться раньше, чем окно успело открыться
+            if done.is_set():
+                return
+            try:
+                answer['password'] = ask_password_dialog(self.root, "Аутентификация", message,
+                                                         on_open=close.append)
+            finally:
+                done.set()
+
+        def close_dialog():
+            if close:
+                try:
+                    close[0]()
+                except tk.TclError:
+                    # Окно уже закрыто пользователем
+                    pass
+
+        self.root.after(0, ask)
+        operation.on_cancel(done.set)
+        if not done.wait(operation.remaining()) or 'password' not in answer:
+            # Отмена или предел: ask еще в очереди Tk раньше close_dialog,
+            # поэтому окно либо не откроется, либо будет закрыто
+            done.set()
+            self.root.after(0, close_dialog)
             return None
+        self.sudo_password = answer['password']
+        return self.sudo_password
 
-    def connect_vpn(self):
-        """Подключается к VPN через внешнюю консоль"""
-        if self.is_connected:
-            self.disconnect_vpn()
-            return
+    def _run_connect(self, operation, location=None, switch=False):
+        """Запускает connect и сообщает результат, как только он известен.
 
-        # Запускаем в отдельном потоке, чтобы GUI не блокировался
-        thread = threading.Thread(target=self._connect_vpn_thread)
-        thread.daemon = True
-        thread.start()
+        switch=True - VPN подключен, и перед connect нужно отключиться.
+        """
+        try:
+            # Пока идет подключение, другие меняющие состояние команды ждут или отклоняются
+            with mutation_queue.hold('connect'):
+                return self._connect_in_queue(operation, location, switch)
+        except MutationRejected as e:
+            self.log_message(f"⏳ {str(e)}")
+            if switch:
+                # Отключения не будет - обрыв снова должен вызывать переподключение
+                self.watchdog.unsuppress()
+            return False
 
-    def _connect_vpn_thread(self):
-        self.log_message("🔗 Запуск подключения в терминале...")
+    def _connect_in_queue(self, operation, location, switch):
+        machine = self.connect_machine
+        machine.begin('switch' if switch else 'connect', location)
         try:
-            # Запускаем подключение в отдельном терминале (konsole для KDE)
-            command = 'konsole -e bash -c "(echo y; echo y; echo y) | adguardvpn-cli connect && echo Успешно подключено, терминал автоматически закроется! && sleep 1 || echo Ошибка подключения && sleep 2"'
+            if switch and CONNECT_CONFIG["mode"] == "terminal":
+                # konsole не объединяет команды - отключаемся здесь, в фоновом потоке
+                # (в обход очереди: она уже занята этим подключением)
+                machine.advance(connect_machine.DISCONNECTING)
+                result = run_cli('disconnect')
+                if result.returncode != 0:
+                    # Без отключения connect к другой локации не выполнится
+                    self.watchdog.unsuppress()
+                    machine.advance(connect_machine.FAILED, result.stderr.strip())
+                    self.log_message("❌ Не удалось отключить VPN, смена локации отменена")
+                    return False
+                switch = False
 
-            process = subprocess.Popen(
-                command,
-                shell=True
-            )
+            run = self._create_connect_run(operation, location, switch)
+            started_at = time.time()
+            try:
+                with track_cli_call(run.args) as call:
+                    run.start()
+                    # Отмена сразу завершает группу процессов CLI (в том числе при закрытии окна)
+                    operation.on_cancel(run.terminate)
+                    outcome = self.connect_monitor.wait(run, operation, on_phase=machine.advance)
+                    call['exit_code'] = run.exit_code
+            except Exception:
+                run.terminate()
+                run.cleanup()
+                raise
+
+            if outcome.connected:
+                # Статус мог сообщить о подключении раньше выхода CLI: в его группе
+                # процессов может работать VPN, поэтому ждем выхода, а не завершаем
+                self._reap_connect_run(run)
+            else:
+                if outcome.reason in ('cancelled', 'deadline'):
+                    # Отмена или истекший предел: завершаем CLI вместе с sudo и терминалом
+                    run.terminate()
+                run.cleanup()
+        except Exception as e:
+            machine.advance(connect_machine.FAILED, str(e))
+            raise
 
-            time.sleep(10)
+        if outcome.connected:
+            machine.advance(connect_machine.CONNECTED, location=outcome.location)
+        else:
+            machine.advance(connect_machine.FAILED, outcome.message or outcome.reason)
+
+        self._record_connect_attempt(location or outcome.location, started_at, outcome, run.cancelled)
+
+        if outcome.connected:
+            self.current_location = outcome.location
+            self.log_message(f"✅ VPN успешно подключен!")
+        elif outcome.reason == 'cancelled':
+            self.log_message("⛔ Подключение отменено")
+        elif run.cancelled:
+            self.log_message("⚠️ Подключение отменено: пароль не введен")
+        elif outcome.reason == 'exit':
+            self.log_message(f"❌ Ошибка подключения: {outcome.message or 'подробности в терминале'}")
+        else:
+            self.log_message(f"⚠️ Подключение не завершилось за {self.connect_monitor.deadline} с")
 
-            # Проверяем статус подключения
-            max_attempts = 5
-            for attempt in range(max_attempts):
-                self.log_message(f"🔍 Проверка подключения... ({attempt + 1}/{max_attempts})")
+        self.update_status()
+        return outcome.connected
 
-                if self.check_connection_status():
-                    current_location = self.get_current_location()
-                    location_text = f" к {current_location}" if current_location else ""
-                    self.log_message(f"✅ VPN успешно подключен!")
-                    return
+    def _reap_connect_run(self, run):
+        """Ждет в фоне выхода CLI после успешного подключения; по истечении exit_wait завершает его"""
+        def reap():
+            if not run.wait_exit(CONNECT_CONFIG["exit_wait"]):
+                print(f"adguardvpn-cli connect не завершился за {CONNECT_CONFIG['exit_wait']} с")
+                run.terminate()
+            run.cleanup()
 
-                time.sleep(3)
-                self.update_status()
+        thread = threading.Thread(target=reap)
+        thread.daemon = True
+        thread.start()
 
-            self.log_message("⚠️ Проверьте терминал - возможно требуется дополнительное время")
+    def _record_connect_attempt(self, location, started_at, outcome, password_cancelled=False):
+        """Сохраняет попытку подключения в историю, по которой строится и рейтинг локаций.
+
+        Отмена (кнопкой или закрытием окна пароля) записывается как cancelled
+        и не влияет на долю успехов.
+        """
+        if outcome.connected:
+            result = OUTCOME_CONNECTED
+        elif outcome.reason == 'cancelled' or password_cancelled:
+            result = OUTCOME_CANCELLED
+        elif outcome.reason == 'deadline':
+            result = OUTCOME_DEADLINE
+        else:
+            result = OUTCOME_FAILED
 
-        except Exception as e:
-            self.log_message(f"❌ Ошибка при запуске подключения: {str(e)}")
+        self.connect_history.record(location, started_at, time.time(), result, outcome.message)
+        self.location_ranker.rerank()
 
     def select_location(self):
-        """Подключение к выбранной локации через внешнюю консоль"""
-        location_window = LocationSelectionWindow(self.root)
+        """Подключение к выбранной локации"""
+        if self.operations.active is not None:
+            self.log_message("⏳ Подключение уже выполняется - дождитесь его или отмените")
+            return
+
+        location_window = LocationSelectionWindow(self.root, self.connect_history)
         selected_location = location_window.run()
 
         if not selected_location:
             return
 
-        # Запускаем в отдельном потоке
-        thread = threading.Thread(target=self._select_location_thread, args=(selected_location,))
-        thread.daemon = True
-        thread.start()
+        if self.is_connected:
+            if selected_location.lower() == (self.current_location or "").lower():
+                self.log_message(f"✅ VPN уже подключен к {selected_location}")
+                return
+            # Смена локации без ручного отключения: disconnect и connect одной операцией
+            operation = self.operations.start("switch_location", self._switch_location_thread,
+                                              CONNECT_CONFIG["deadline"], selected_location)
+        else:
+            # Запускаем в отдельном потоке
+            operation = self.operations.start("select_location", self._select_location_thread,
+                                              CONNECT_CONFIG["deadline"], selected_location)
+        if operation is None:
+            self.log_message("⏳ Подключение уже выполняется - дождитесь его или отмените")
 
-    def _select_location_thread(self, selected_location):
+    def _select_location_thread(self, operation, selected_location):
         """Поток для подключения к выбранной локации с автоматическими ответами"""
         try:
-            self.log_message(f"🔗 Подключение к {selected_location} через терминал...")
-
-            # Запускаем подключение к конкретной локации в терминале
-            command = f'konsole -e bash -c "(echo y; echo y; echo y) | adguardvpn-cli connect -l \\"{selected_location}\\" && echo Успешно подключено, терминал автоматически закроется! && sleep 3 || echo Ошибка подключения && sleep 5"'
-
-            process = subprocess.Popen(
-                command,
-                shell=True
-            )
-
-            time.sleep(10)
-
-            # Проверяем статус
-            max_attempts = 5
-            connected = False
-
-            for attempt in range(max_attempts):
-                self.update_status()
-                if self.check_connection_status():
-                    connected = True
-                    break
-                time.sleep(3)
+            self.log_message(f"🔗 Подключение к {selected_location}...")
+            self.status_poller.begin_transition()
+            self._run_connect(operation, selected_location)
+        except Exception as e:
+            self.log_message(f"❌ Ошибка при подключении: {str(e)}")
 
-            if connected:
-                current_location = self.get_current_location()
-                display_location = current_location if current_location else selected_location
-                self.log_message(f"✅ VPN успешно подключен!")
+    def _switch_location_thread(self, operation, selected_location):
+        """Поток смены локации: отключение и подключение с одним запросом пароля"""
+        started = time.monotonic()
+        previous_location = self.current_location
+        try:
+            if previous_location:
+                self.log_message(f"🔀 Смена локации: {previous_location} → {selected_location}...")
             else:
-                time.sleep(2)
-                self.update_status()
-
+                self.log_message(f"🔀 Смена локации на {selected_location}...")
+            # Кратковременное отключение - не обрыв
+            self.watchdog.suppress()
+            self.status_poller.begin_transition()
+            if self._run_connect(operation, selected_location, switch=True):
+                self.log_message(f"⏱️ Локация сменена за {time.monotonic() - started:.1f} с")
         except Exception as e:
-            self.log_message(f"❌ Ошибка при подключении: {str(e)}")
+            self.log_message(f"❌ Ошибка при смене локации: {str(e)}")
 
     def check_update(self):
         """Открывает окно проверки обновлений"""
@@ -1288,25 +1231,39 @@ class AdGuardVPNManager:
         license_window.run()
 
     def disconnect_vpn(self):
-        """Отключает VPN"""
+        """Отключает VPN в фоновом потоке, не блокируя окно"""
+        thread = threading.Thread(target=self._disconnect_vpn_thread)
+        thread.daemon = True
+        thread.start()
+
+    def _disconnect_vpn_thread(self):
+        """Отключает VPN и ждет завершения команды (не для потока Tk)"""
         try:
             self.log_message("🔒 Отключение VPN...")
+            self.watchdog.suppress()
+            self.status_poller.begin_transition()
+            self.connect_machine.begin('disconnect')
+            self.connect_machine.advance(connect_machine.DISCONNECTING)
 
             # Простая команда без терминала - как в старой версии
-            result = subprocess.run(
-                ['adguardvpn-cli', 'disconnect'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            result = run_mutation('disconnect')
 
             if result.returncode == 0:
+                self.connect_machine.advance(connect_machine.IDLE)
                 self.log_message("✅ VPN отключен")
                 self.update_status()
             else:
+                self.watchdog.unsuppress()
+                self.connect_machine.advance(connect_machine.FAILED, result.stderr.strip())
                 self.log_message("❌ Не удалось отключить VPN")
 
+        except MutationRejected as e:
+            self.watchdog.unsuppress()
+            self.connect_machine.advance(connect_machine.FAILED, str(e))
+            self.log_message(f"⏳ {str(e)}")
         except Exception as e:
+            self.watchdog.unsuppress()
+            self.connect_machine.advance(connect_machine.FAILED, str(e))
             self.log_message(f"❌ Ошибка при отключении: {str(e)}")
 
     def logout(self):
@@ -1324,36 +1281,36 @@ class AdGuardVPNManager:
 
             # Отключаем VPN перед выходом из аккаунта
             if self.is_connected:
-                self.disconnect_vpn()
+                self._disconnect_vpn_thread()
                 time.sleep(2)
 
             # Выходим из аккаунта
-            result = subprocess.run(
-                ['adguardvpn-cli', 'logout'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            result = run_mutation('logout')
 
             if result.returncode == 0:
                 self.root.after(0, self._logout_success)
             else:
                 self.root.after(0, self._logout_failed)
 
+        except MutationRejected as e:
+            self.log_message(f"⏳ {str(e)}")
         except Exception as e:
             self.root.after(0, lambda: self._logout_error(str(e)))
 
     def _logout_success(self):
         """Обновляет GUI после успешного выхода"""
         self.is_logged_in = False
+        license_cache.invalidate()
+        self.license_snapshot = None
         self.update_email_display()
         self.update_ui_for_auth_status()
         self.log_message("✅ Успешный выход из аккаунт")
 
         # Сбрасываем состояние интерфейса
         self.current_location = ""
-        self.status_label.config(text="🔴", fg='#ff3b30')
-        self.connect_button.config(text="Подключиться", bg='#2a4d6a', state=tk.DISABLED)
+        self.status_binding.apply(text="🔴")
+        self.status_label.config(fg='#ff3b30')
+        self.connect_binding.apply(text="Подключиться", bg='#2a4d6a', state=tk.DISABLED)
 
     def _logout_failed(self):
         """Обновляет GUI после неудачного выхода"""
@@ -1392,8 +1349,12 @@ class AdGuardVPNManager:
     def _login_success(self):
         """Обновляет GUI после успешной авторизации"""
         self.is_logged_in = True
-        self.update_email_display()
+        license_cache.invalidate()
+        self.status_poller.request_license_refresh()
+        self.location_ranker.request_refresh()
         self.update_ui_for_auth_status()
+        if self.connection_store.state is not None:
+            self.apply_status(self.connection_store.state)
         self.log_message("✅ Успешный вход в аккаунт")
 
     def _login_failed(self):
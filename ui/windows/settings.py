@@ -3,6 +3,9 @@ import subprocess
 import threading
 import re
 import os
+from core.cli import run_cli
+from core.mutations import run_mutation, MutationRejected, MutationSuperseded
+from core.manager_settings import get_setting, save_setting
 from ui.components.button_styler import create_hover_button, apply_hover_effect
 import platform
 
@@ -45,7 +48,7 @@ class SettingsWindow:
 
         # Базовые размеры (оригинал)
         base_width = 525
-        base_height = 520
+        base_height = 575
 
         # --- Учёт ориентации ---
         if screen_height > screen_width:
@@ -258,6 +261,22 @@ class SettingsWindow:
                                              command=self.set_socks_port, **button_style)
         apply_port_btn.pack(anchor=tk.W, pady=(10, 0))
 
+        # Автоматическое переподключение (настройка менеджера, а не CLI)
+        reconnect_frame = tk.Frame(right_column, bg='#182030', relief=tk.GROOVE, bd=0, padx=5, pady=5)
+        reconnect_frame.pack(fill=tk.X, pady=(0, 10))
+
+        tk.Label(reconnect_frame, text="Переподключение:",
+                font=("Arial", 12, "bold"), fg='white', bg='#182030').pack(anchor=tk.W)
+
+        self.auto_reconnect_var = tk.BooleanVar(value=get_setting("auto_reconnect"))
+        auto_reconnect_btn = tk.Checkbutton(reconnect_frame, text="При обрыве соединения",
+                                            variable=self.auto_reconnect_var,
+                                            command=self.apply_auto_reconnect,
+                                            font=("Arial", 10), fg='white', bg='#182030',
+                                            selectcolor='#15354D', activebackground='#182030',
+                                            activeforeground='white', bd=0, highlightthickness=0, cursor="hand2")
+        auto_reconnect_btn.pack(anchor=tk.W, pady=(10, 0))
+
         # # Пустое пространство для выравнивания
         # spacer_frame = tk.Frame(right_column, bg='#182030')
         # spacer_frame.pack(fill=tk.BOTH, expand=True)
@@ -300,12 +319,7 @@ class SettingsWindow:
         """Загружает текущие настройки"""
         try:
             # Получаем текущий режим VPN
-            result = subprocess.run(
-                ['adguardvpn-cli', 'config', 'get-mode'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_cli('config', 'get-mode')
 
             if result.returncode == 0:
                 current_mode = result.stdout.strip()
@@ -315,12 +329,7 @@ class SettingsWindow:
                     self.mode_var.set("TUN")
 
             # Получаем текущий порт SOCKS5
-            result = subprocess.run(
-                ['adguardvpn-cli', 'config', 'get-socks-port'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_cli('config', 'get-socks-port')
 
             if result.returncode == 0:
                 current_port = result.stdout.strip()
@@ -328,12 +337,7 @@ class SettingsWindow:
                 self.port_entry.insert(0, current_port)
 
             # Получаем текущий DNS
-            result = subprocess.run(
-                ['adguardvpn-cli', 'config', 'get-dns'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_cli('config', 'get-dns')
 
             if result.returncode == 0:
                 current_dns = result.stdout.strip()
@@ -341,12 +345,7 @@ class SettingsWindow:
                 self.dns_entry.insert(0, current_dns)
 
             # Получаем текущий режим маршрутизации
-            result = subprocess.run(
-                ['adguardvpn-cli', 'config', 'get-tun-routing-mode'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_cli('config', 'get-tun-routing-mode')
 
             if result.returncode == 0:
                 current_routing = result.stdout.strip().upper()
@@ -358,14 +357,24 @@ class SettingsWindow:
         except Exception as e:
             self.status_var.set(f"❌ Ошибка загрузки настроек: {str(e)}")
 
+    def apply_auto_reconnect(self):
+        """Сохраняет настройку автоматического переподключения"""
+        enabled = self.auto_reconnect_var.get()
+        try:
+            save_setting("auto_reconnect", enabled)
+            self.status_var.set("✅ Автопереподключение включено" if enabled
+                                else "✅ Автопереподключение выключено")
+        except OSError as e:
+            self.status_var.set(f"❌ Не удалось сохранить настройку: {str(e)}")
+
     def apply_mode(self):
         """Применяет выбранный режим VPN"""
         selected_mode = self.mode_var.get()
 
         if selected_mode == "SOCKS":
-            command = ['adguardvpn-cli', 'config', 'set-mode', 'SOCKS']
+            command = ['config', 'set-mode', 'SOCKS']
         else:
-            command = ['adguardvpn-cli', 'config', 'set-mode', 'TUN']
+            command = ['config', 'set-mode', 'TUN']
 
         thread = threading.Thread(target=self._apply_setting_thread,
                                 args=(command, f"Режим {selected_mode} успешно установлен"))
@@ -390,7 +399,7 @@ class SettingsWindow:
             self.status_var.set(f"❌ Ошибка. Номер порта должен быть в диапазоне 1-65535")
             return
 
-        command = ['adguardvpn-cli', 'config', 'set-socks-port', str(port)]
+        command = ['config', 'set-socks-port', str(port)]
 
         thread = threading.Thread(target=self._apply_setting_thread,
                                 args=(command, f"Порт SOCKS5 изменен на {port}"))
@@ -410,7 +419,7 @@ class SettingsWindow:
             self.status_var.set(f"❌ Ошибка. Введите корректный IP-адрес DNS-сервера")
             return
 
-        command = ['adguardvpn-cli', 'config', 'set-dns', dns_address]
+        command = ['config', 'set-dns', dns_address]
 
         thread = threading.Thread(target=self._apply_setting_thread,
                                 args=(command, f"DNS-сервер изменен на {dns_address}"))
@@ -426,7 +435,7 @@ class SettingsWindow:
         self.dns_entry.insert(0, default_dns)
 
         # Применяем настройку
-        command = ['adguardvpn-cli', 'config', 'set-dns', default_dns]
+        command = ['config', 'set-dns', default_dns]
 
         thread = threading.Thread(target=self._apply_setting_thread,
                                 args=(command, f"DNS восстановлен по умолчанию: {default_dns}"))
@@ -437,7 +446,7 @@ class SettingsWindow:
         """Применяет выбранный режим маршрутизации"""
         selected_routing = self.routing_var.get()
 
-        command = ['adguardvpn-cli', 'config', 'set-tun-routing-mode', selected_routing]
+        command = ['config', 'set-tun-routing-mode', selected_routing]
 
         thread = threading.Thread(target=self._apply_setting_thread,
                                 args=(command, f"Режим маршрутизации изменен на {selected_routing}"))
@@ -447,15 +456,10 @@ class SettingsWindow:
     def _apply_setting_thread(self, command, success_message):
         """Общий поток для применения настроек"""
         try:
-            setting_name = command[2]  # Получаем название настройки из команды
+            setting_name = command[1]  # Получаем название настройки из команды
             self.root.after(0, lambda: self.status_var.set(f"Установка {setting_name}..."))
 
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            result = run_mutation(*command, timeout=10)
 
             if result.returncode == 0:
                 self.root.after(0, lambda: self.status_var.set(f"✅ {success_message}"))
@@ -463,6 +467,12 @@ class SettingsWindow:
                 error_msg = result.stderr if result.stderr else "Неизвестная ошибка"
                 self.root.after(0, lambda: self.status_var.set(f"❌ Не удалось изменить настройку: {error_msg}"))
 
+        except MutationSuperseded:
+            # Пока запрос ждал очереди, пользователь выбрал новое значение
+            pass
+        except MutationRejected as e:
+            message = str(e)
+            self.root.after(0, lambda message=message: self.status_var.set(f"⏳ {message}"))
         except Exception as e:
             self.root.after(0, lambda: self.status_var.set(f"❌ Ошибка при изменении настройки: {str(e)}"))
 
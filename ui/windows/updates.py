@@ -6,7 +6,9 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext
 import subprocess
 import threading
-import re
+from core.cli import run_cli, cli_command, track_cli_call
+from core.mutations import mutation_queue, run_mutation, MutationRejected, MutationSuperseded
+from core.parsers import clean_ansi_codes, parse_check_update, parse_config_show, parse_version
 from ui.components.dialogs import show_question_dialog
 from ui.components.button_styler import create_hover_button
 from core.github_updater import GitHubUpdater
@@ -135,23 +137,11 @@ class UpdateWindow:
         """Загружает сохраненный канал обновления из конфига"""
         try:
             # Получаем текущую конфигурацию
-            result = subprocess.run(
-                ['adguardvpn-cli', 'config', 'show'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_cli('config', 'show')
 
             if result.returncode == 0:
-                config_output = result.stdout
-                # Ищем строку с Update channel с помощью regex
-                match = re.search(r'Update channel:\s*([^\n]+)', config_output, re.IGNORECASE)
-                if match:
-                    channel = match.group(1).strip().lower()
-                    if 'beta' in channel:
-                        return 'beta'
-                    elif 'release' in channel:
-                        return 'release'
+                channel = parse_config_show(result.stdout).update_channel
+                if channel:
                     return channel
         except Exception as e:
             print(f"Ошибка загрузки канала: {e}")
@@ -196,24 +186,10 @@ class UpdateWindow:
     def get_adguard_current_version(self):
         """Получает текущую версию AdGuard VPN"""
         try:
-            result = subprocess.run(
-                ['adguardvpn-cli', '-v'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_cli('-v')
 
             if result.returncode == 0:
-                # Очищаем вывод от ANSI кодов и лишних символов
-                version_output = self.clean_ansi_codes(result.stdout).strip()
-
-                # Ищем версию в формате vX.X.X или X.X.X
-                version_match = re.search(r'v?(\d+\.\d+\.\d+)', version_output)
-                if version_match:
-                    return f"{version_match.group(1)}"
-
-                # Если не нашли через regex, возвращаем как есть (очищенное)
-                return version_output if version_output else "Неизвестно"
+                return parse_version(result.stdout) or "Неизвестно"
 
             return "Неизвестно"
         except Exception as e:
@@ -529,12 +505,7 @@ class UpdateWindow:
         try:
             self.root.after(0, lambda: self.log_message(f"⏳ Установка канала {channel}..."))
 
-            result = subprocess.run(
-                ['adguardvpn-cli', 'config', 'set-update-channel', channel],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            result = run_mutation('config', 'set-update-channel', channel, timeout=10)
 
             if result.returncode == 0:
                 # Успешно применили - обновляем отображение
@@ -551,6 +522,11 @@ class UpdateWindow:
                 error_msg = result.stderr if result.stderr else "Неизвестная ошибка"
                 self.root.after(0, lambda: self.log_message(f"❌ Ошибка установки канала: {error_msg}"))
 
+        except MutationSuperseded:
+            pass
+        except MutationRejected as e:
+            message = str(e)
+            self.root.after(0, lambda message=message: self.log_message(f"⏳ {message}"))
         except subprocess.TimeoutExpired:
             self.root.after(0, lambda: self.log_message("❌ Таймаут при установке канала"))
         except Exception as e:
@@ -570,41 +546,14 @@ class UpdateWindow:
         try:
             self.root.after(0, lambda: self.log_message("🔍 Проверка обновлений AdGuard VPN..."))
 
-            result = subprocess.run(
-                ['adguardvpn-cli', 'check-update'],
-                capture_output=True,
-                text=True,
-                timeout=15
-            )
+            result = run_cli('check-update')
 
-            # Очищаем вывод от ANSI кодов
-            cleaned_output = self.clean_ansi_codes(result.stdout + result.stderr)
-
-            # Анализируем вывод более точно
-            output_lower = cleaned_output.lower()
-
-            # Пытаемся извлечь версию обновления
-            version = self.extract_version(cleaned_output)
-
-            # Проверяем наличие сообщения о доступном обновления
-            has_update_available = any(phrase in output_lower for phrase in [
-                'is now available',
-                'update available',
-                'available',
-                'доступно',
-                'можно обновиться',
-                'new version'
-            ])
-
-            # Проверяем наличие сообщения о том, что версия актуальна
-            is_latest = any(phrase in output_lower for phrase in [
-                'latest version',
-                'up to date',
-                'актуальна',
-                'you are using the latest'
-            ])
-
-            if has_update_available:
+            # Разбираем вывод за один проход
+            update_check = parse_check_update(result.stdout + result.stderr)
+            version = update_check.version
+            is_latest = update_check.up_to_date
+
+            if update_check.available:
                 self.update_available = True
                 self.available_version = version
                 if version:
@@ -648,45 +597,10 @@ class UpdateWindow:
     def get_current_version(self):
         """Получает текущую версию AdGuard VPN через adguardvpn-cli -v"""
         try:
-            result = subprocess.run(
-                ['adguardvpn-cli', '-v'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = run_cli('-v')
 
             if result.returncode == 0:
-                # Очищаем вывод от ANSI кодов и лишних символов
-                version_output = self.clean_ansi_codes(result.stdout).strip()
-
-                # Ищем версию в формате vX.X.X или X.X.X
-                version_match = re.search(r'v?(\d+\.\d+\.\d+)', version_output)
-                if version_match:
-                    return f"{version_match.group(1)}"
-
-                # Если не нашли через regex, возвращаем как есть (очищенное)
-                return version_output if version_output else None
-
-            return None
-        except Exception:
-            return None
-
-    def extract_version(self, text):
-        """Извлекает версию из текста вывода"""
-        try:
-            # Ищем паттерны версий: v1.5.12, 1.5.12, v2.0.1 и т.д.
-            version_patterns = [
-                r'AdGuard VPN[^\n]*v?(\d+\.\d+\.\d+)[^\n]*is now available',
-                r'v?(\d+\.\d+\.\d+)[^\n]*is now available',
-                r'version[^\n]*v?(\d+\.\d+\.\d+)',
-                r'v?(\d+\.\d+\.\d+)[^\n]*available',
-                r'обновление[^\n]*v?(\d+\.\d+\.\d+)'
-            ]
-
-            for pattern in version_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    return f"v{match.group(1)}" if not match.group(1).startswith('v') else match.group(1)
+                return parse_version(result.stdout)
 
             return None
         except Exception:
@@ -711,19 +625,21 @@ class UpdateWindow:
             self.root.after(0, lambda: self.log_message("🔄 Запуск обновления AdGuard VPN..."))
 
             # Запускаем процесс обновления с автоматическим ответом 'y'
-            process = subprocess.Popen(
-                ['adguardvpn-cli', 'update'],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
+            with mutation_queue.hold('update'), track_cli_call(('update',)) as call:
+                process = subprocess.Popen(
+                    cli_command('update'),
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True
+                )
 
-            # Автоматически отвечаем 'y' на запрос подтверждения
-            output, error = process.communicate(input='y\n', timeout=60)
+                # Автоматически отвечаем 'y' на запрос подтверждения
+                output, error = process.communicate(input='y\n', timeout=60)
+                call['exit_code'] = process.returncode
 
             # Очищаем вывод от ANSI кодов
-            cleaned_output = self.clean_ansi_codes(output + error)
+            cleaned_output = clean_ansi_codes(output + error)
 
             if process.returncode == 0:
                 self.root.after(0, lambda: self.log_message("✅ AdGuard VPN успешно обновлен!"))
@@ -739,6 +655,9 @@ class UpdateWindow:
             else:
                 self.root.after(0, lambda: self.log_message(f"❌ Ошибка при обновлении:\n{cleaned_output}"))
 
+        except MutationRejected as e:
+            message = str(e)
+            self.root.after(0, lambda message=message: self.log_message(f"⏳ {message}"))
         except subprocess.TimeoutExpired:
             self.root.after(0, lambda: self.log_message("❌ Таймаут при выполнении обновления"))
         except Exception as e:
@@ -748,11 +667,6 @@ class UpdateWindow:
             self.root.after(0, lambda: self.action_button.config(state=tk.NORMAL))
             self.root.after(0, self.update_action_button)
 
-    def clean_ansi_codes(self, text):
-        """Очищает текст от ANSI escape sequences"""
-        ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-        return ansi_escape.sub('', text)
-
     def log_message(self, message):
         """Добавляет сообщение в лог"""
         self.log_text.insert(tk.END, f"{message}\n")